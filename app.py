@@ -1,14 +1,45 @@
 # app.py - Complete Flask Roadmap App with Dark Theme & Advanced Footer
-from flask import Flask, g, render_template_string, request, redirect, url_for, session, jsonify, flash
+from flask import Flask, g, abort, has_app_context, has_request_context, make_response, render_template, stream_template, request, redirect, url_for, session, jsonify, flash, get_flashed_messages, Response, stream_with_context
+from flask.sessions import SessionInterface, SessionMixin
+from flask.json.tag import TaggedJSONSerializer
 import os
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.datastructures import CallbackDict
+from werkzeug.wsgi import ClosingIterator
+from markupsafe import Markup
+from jinja2 import DictLoader, FileSystemBytecodeCache
 import secrets
 import sqlite3
 import psycopg2
-from psycopg2.extras import RealDictCursor
+import psycopg2.extensions
+import psycopg2.pool
+from psycopg2.extras import RealDictCursor, execute_values
+import click
+import heapq
+import itertools
 import random
+import sys
+import cProfile
+import pstats
+import logging
+import logging.handlers
+import queue
+import select
+import asyncio
+import atexit
+import csv
+import re
+import io
+import json
+import threading
+import time
+from collections import OrderedDict, Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
+from contextlib import contextmanager
 from functools import wraps
+from templates import TEMPLATES
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', secrets.token_hex(32))
@@ -25,11 +56,119 @@ else:
         raise Exception("DATABASE_URL environment variable is required in production mode")
     print("🚀 Running in PRODUCTION mode with PostgreSQL")
 
+# Tenant shards: shard 0 is the main database and also holds the global tables
+# (users, sessions, user_shards, share_tokens). SHARD_URLS adds more shards,
+# SQLite paths in DEBUG mode and PostgreSQL URLs otherwise.
+SHARDS = [DATABASE_PATH if DEBUG else DATABASE_URL] + [
+    url.strip() for url in os.environ.get('SHARD_URLS', '').split(',') if url.strip()]
+GLOBAL_SHARD = 0
+
+# Optional read replica for read-only views. After a write the browser is pinned
+# to the primary for READ_YOUR_WRITES_WINDOW seconds so it sees its own changes.
+# It replicates shard 0 only; users on other shards always read their shard's primary.
+DATABASE_READ_URL = None if DEBUG else os.environ.get('DATABASE_READ_URL')
+READ_YOUR_WRITES_WINDOW = int(os.environ.get('READ_YOUR_WRITES_WINDOW', '5'))
+READ_PIN_COOKIE = 'read_primary'
+
 # Personalization
 PORTFOLIO_URL = os.environ.get('PORTFOLIO_URL', 'https://yourportfolio.com')
 GITHUB_URL = os.environ.get('GITHUB_URL', 'https://github.com/yourusername')
 LINKEDIN_URL = os.environ.get('LINKEDIN_URL', 'https://linkedin.com/in/yourprofile')
 CONTACT_EMAIL = os.environ.get('CONTACT_EMAIL', 'hello@yourdomain.com')
+FOOTER_LINKS = dict(portfolio_url=PORTFOLIO_URL, github_url=GITHUB_URL,
+                    linkedin_url=LINKEDIN_URL, contact_email=CONTACT_EMAIL)
+
+# Server-side sessions
+SESSION_CACHE_SIZE = int(os.environ.get('SESSION_CACHE_SIZE', '10000'))
+SESSION_CACHE_TTL = int(os.environ.get('SESSION_CACHE_TTL', '30'))
+SESSION_REFRESH_INTERVAL = int(os.environ.get('SESSION_REFRESH_INTERVAL', '60'))
+SESSION_CLEANUP_INTERVAL = int(os.environ.get('SESSION_CLEANUP_INTERVAL', '300'))
+
+# Per-user dependency graphs; the TTL bounds staleness across workers
+DEPENDENCY_CACHE_SIZE = int(os.environ.get('DEPENDENCY_CACHE_SIZE', '1000'))
+DEPENDENCY_CACHE_TTL = int(os.environ.get('DEPENDENCY_CACHE_TTL', '30'))
+
+# Public share pages: in-process snapshot cache and browser/CDN max-age
+SHARE_CACHE_SIZE = int(os.environ.get('SHARE_CACHE_SIZE', '1000'))
+SHARE_MAX_AGE = int(os.environ.get('SHARE_MAX_AGE', '60'))
+
+# Dashboards with at least this many tasks are streamed to the browser
+DASHBOARD_STREAM_THRESHOLD = int(os.environ.get('DASHBOARD_STREAM_THRESHOLD', '200'))
+DASHBOARD_FLUSH_EVERY = int(os.environ.get('DASHBOARD_FLUSH_EVERY', '50'))
+
+# Comma-separated usernames allowed to use operator tooling
+ADMIN_USERNAMES = {name.strip() for name in os.environ.get('ADMIN_USERNAMES', '').split(',') if name.strip()}
+
+# Profiling: admins opt in per request, or a fraction of all requests is sampled
+PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_INTERVAL = float(os.environ.get('PROFILE_INTERVAL', '0.005'))
+
+# Structured logging; '-' writes to stdout
+LOG_PATH = os.environ.get('LOG_PATH', '-')
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', '200'))
+
+# Fraction of requests logged per endpoint, e.g. "mark_done=0.1,unset_done=0.1"
+ACCESS_LOG_SAMPLE_RATES = {
+    endpoint.strip(): float(rate)
+    for endpoint, rate in (item.split('=') for item in
+                           os.environ.get('ACCESS_LOG_SAMPLE_RATES', 'mark_done=0.1,unset_done=0.1,healthz=0.01,readyz=0.01').split(',') if item)
+}
+
+# Completed tasks move to archived_tasks after ARCHIVE_AFTER_DAYS; each worker
+# process queues the job on its background thread once per ARCHIVE_INTERVAL seconds
+# (0 leaves it to the CLI command)
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', '30'))
+ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', '1000'))
+ARCHIVE_INTERVAL = int(os.environ.get('ARCHIVE_INTERVAL', '3600'))
+
+# Due dates. A task's reminder fires REMINDER_LEAD_MINUTES before it is due and
+# goes to each of REMINDER_NOTIFIERS ('log', 'live'; empty turns the scheduler
+# off). Each worker holds the reminders due in the next REMINDER_WINDOW seconds
+# in memory, loading at most REMINDER_BATCH_SIZE per shard at a time.
+REMINDER_LEAD_MINUTES = int(os.environ.get('REMINDER_LEAD_MINUTES', '60'))
+REMINDER_WINDOW = int(os.environ.get('REMINDER_WINDOW', '300'))
+REMINDER_BATCH_SIZE = int(os.environ.get('REMINDER_BATCH_SIZE', '500'))
+REMINDER_NOTIFIERS = [name.strip() for name in os.environ.get('REMINDER_NOTIFIERS', 'log,live').split(',') if name.strip()]
+UPCOMING_DAYS = int(os.environ.get('UPCOMING_DAYS', '7'))
+
+# Live dashboard updates over Server-Sent Events. The default broker only reaches
+# streams served by the same process; EVENT_BROKER=postgres relays events between
+# workers with LISTEN/NOTIFY. Streams end after EVENT_STREAM_MAX_AGE seconds and
+# the browser resumes them from the recent-event buffer via Last-Event-ID. Each
+# open stream holds a sync worker for that long, so dashboards only open one when
+# served through asgi_app or when LIVE_UPDATES is set (e.g. for gevent workers).
+LIVE_UPDATES = os.environ.get('LIVE_UPDATES', 'False').lower() == 'true'
+EVENT_BROKER = os.environ.get('EVENT_BROKER', 'memory')
+EVENT_STREAM_HEARTBEAT = int(os.environ.get('EVENT_STREAM_HEARTBEAT', '15'))
+EVENT_STREAM_MAX_AGE = int(os.environ.get('EVENT_STREAM_MAX_AGE', '300'))
+EVENT_REPLAY_SIZE = int(os.environ.get('EVENT_REPLAY_SIZE', '100'))
+EVENT_REPLAY_TTL = int(os.environ.get('EVENT_REPLAY_TTL', '600'))
+
+# Serving. DB_POOL_SIZE > 0 keeps up to that many PostgreSQL connections per shard
+# open between requests. asgi_app serves the app to an ASGI server such as
+# `uvicorn app:asgi_app`: live-update streams run on the event loop and other
+# requests on ASGI_THREADS threads, so size the pool to match.
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '0'))
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS', '32'))
+
+# Form posts carrying an idempotency key are replayed, not re-run, for this long
+IDEMPOTENCY_KEY_TTL = int(os.environ.get('IDEMPOTENCY_KEY_TTL', '86400'))
+
+# Health checks. READY_TIMEOUT_MS is the whole /readyz budget across shards,
+# connection included; DB_CONNECT_TIMEOUT only applies to regular connections
+DB_CONNECT_TIMEOUT = int(os.environ.get('DB_CONNECT_TIMEOUT', '5'))
+READY_TIMEOUT_MS = int(os.environ.get('READY_TIMEOUT_MS', '1000'))
+
+# Database resilience: a per-statement timeout (the busy timeout on SQLite),
+# jittered retries for transient errors on reads, and a per-shard circuit
+# breaker that fails requests fast after repeated connection failures
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', '5000'))
+DB_RETRY_ATTEMPTS = int(os.environ.get('DB_RETRY_ATTEMPTS', '3'))
+DB_RETRY_BASE_DELAY = float(os.environ.get('DB_RETRY_BASE_DELAY', '0.05'))
+DB_BREAKER_THRESHOLD = int(os.environ.get('DB_BREAKER_THRESHOLD', '5'))
+DB_BREAKER_RESET = int(os.environ.get('DB_BREAKER_RESET', '30'))
 
 app.config.update(
     SESSION_COOKIE_HTTPONLY=True,
@@ -38,1243 +177,433 @@ app.config.update(
     PERMANENT_SESSION_LIFETIME=3600
 )
 
-# ---------- Template Strings ----------
-TPL_BASE = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Roadmap App</title>
-    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap" rel="stylesheet">
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css" rel="stylesheet">
-    <style>
-        :root {
-            --bg-primary: #0f0f23;
-            --bg-secondary: #1a1a2e;
-            --bg-glass: rgba(255, 255, 255, 0.05);
-            --bg-glass-hover: rgba(255, 255, 255, 0.1);
-            --text-primary: #ffffff;
-            --text-secondary: #b0b0b0;
-            --text-muted: #888888;
-            --accent-primary: #6366f1;
-            --accent-secondary: #8b5cf6;
-            --accent-success: #10b981;
-            --accent-danger: #ef4444;
-            --accent-warning: #f59e0b;
-            --border-radius: 16px;
-            --transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-            --shadow: 0 8px 32px rgba(0, 0, 0, 0.3);
-            --shadow-hover: 0 12px 48px rgba(0, 0, 0, 0.4);
-        }
-
-        * { 
-            margin: 0; 
-            padding: 0; 
-            box-sizing: border-box; 
-        }
-
-        body { 
-            font-family: 'Inter', sans-serif; 
-            background: linear-gradient(135deg, var(--bg-primary) 0%, var(--bg-secondary) 100%);
-            color: var(--text-primary);
-            min-height: 100vh;
-            padding: 20px;
-            transition: var(--transition);
-        }
-
-        .container { 
-            max-width: 1400px; 
-            margin: 0 auto; 
-            min-height: calc(100vh - 160px);
-        }
-
-        .glass-card {
-            background: var(--bg-glass);
-            backdrop-filter: blur(20px);
-            border-radius: var(--border-radius);
-            padding: 30px;
-            box-shadow: var(--shadow);
-            border: 1px solid rgba(255, 255, 255, 0.1);
-            margin-bottom: 20px;
-            transition: var(--transition);
-            position: relative;
-            overflow: hidden;
-        }
-
-        .glass-card::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(90deg, transparent, rgba(255,255,255,0.1), transparent);
-            transition: var(--transition);
-        }
-
-        .glass-card:hover::before {
-            left: 100%;
-        }
-
-        .glass-card:hover {
-            transform: translateY(-5px);
-            box-shadow: var(--shadow-hover);
-            background: var(--bg-glass-hover);
-        }
-
-        .btn {
-            background: linear-gradient(135deg, var(--accent-primary), var(--accent-secondary));
-            color: white;
-            border: none;
-            padding: 12px 24px;
-            border-radius: 12px;
-            cursor: pointer;
-            font-weight: 600;
-            transition: var(--transition);
-            text-decoration: none;
-            display: inline-flex;
-            align-items: center;
-            gap: 8px;
-            font-size: 14px;
-            position: relative;
-            overflow: hidden;
-        }
-
-        .btn::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(90deg, transparent, rgba(255,255,255,0.2), transparent);
-            transition: var(--transition);
-        }
-
-        .btn:hover::before {
-            left: 100%;
-        }
-
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 8px 25px rgba(99, 102, 241, 0.3);
-        }
-
-        .btn-success { 
-            background: linear-gradient(135deg, var(--accent-success), #059669); 
-        }
-        .btn-danger { 
-            background: linear-gradient(135deg, var(--accent-danger), #dc2626); 
-        }
-        .btn-secondary { 
-            background: linear-gradient(135deg, #6b7280, #4b5563); 
-        }
-        .btn-info { 
-            background: linear-gradient(135deg, #06b6d4, #0891b2); 
-        }
-        .btn-small { 
-            padding: 8px 16px; 
-            font-size: 12px; 
-        }
-
-        .form-group { 
-            margin-bottom: 20px; 
-        }
-
-        .form-control {
-            width: 100%;
-            padding: 14px 18px;
-            background: rgba(255, 255, 255, 0.05);
-            border: 2px solid rgba(255, 255, 255, 0.1);
-            border-radius: 12px;
-            font-size: 14px;
-            transition: var(--transition);
-            color: var(--text-primary);
-        }
-
-        .form-control::placeholder {
-            color: var(--text-muted);
-        }
-
-        .form-control:focus {
-            outline: none;
-            border-color: var(--accent-primary);
-            box-shadow: 0 0 0 3px rgba(99, 102, 241, 0.1);
-            background: rgba(255, 255, 255, 0.08);
-        }
-
-        textarea.form-control {
-            min-height: 120px;
-            resize: vertical;
-        }
-
-        .alert {
-            padding: 16px 20px;
-            border-radius: 12px;
-            margin-bottom: 20px;
-            animation: slideIn 0.5s cubic-bezier(0.4, 0, 0.2, 1);
-            border: 1px solid;
-            background: var(--bg-glass);
-        }
-
-        .alert-success { 
-            color: #10b981; 
-            border-color: rgba(16, 185, 129, 0.3); 
-        }
-        .alert-error { 
-            color: #ef4444; 
-            border-color: rgba(239, 68, 68, 0.3); 
-        }
-        .alert-warning { 
-            color: #f59e0b; 
-            border-color: rgba(245, 158, 11, 0.3); 
-        }
-        .alert-info { 
-            color: #06b6d4; 
-            border-color: rgba(6, 182, 212, 0.3); 
-        }
-
-        .task-card {
-            background: var(--bg-glass);
-            border-radius: var(--border-radius);
-            padding: 24px;
-            margin-bottom: 16px;
-            box-shadow: var(--shadow);
-            transition: var(--transition);
-            border-left: 4px solid var(--accent-primary);
-            animation: fadeIn 0.5s ease;
-            position: relative;
-            overflow: hidden;
-        }
-
-        .task-card::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            width: 4px;
-            height: 100%;
-            background: var(--accent-primary);
-            transition: var(--transition);
-        }
-
-        .task-card:hover {
-            transform: translateX(8px);
-            box-shadow: var(--shadow-hover);
-            background: var(--bg-glass-hover);
-        }
-
-        .task-card.done {
-            border-left-color: var(--accent-success);
-            opacity: 0.8;
-        }
-
-        .task-card.done::before {
-            background: var(--accent-success);
-        }
-
-        .task-card.done .task-title {
-            text-decoration: line-through;
-            color: var(--text-muted);
-        }
-
-        .category-badge {
-            display: inline-flex;
-            align-items: center;
-            gap: 6px;
-            padding: 6px 12px;
-            border-radius: 20px;
-            font-size: 12px;
-            font-weight: 600;
-            color: white;
-            margin-bottom: 12px;
-            background: linear-gradient(135deg, var(--accent-primary), var(--accent-secondary));
-        }
-
-        .stats-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(220px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }
-
-        .stat-card {
-            background: linear-gradient(135deg, var(--accent-primary), var(--accent-secondary));
-            color: white;
-            padding: 24px;
-            border-radius: var(--border-radius);
-            text-align: center;
-            animation: fadeIn 1s ease;
-            position: relative;
-            overflow: hidden;
-        }
-
-        .stat-card::before {
-            content: '';
-            position: absolute;
-            top: -50%;
-            left: -50%;
-            width: 200%;
-            height: 200%;
-            background: radial-gradient(circle, rgba(255,255,255,0.1) 0%, transparent 70%);
-            animation: rotate 10s linear infinite;
-        }
-
-        .stat-card.success { 
-            background: linear-gradient(135deg, var(--accent-success), #059669); 
-        }
-
-        .task-actions {
-            display: flex;
-            gap: 10px;
-            margin-top: 16px;
-            flex-wrap: wrap;
-        }
-
-        .dashboard-grid {
-            display: grid;
-            grid-template-columns: 1fr 2fr;
-            gap: 24px;
-        }
-
-        .categories-sidebar {
-            background: var(--bg-glass);
-            border-radius: var(--border-radius);
-            padding: 24px;
-            height: fit-content;
-            backdrop-filter: blur(20px);
-        }
-
-        .category-item {
-            padding: 16px;
-            margin: 12px 0;
-            border-radius: 12px;
-            background: rgba(255, 255, 255, 0.05);
-            border-left: 4px solid;
-            transition: var(--transition);
-        }
-
-        .category-item:hover {
-            background: rgba(255, 255, 255, 0.08);
-            transform: translateX(4px);
-        }
-
-        .import-example {
-            background: rgba(255, 255, 255, 0.05);
-            padding: 16px;
-            border-radius: 12px;
-            margin-top: 12px;
-            font-size: 0.9em;
-            border: 1px solid rgba(255, 255, 255, 0.1);
-        }
-
-        .import-example code {
-            background: rgba(255, 255, 255, 0.1);
-            padding: 4px 8px;
-            border-radius: 6px;
-            font-family: 'Courier New', monospace;
-            color: var(--accent-primary);
-        }
-
-        @keyframes slideIn {
-            from { 
-                transform: translateY(-20px); 
-                opacity: 0; 
-            }
-            to { 
-                transform: translateY(0); 
-                opacity: 1; 
-            }
-        }
-
-        @keyframes fadeIn {
-            from { 
-                opacity: 0; 
-                transform: translateY(20px); 
-            }
-            to { 
-                opacity: 1; 
-                transform: translateY(0); 
-            }
-        }
-
-        @keyframes pulse {
-            0% { transform: scale(1); }
-            50% { transform: scale(1.05); }
-            100% { transform: scale(1); }
-        }
-
-        @keyframes rotate {
-            from { transform: rotate(0deg); }
-            to { transform: rotate(360deg); }
-        }
-
-        .pulse { animation: pulse 2s infinite; }
-
-        .header { 
-            display: flex; 
-            justify-content: space-between; 
-            align-items: center; 
-            margin-bottom: 30px;
-            flex-wrap: wrap;
-            gap: 20px;
-        }
-
-        .task-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(380px, 1fr));
-            gap: 20px;
-        }
-
-        .welcome-text {
-            font-size: 2rem;
-            font-weight: 700;
-            background: linear-gradient(135deg, var(--accent-primary), var(--accent-secondary));
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            margin-bottom: 8px;
-        }
-
-        .subtitle {
-            color: var(--text-secondary);
-            margin-bottom: 20px;
-            font-size: 1.1rem;
-        }
-
-        .edit-form {
-            display: none;
-            margin-top: 16px;
-            padding: 20px;
-            background: rgba(255, 255, 255, 0.05);
-            border-radius: 12px;
-            border: 1px solid rgba(255, 255, 255, 0.1);
-        }
-
-        .color-preview {
-            width: 32px;
-            height: 32px;
-            border-radius: 8px;
-            display: inline-block;
-            margin-right: 12px;
-            border: 2px solid rgba(255, 255, 255, 0.2);
-            transition: var(--transition);
-        }
-
-        .color-preview:hover {
-            transform: scale(1.1);
-        }
-
-        .tab-buttons {
-            display: flex;
-            margin-bottom: 24px;
-            background: rgba(255, 255, 255, 0.05);
-            border-radius: 12px;
-            padding: 6px;
-            gap: 4px;
-        }
-
-        .tab-button {
-            flex: 1;
-            padding: 12px;
-            text-align: center;
-            background: transparent;
-            border: none;
-            border-radius: 8px;
-            cursor: pointer;
-            transition: var(--transition);
-            color: var(--text-secondary);
-            font-weight: 500;
-        }
-
-        .tab-button.active {
-            background: var(--accent-primary);
-            color: white;
-            box-shadow: 0 4px 15px rgba(99, 102, 241, 0.3);
-        }
-
-        .tab-content {
-            display: none;
-        }
-
-        .tab-content.active {
-            display: block;
-        }
-
-        /* Advanced Footer */
-        .app-footer {
-            margin-top: 60px;
-            padding: 40px 0 20px;
-            border-top: 1px solid rgba(255, 255, 255, 0.1);
-        }
-
-        .footer-content {
-            display: grid;
-            grid-template-columns: 2fr 1fr 1fr;
-            gap: 40px;
-            margin-bottom: 30px;
-        }
-
-        .footer-brand h3 {
-            background: linear-gradient(135deg, var(--accent-primary), var(--accent-secondary));
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            margin-bottom: 16px;
-            font-size: 1.5rem;
-        }
-
-        .footer-brand p {
-            color: var(--text-secondary);
-            line-height: 1.6;
-        }
-
-        .footer-links h4 {
-            color: var(--text-primary);
-            margin-bottom: 16px;
-            font-size: 1.1rem;
-        }
-
-        .footer-links ul {
-            list-style: none;
-        }
-
-        .footer-links li {
-            margin-bottom: 10px;
-        }
-
-        .footer-links a {
-            color: var(--text-secondary);
-            text-decoration: none;
-            transition: var(--transition);
-            display: flex;
-            align-items: center;
-            gap: 8px;
-        }
-
-        .footer-links a:hover {
-            color: var(--accent-primary);
-            transform: translateX(4px);
-        }
-
-        .footer-bottom {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            padding-top: 20px;
-            border-top: 1px solid rgba(255, 255, 255, 0.1);
-            color: var(--text-muted);
-            font-size: 0.9rem;
-        }
-
-        .footer-social {
-            display: flex;
-            gap: 16px;
-        }
-
-        .footer-social a {
-            color: var(--text-secondary);
-            font-size: 1.2rem;
-            transition: var(--transition);
-            padding: 8px;
-            border-radius: 8px;
-            background: rgba(255, 255, 255, 0.05);
-        }
-
-        .footer-social a:hover {
-            color: var(--accent-primary);
-            background: rgba(99, 102, 241, 0.1);
-            transform: translateY(-2px);
-        }
-
-        .current-date {
-            color: var(--accent-primary);
-            font-weight: 600;
-        }
+# ---------- Templates ----------
+# Compiled templates are cached on disk so cold workers skip the Jinja compile step
+TEMPLATE_CACHE_DIR = os.environ.get('TEMPLATE_CACHE_DIR')
+if TEMPLATE_CACHE_DIR:
+    os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+app.jinja_loader = DictLoader(TEMPLATES)
+app.jinja_options = dict(app.jinja_options, bytecode_cache=FileSystemBytecodeCache(TEMPLATE_CACHE_DIR))
+for template_name in TEMPLATES:
+    app.jinja_env.get_template(template_name)
+
+# ---------- Logging ----------
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records rather than block when the queue is full."""
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class BufferedLogWriter:
+    """Drains the log queue on a background thread, one write per batch.
+
+    The thread is started lazily so every forked worker gets its own.
+    """
+    def __init__(self, log_queue, path, batch_size=500, flush_interval=1.0):
+        self.queue = log_queue
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pid = None
+        self._stream = None
+        self._lock = threading.Lock()
+
+    def ensure_running(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._stream = sys.stdout if self.path == '-' else open(self.path, 'a')
+                threading.Thread(target=self._run, name='log-writer', daemon=True).start()
+                self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            self._write(batch)
 
-        @media (max-width: 768px) {
-            .dashboard-grid {
-                grid-template-columns: 1fr;
-            }
-            
-            .footer-content {
-                grid-template-columns: 1fr;
-                gap: 30px;
-            }
-            
-            .footer-bottom {
-                flex-direction: column;
-                gap: 16px;
-                text-align: center;
-            }
-            
-            .task-grid {
-                grid-template-columns: 1fr;
-            }
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        {{content}}
-    </div>
-
-    {{footer}}
-
-    <script>
-        // Flash message auto-hide
-        setTimeout(() => {
-            const alerts = document.querySelectorAll('.alert');
-            alerts.forEach(alert => {
-                alert.style.transition = 'all 0.5s ease';
-                alert.style.opacity = '0';
-                alert.style.transform = 'translateY(-20px)';
-                setTimeout(() => alert.remove(), 500);
-            });
-        }, 5000);
-
-        function switchTab(tabName) {
-            document.querySelectorAll('.tab-content').forEach(tab => {
-                tab.classList.remove('active');
-            });
-            document.querySelectorAll('.tab-button').forEach(btn => {
-                btn.classList.remove('active');
-            });
-            document.getElementById(tabName + '-tab').classList.add('active');
-            event.target.classList.add('active');
-        }
+    def _write(self, batch):
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        self._stream.write(''.join(record.getMessage() + '\n' for record in batch))
+        self._stream.flush()
+
+    def drain(self):
+        if self._stream is not None:
+            while not self.queue.empty():
+                self._write([])
+
+class ProcessStats:
+    """Thread-safe counters and gauges reported by /admin/status."""
+    def __init__(self):
+        self.started = time.time()
+        self._values = Counter()
+        self._lock = threading.Lock()
+
+    def incr(self, key, amount=1):
+        with self._lock:
+            self._values[key] += amount
+
+    def get(self, key):
+        return self._values[key]
+
+process_stats = ProcessStats()
+
+log_queue = queue.Queue(LOG_QUEUE_SIZE)
+log_handler = DroppingQueueHandler(log_queue)
+log_writer = BufferedLogWriter(log_queue, LOG_PATH)
+atexit.register(log_writer.drain)
+
+access_log = logging.getLogger('roadmap.access')
+db_log = logging.getLogger('roadmap.db')
+reminder_log = logging.getLogger('roadmap.reminders')
+for logger in (access_log, db_log, reminder_log):
+    logger.setLevel(logging.INFO)
+    logger.addHandler(log_handler)
+    logger.propagate = False
+
+def log_event(logger, level, **fields):
+    logger.log(level, json.dumps(dict(ts=datetime.now(timezone.utc).isoformat(timespec='milliseconds'), **fields),
+                                 default=str))
+
+def record_query(query, elapsed):
+    stats = g.get('_db_stats') if has_app_context() else None
+    if stats is not None:
+        stats['queries'] += 1
+        stats['db_ms'] += elapsed * 1000
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        log_event(db_log, logging.WARNING, event='slow_query', ms=round(elapsed * 1000, 2),
+                  endpoint=request.endpoint if has_request_context() else None,
+                  query=' '.join(query.split())[:500])
+
+@app.before_request
+def start_request_log():
+    log_writer.ensure_running()
+    g._request_started = time.perf_counter()
+    g._db_stats = {'queries': 0, 'db_ms': 0.0}
+
+@app.after_request
+def write_access_log(response):
+    rate = ACCESS_LOG_SAMPLE_RATES.get(request.endpoint, 1.0)
+    if response.status_code < 500 and rate < 1.0 and random.random() >= rate:
+        return response
+
+    started = g.get('_request_started', time.perf_counter())
+    stats = g.get('_db_stats', {'queries': 0, 'db_ms': 0.0})
+    entry = dict(event='request', method=request.method,
+                 route=request.url_rule.rule if request.url_rule else None,
+                 endpoint=request.endpoint, user_id=session.get('user_id'),
+                 status=response.status_code, sample_rate=rate, replica='_read_database' in g)
+    sent = [response.content_length]
+
+    if response.is_streamed:
+        body = response.response
+        sent[0] = 0
+
+        def counted():
+            try:
+                for chunk in body:
+                    sent[0] += len(chunk.encode() if isinstance(chunk, str) else chunk)
+                    yield chunk
+            finally:
+                if hasattr(body, 'close'):
+                    body.close()
 
-        function showImportExamples() {
-            const examples = `🚀 Quick Import Formats:
+        response.response = counted()
 
-📁 Category = Task1, Task2, Task3
-   Web Development = HTML Basics, CSS Styling, JavaScript Fundamentals
+    # Logged on close so streamed responses report their full latency and size
+    def emit():
+        log_event(access_log, logging.INFO, latency_ms=round((time.perf_counter() - started) * 1000, 2),
+                  queries=stats['queries'], db_ms=round(stats['db_ms'], 2), bytes=sent[0], **entry)
 
-📊 Category: Task1 | Task2 | Task3  
-   Data Science: Python Basics | Pandas | Machine Learning
+    response.call_on_close(emit)
+    return response
 
-📝 Bullet points:
-   Study Plan
-   - Math Chapter 1
-   - Physics Lab Report
-   - Chemistry Homework
+# ---------- DB Helpers ----------
+READ_STATEMENTS = ('SELECT', 'WITH')
+
+class InstrumentedCursorMixin:
+    """Counts and times every statement for the access and slow-query logs.
+
+    Also flags the connection once its open transaction has written, which
+    tells retry_read() whether reconnecting would lose work.
+    """
+    def execute(self, query, *args):
+        if not query.lstrip()[:6].upper().startswith(READ_STATEMENTS):
+            self.connection.wrote = True
+        started = time.perf_counter()
+        try:
+            return super().execute(query, *args)
+        finally:
+            record_query(query, time.perf_counter() - started)
+
+    def executemany(self, query, *args):
+        self.connection.wrote = True
+        started = time.perf_counter()
+        try:
+            return super().executemany(query, *args)
+        finally:
+            record_query(query, time.perf_counter() - started)
+
+class TracksWritesMixin:
+    """Whether the open transaction has written, and what to run once it commits."""
+    wrote = False
+    _after_commit = ()
+
+    def after_commit(self, callback):
+        """Run ``callback`` after the current transaction commits; a rollback drops it."""
+        if not self._after_commit:
+            self._after_commit = []
+        self._after_commit.append(callback)
+
+    def commit(self):
+        super().commit()
+        self.wrote = False
+        callbacks, self._after_commit = self._after_commit, ()
+        for callback in callbacks:
+            callback()
+
+    def rollback(self):
+        super().rollback()
+        self.wrote = False
+        self._after_commit = ()
+
+class PGConnection(TracksWritesMixin, psycopg2.extensions.connection):
+    pass
+
+class PGCursor(InstrumentedCursorMixin, psycopg2.extensions.cursor):
+    pass
+
+class PGDictCursor(InstrumentedCursorMixin, RealDictCursor):
+    pass
+
+class SQLiteCursor(InstrumentedCursorMixin, sqlite3.Cursor):
+    """SQLite cursor that accepts the psycopg2-style %s placeholders used in every query."""
+    def execute(self, query, params=()):
+        return super().execute(query.replace('%s', '?'), params)
+
+    def executemany(self, query, seq_of_params):
+        return super().executemany(query.replace('%s', '?'), seq_of_params)
+
+class SQLiteConnection(TracksWritesMixin, sqlite3.Connection):
+    def cursor(self, factory=SQLiteCursor):
+        return super().cursor(factory)
+
+class DatabaseUnavailable(Exception):
+    """The database can't be reached right now; requests get a 503 instead of waiting on it."""
+
+class CircuitBreaker:
+    """Opens after ``threshold`` consecutive failures and then rejects calls.
+
+    Every ``reset_timeout`` seconds one call is let through as a trial; its
+    success closes the breaker, its failure keeps it open.
+    """
+    def __init__(self, threshold, reset_timeout):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.time() - self.opened_at < self.reset_timeout:
+                return False
+            self.opened_at = time.time()
+            return True
+
+    def record_success(self):
+        if self.failures:
+            with self._lock:
+                self.failures = 0
+                self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                if self.opened_at is None:
+                    log_event(db_log, logging.ERROR, event='circuit_open', failures=self.failures)
+                self.opened_at = time.time()
+
+    def state(self):
+        return {'state': 'closed' if self.opened_at is None else 'open', 'failures': self.failures}
+
+DB_ERRORS = (sqlite3.Error, psycopg2.Error)
+INTEGRITY_ERRORS = (sqlite3.IntegrityError, psycopg2.IntegrityError)
+
+def is_transient(error):
+    """Errors worth retrying: lost connections, serialization failures and deadlocks, SQLite lock waits."""
+    if isinstance(error, sqlite3.OperationalError):
+        return 'locked' in str(error)
+    if isinstance(error, psycopg2.extensions.QueryCanceledError):
+        return False
+    return isinstance(error, (psycopg2.OperationalError, psycopg2.InterfaceError))
+
+def is_outage(error):
+    """Failures that count against the circuit breaker; a serialization failure means the server is fine."""
+    return (isinstance(error, (psycopg2.OperationalError, psycopg2.InterfaceError))
+            and not isinstance(error, psycopg2.extensions.TransactionRollbackError))
+
+def current_shard():
+    """Shard that get_db() talks to; login_required switches it to the user's shard."""
+    return g.get('_shard', GLOBAL_SHARD)
+
+@contextmanager
+def on_shard(shard):
+    previous = current_shard()
+    g._shard = shard
+    try:
+        yield shard
+    finally:
+        g._shard = previous
+
+def each_shard():
+    """Loop over every shard with get_db() pointed at it."""
+    for shard in range(len(SHARDS)):
+        with on_shard(shard):
+            yield shard
+
+def uses_global_shard(f):
+    """Run ``f`` against shard 0, where the cross-tenant tables live."""
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        with on_shard(GLOBAL_SHARD):
+            return f(*args, **kwargs)
+    return wrapper
 
-🔄 Mixed format:
-   Fitness = Morning Run, Gym Session
-   Fitness: Yoga | Meditation
-   - Healthy Cooking`;
-            alert(examples);
-        }
+db_breakers = [CircuitBreaker(DB_BREAKER_THRESHOLD, DB_BREAKER_RESET) for shard in SHARDS]
+db_pools = {}
+db_pools_lock = threading.Lock()
+
+def connection_pool(shard):
+    """The shard's PostgreSQL connection pool, created on first use."""
+    with db_pools_lock:
+        if shard not in db_pools:
+            db_pools[shard] = psycopg2.pool.ThreadedConnectionPool(
+                0, DB_POOL_SIZE, SHARDS[shard], connection_factory=PGConnection, cursor_factory=PGCursor,
+                connect_timeout=DB_CONNECT_TIMEOUT, options=f'-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}')
+        return db_pools[shard]
+
+def pool_stats():
+    """Connections in use and idle in each shard's pool that has been created so far."""
+    with db_pools_lock:
+        return {shard: {'in_use': len(pool._used), 'idle': len(pool._pool), 'maxsize': pool.maxconn}
+                for shard, pool in db_pools.items()}
+
+def release_connection(shard, db, broken=False):
+    """Hand a connection back to its shard's pool, or close it if it isn't pooled (shard None) or is broken."""
+    if shard is not None and DB_POOL_SIZE and not DEBUG:
+        try:
+            if not broken:
+                db.rollback()
+        except DB_ERRORS:
+            broken = True
+        connection_pool(shard).putconn(db, close=broken or bool(db.closed))
+    else:
+        db.close()
+    process_stats.incr('db_connections_open', -1)
 
-        async function markTaskDone(taskId) {
-            try {
-                const response = await fetch('/mark_done', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ id: taskId })
-                });
-                const result = await response.json();
-                if (result.ok) {
-                    const taskCard = document.getElementById('task-' + taskId);
-                    taskCard.style.animation = 'pulse 0.5s ease';
-                    setTimeout(() => {
-                        location.reload();
-                    }, 500);
-                } else {
-                    alert('Error: ' + result.error);
-                }
-            } catch (error) {
-                alert('An error occurred. Please try again.');
-            }
-        }
+def get_db(shard=None):
+    """Connection to ``shard``, by default the current one; one per shard per app context."""
+    shard = current_shard() if shard is None else shard
+    databases = g.setdefault('_databases', {})
+    db = databases.get(shard)
+    if db is None:
+        if not db_breakers[shard].allow():
+            raise DatabaseUnavailable(f'circuit open for shard {shard}')
+        try:
+            if DEBUG:
+                db = sqlite3.connect(SHARDS[shard], factory=SQLiteConnection, timeout=DB_STATEMENT_TIMEOUT_MS / 1000)
+                db.row_factory = sqlite3.Row
+            elif DB_POOL_SIZE:
+                db = connection_pool(shard).getconn()
+            else:
+                db = psycopg2.connect(SHARDS[shard], connection_factory=PGConnection, cursor_factory=PGCursor,
+                                      connect_timeout=DB_CONNECT_TIMEOUT,
+                                      options=f'-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}')
+        except psycopg2.pool.PoolError as e:
+            # Every pooled connection is in use; the database itself is fine
+            raise DatabaseUnavailable(str(e)) from e
+        except DB_ERRORS as e:
+            db_breakers[shard].record_failure()
+            raise DatabaseUnavailable(str(e)) from e
+        databases[shard] = db
+        process_stats.incr('db_connections_open')
+        process_stats.incr('db_connections_opened')
+    return db
 
-        async function undoTask(taskId) {
-            try {
-                const response = await fetch('/unset_done', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ id: taskId })
-                });
-                if (response.ok) {
-                    const taskCard = document.getElementById('task-' + taskId);
-                    taskCard.style.animation = 'pulse 0.5s ease';
-                    setTimeout(() => {
-                        location.reload();
-                    }, 500);
-                }
-            } catch (error) {
-                alert('An error occurred. Please try again.');
-            }
-        }
+def get_read_db():
+    """Connection for plain reads: the replica inside use_replica views on shard 0, else the primary."""
+    if (not DATABASE_READ_URL or not g.get('_use_replica') or current_shard() != GLOBAL_SHARD
+            or request.cookies.get(READ_PIN_COOKIE)):
+        return get_db()
+    db = getattr(g, '_read_database', None)
+    if db is None:
+        try:
+            db = psycopg2.connect(DATABASE_READ_URL, connection_factory=PGConnection, cursor_factory=PGCursor,
+                                  connect_timeout=DB_CONNECT_TIMEOUT,
+                                  options=f'-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}')
+        except psycopg2.OperationalError as e:
+            log_event(db_log, logging.WARNING, event='replica_unavailable', error=str(e))
+            g._use_replica = False
+            return get_db()
+        db.set_session(readonly=True)
+        g._read_database = db
+        process_stats.incr('db_connections_open')
+        process_stats.incr('db_replica_connections_opened')
+    return db
 
-        function toggleEdit(taskId) {
-            const editForm = document.getElementById('edit-form-' + taskId);
-            if (editForm.style.display === 'block') {
-                editForm.style.display = 'none';
-            } else {
-                editForm.style.display = 'block';
-            }
-        }
+def use_replica(f):
+    """Let a view's fetch_* and iter_query reads go to DATABASE_READ_URL.
 
-        // Add floating animation to stats cards
-        document.addEventListener('DOMContentLoaded', () => {
-            const stats = document.querySelectorAll('.stat-card');
-            stats.forEach((stat, index) => {
-                stat.style.animationDelay = `${index * 0.2}s`;
-            });
-        });
-    </script>
-</body>
-</html>
-"""
-
-TPL_FOOTER = """
-<footer class="app-footer">
-    <div class="footer-content">
-        <div class="footer-brand">
-            <h3>🚀 Roadmap App</h3>
-            <p>Transform your goals into actionable roadmaps. Organize tasks, track progress, and achieve more with our intuitive planning platform.</p>
-        </div>
-        
-        <div class="footer-links">
-            <h4>Quick Links</h4>
-            <ul>
-                <li><a href="{{ url_for('dashboard') }}"><i class="fas fa-home"></i> Dashboard</a></li>
-                <li><a href="{{ url_for('login') }}"><i class="fas fa-sign-in-alt"></i> Login</a></li>
-                <li><a href="{{ url_for('register') }}"><i class="fas fa-user-plus"></i> Register</a></li>
-            </ul>
-        </div>
-        
-        <div class="footer-links">
-            <h4>Connect</h4>
-            <ul>
-                <li><a href="{{ portfolio_url }}" target="_blank"><i class="fas fa-briefcase"></i> Portfolio</a></li>
-                <li><a href="{{ github_url }}" target="_blank"><i class="fab fa-github"></i> GitHub</a></li>
-                <li><a href="{{ linkedin_url }}" target="_blank"><i class="fab fa-linkedin"></i> LinkedIn</a></li>
-                <li><a href="mailto:{{ contact_email }}"><i class="fas fa-envelope"></i> Contact</a></li>
-            </ul>
-        </div>
-    </div>
-    
-    <div class="footer-bottom">
-        <div>
-            <p>© 2024 Roadmap App. Built with <i class="fas fa-heart" style="color: #ef4444;"></i> using Flask & PostgreSQL</p>
-            <p>Server Time: <span class="current-date">{{ current_date }}</span></p>
-        </div>
-        
-        <div class="footer-social">
-            <a href="{{ github_url }}" target="_blank" title="GitHub">
-                <i class="fab fa-github"></i>
-            </a>
-            <a href="{{ linkedin_url }}" target="_blank" title="LinkedIn">
-                <i class="fab fa-linkedin"></i>
-            </a>
-            <a href="mailto:{{ contact_email }}" title="Email">
-                <i class="fas fa-envelope"></i>
-            </a>
-        </div>
-    </div>
-</footer>
-"""
-
-TPL_LOGIN = """
-<div class="glass-card" style="max-width: 420px; margin: 80px auto;">
-    <div style="text-align: center; margin-bottom: 30px;">
-        <h2 style="font-size: 2rem; margin-bottom: 8px;">Welcome Back</h2>
-        <p style="color: var(--text-secondary);">Sign in to your roadmap dashboard</p>
-    </div>
-    
-    {% with messages = get_flashed_messages(with_categories=true) %}
-        {% if messages %}
-            {% for category, message in messages %}
-                <div class="alert alert-{{ 'error' if category == 'error' else 'success' if category == 'success' else 'warning' if category == 'warning' else 'info' }}">
-                    <i class="fas fa-{% if category == 'error' %}exclamation-circle{% elif category == 'success' %}check-circle{% elif category == 'warning' %}exclamation-triangle{% else %}info-circle{% endif %}"></i>
-                    {{ message }}
-                </div>
-            {% endfor %}
-        {% endif %}
-    {% endwith %}
-    
-    <form method="post">
-        <div class="form-group">
-            <div style="position: relative;">
-                <i class="fas fa-user" style="position: absolute; left: 18px; top: 50%; transform: translateY(-50%); color: var(--text-muted);"></i>
-                <input type="text" name="username" class="form-control" placeholder="Username" style="padding-left: 45px;" required>
-            </div>
-        </div>
-        <div class="form-group">
-            <div style="position: relative;">
-                <i class="fas fa-lock" style="position: absolute; left: 18px; top: 50%; transform: translateY(-50%); color: var(--text-muted);"></i>
-                <input type="password" name="password" class="form-control" placeholder="Password" style="padding-left: 45px;" required>
-            </div>
-        </div>
-        <button type="submit" class="btn" style="width: 100%;">
-            <i class="fas fa-sign-in-alt"></i> Sign In
-        </button>
-    </form>
-    
-    <div style="text-align: center; margin-top: 25px; padding-top: 20px; border-top: 1px solid rgba(255,255,255,0.1);">
-        <p style="color: var(--text-secondary); margin-bottom: 15px;">
-            <a href="{{ url_for('forgot') }}" style="color: var(--accent-primary); text-decoration: none;">
-                <i class="fas fa-key"></i> Forgot password?
-            </a>
-        </p>
-        <p style="color: var(--text-secondary);">
-            Don't have an account? 
-            <a href="{{ url_for('register') }}" style="color: var(--accent-primary); text-decoration: none; font-weight: 600;">
-                Create one here
-            </a>
-        </p>
-    </div>
-</div>
-"""
-
-TPL_REGISTER = """
-<div class="glass-card" style="max-width: 420px; margin: 80px auto;">
-    <div style="text-align: center; margin-bottom: 30px;">
-        <h2 style="font-size: 2rem; margin-bottom: 8px;">Create Account</h2>
-        <p style="color: var(--text-secondary);">Join us and start organizing your roadmaps</p>
-    </div>
-    
-    {% with messages = get_flashed_messages(with_categories=true) %}
-        {% if messages %}
-            {% for category, message in messages %}
-                <div class="alert alert-{{ 'error' if category == 'error' else 'success' if category == 'success' else 'warning' if category == 'warning' else 'info' }}">
-                    <i class="fas fa-{% if category == 'error' %}exclamation-circle{% elif category == 'success' %}check-circle{% elif category == 'warning' %}exclamation-triangle{% else %}info-circle{% endif %}"></i>
-                    {{ message }}
-                </div>
-            {% endfor %}
-        {% endif %}
-    {% endwith %}
-    
-    <form method="post">
-        <div class="form-group">
-            <div style="position: relative;">
-                <i class="fas fa-user" style="position: absolute; left: 18px; top: 50%; transform: translateY(-50%); color: var(--text-muted);"></i>
-                <input type="text" name="username" class="form-control" placeholder="Username" style="padding-left: 45px;" required>
-            </div>
-        </div>
-        <div class="form-group">
-            <div style="position: relative;">
-                <i class="fas fa-lock" style="position: absolute; left: 18px; top: 50%; transform: translateY(-50%); color: var(--text-muted);"></i>
-                <input type="password" name="password" class="form-control" placeholder="Password" style="padding-left: 45px;" required>
-            </div>
-        </div>
-        <div class="form-group">
-            <div style="position: relative;">
-                <i class="fas fa-question-circle" style="position: absolute; left: 18px; top: 50%; transform: translateY(-50%); color: var(--text-muted);"></i>
-                <input type="text" name="secret_q" class="form-control" placeholder="Secret question (e.g. Your middle name?)" style="padding-left: 45px;" required>
-            </div>
-        </div>
-        <div class="form-group">
-            <div style="position: relative;">
-                <i class="fas fa-key" style="position: absolute; left: 18px; top: 50%; transform: translateY(-50%); color: var(--text-muted);"></i>
-                <input type="text" name="secret_a" class="form-control" placeholder="Answer to secret question" style="padding-left: 45px;" required>
-            </div>
-        </div>
-        <button type="submit" class="btn" style="width: 100%;">
-            <i class="fas fa-user-plus"></i> Create Account
-        </button>
-    </form>
-    
-    <div style="text-align: center; margin-top: 25px; padding-top: 20px; border-top: 1px solid rgba(255,255,255,0.1);">
-        <p style="color: var(--text-secondary);">
-            Already have an account? 
-            <a href="{{ url_for('login') }}" style="color: var(--accent-primary); text-decoration: none; font-weight: 600;">
-                Sign in here
-            </a>
-        </p>
-    </div>
-</div>
-"""
-
-TPL_FORGOT = """
-<div class="glass-card" style="max-width: 420px; margin: 80px auto;">
-    <div style="text-align: center; margin-bottom: 30px;">
-        <h2 style="font-size: 2rem; margin-bottom: 8px;">Forgot Password</h2>
-        <p style="color: var(--text-secondary);">Enter your username to recover your account</p>
-    </div>
-    
-    {% with messages = get_flashed_messages(with_categories=true) %}
-        {% if messages %}
-            {% for category, message in messages %}
-                <div class="alert alert-{{ 'error' if category == 'error' else 'success' if category == 'success' else 'warning' if category == 'warning' else 'info' }}">
-                    <i class="fas fa-{% if category == 'error' %}exclamation-circle{% elif category == 'success' %}check-circle{% elif category == 'warning' %}exclamation-triangle{% else %}info-circle{% endif %}"></i>
-                    {{ message }}
-                </div>
-            {% endfor %}
-        {% endif %}
-    {% endwith %}
-    
-    <form method="post">
-        <div class="form-group">
-            <div style="position: relative;">
-                <i class="fas fa-user" style="position: absolute; left: 18px; top: 50%; transform: translateY(-50%); color: var(--text-muted);"></i>
-                <input type="text" name="username" class="form-control" placeholder="Enter username" style="padding-left: 45px;" required>
-            </div>
-        </div>
-        <button type="submit" class="btn" style="width: 100%;">
-            <i class="fas fa-arrow-right"></i> Continue
-        </button>
-    </form>
-    
-    <div style="text-align: center; margin-top: 25px; padding-top: 20px; border-top: 1px solid rgba(255,255,255,0.1);">
-        <p style="color: var(--text-secondary);">
-            Remember your password? 
-            <a href="{{ url_for('login') }}" style="color: var(--accent-primary); text-decoration: none; font-weight: 600;">
-                Back to login
-            </a>
-        </p>
-    </div>
-</div>
-"""
-
-TPL_FORGOT_Q = """
-<div class="glass-card" style="max-width: 420px; margin: 80px auto;">
-    <div style="text-align: center; margin-bottom: 30px;">
-        <h2 style="font-size: 2rem; margin-bottom: 8px;">Answer Secret Question</h2>
-        <p style="color: var(--text-secondary);">Please answer your security question to reset your password</p>
-    </div>
-    
-    <div style="background: rgba(255,255,255,0.05); padding: 20px; border-radius: 12px; margin-bottom: 25px; text-align: center;">
-        <h4 style="color: var(--accent-primary); margin-bottom: 10px;">Your Question:</h4>
-        <p style="color: var(--text-primary); font-weight: 500;">{{ question }}</p>
-    </div>
-    
-    {% with messages = get_flashed_messages(with_categories=true) %}
-        {% if messages %}
-            {% for category, message in messages %}
-                <div class="alert alert-{{ 'error' if category == 'error' else 'success' if category == 'success' else 'warning' if category == 'warning' else 'info' }}">
-                    <i class="fas fa-{% if category == 'error' %}exclamation-circle{% elif category == 'success' %}check-circle{% elif category == 'warning' %}exclamation-triangle{% else %}info-circle{% endif %}"></i>
-                    {{ message }}
-                </div>
-            {% endfor %}
-        {% endif %}
-    {% endwith %}
-    
-    <form method="post" action="{{ url_for('reset') }}">
-        <div class="form-group">
-            <div style="position: relative;">
-                <i class="fas fa-key" style="position: absolute; left: 18px; top: 50%; transform: translateY(-50%); color: var(--text-muted);"></i>
-                <input type="text" name="answer" class="form-control" placeholder="Your answer" style="padding-left: 45px;" required>
-            </div>
-        </div>
-        <div class="form-group">
-            <div style="position: relative;">
-                <i class="fas fa-lock" style="position: absolute; left: 18px; top: 50%; transform: translateY(-50%); color: var(--text-muted);"></i>
-                <input type="password" name="newpass" class="form-control" placeholder="New password" style="padding-left: 45px;" required>
-            </div>
-        </div>
-        <button type="submit" class="btn" style="width: 100%;">
-            <i class="fas fa-redo"></i> Reset Password
-        </button>
-    </form>
-</div>
-"""
-
-TPL_DASHBOARD = """
-<div class="header">
-    <div>
-        <h1 class="welcome-text">{{ username }}'s Roadmap</h1>
-        <p class="subtitle">Organize your goals and track your progress</p>
-    </div>
-    <a href="{{ url_for('logout') }}" class="btn btn-secondary">
-        <i class="fas fa-sign-out-alt"></i> Logout
-    </a>
-</div>
-
-{% with messages = get_flashed_messages(with_categories=true) %}
-    {% if messages %}
-        {% for category, message in messages %}
-            <div class="alert alert-{{ 'error' if category == 'error' else 'success' if category == 'success' else 'warning' if category == 'warning' else 'info' }}">
-                <i class="fas fa-{% if category == 'error' %}exclamation-circle{% elif category == 'success' %}check-circle{% elif category == 'warning' %}exclamation-triangle{% else %}info-circle{% endif %}"></i>
-                {{ message }}
-            </div>
-        {% endfor %}
-    {% endif %}
-{% endwith %}
-
-<div class="stats-grid">
-    <div class="stat-card">
-        <h3>Total Tasks</h3>
-        <p style="font-size: 2.5rem; font-weight: bold; margin: 10px 0;">{{ total_tasks }}</p>
-        <small>All your active tasks</small>
-    </div>
-    <div class="stat-card success">
-        <h3>Completed</h3>
-        <p style="font-size: 2.5rem; font-weight: bold; margin: 10px 0;">{{ completed_tasks }}</p>
-        <small>Tasks marked as done</small>
-    </div>
-    <div class="stat-card" style="background: linear-gradient(135deg, #f59e0b, #d97706);">
-        <h3>Progress</h3>
-        <p style="font-size: 2.5rem; font-weight: bold; margin: 10px 0;">
-            {{ (completed_tasks / total_tasks * 100)|round|int if total_tasks > 0 else 0 }}%
-        </p>
-        <small>Overall completion</small>
-    </div>
-</div>
-
-<div class="dashboard-grid">
-    <!-- Categories Sidebar -->
-    <div class="categories-sidebar">
-        <h3 style="margin-bottom: 20px; color: var(--text-primary);">
-            <i class="fas fa-map"></i> Your Roadmaps
-        </h3>
-        
-        <div class="glass-card" style="margin-bottom: 20px;">
-            <h4 style="margin-bottom: 15px; color: var(--text-primary);">
-                <i class="fas fa-plus"></i> Add New Roadmap
-            </h4>
-            <form method="post" action="{{ url_for('add_category') }}">
-                <div class="form-group">
-                    <input type="text" name="name" class="form-control" placeholder="Roadmap name (e.g., Study Plan)" required>
-                </div>
-                <div class="form-group">
-                    <textarea name="description" class="form-control" placeholder="Description (optional)" rows="2"></textarea>
-                </div>
-                <div class="form-group">
-                    <label style="display: block; margin-bottom: 8px; font-weight: 500; color: var(--text-secondary);">
-                        <i class="fas fa-palette"></i> Color:
-                    </label>
-                    <input type="color" name="color" value="#6366f1" style="width: 100%; height: 45px; border-radius: 10px; border: 2px solid rgba(255, 255, 255, 0.1); background: rgba(255, 255, 255, 0.05);">
-                </div>
-                <button type="submit" class="btn" style="width: 100%;">
-                    <i class="fas fa-plus-circle"></i> Create Roadmap
-                </button>
-            </form>
-        </div>
-
-        {% if categories %}
-            <h4 style="margin-bottom: 15px; color: var(--text-primary);">
-                <i class="fas fa-list"></i> Your Roadmaps
-            </h4>
-            {% for category in categories %}
-                <div class="category-item" style="border-left-color: {{ category.color }};">
-                    <div style="display: flex; justify-content: space-between; align-items: flex-start;">
-                        <div style="flex: 1;">
-                            <strong style="color: var(--text-primary);">{{ category.name }}</strong>
-                            {% if category.description %}
-                                <p style="margin: 5px 0 0 0; font-size: 12px; color: var(--text-muted);">{{ category.description }}</p>
-                            {% endif %}
-                        </div>
-                        <form method="post" action="{{ url_for('delete_category', cid=category.id) }}" style="display: inline; margin-left: 10px;">
-                            <button type="submit" class="btn btn-danger btn-small" onclick="return confirm('Delete this roadmap and all its tasks?')">
-                                <i class="fas fa-times"></i>
-                            </button>
-                        </form>
-                    </div>
-                </div>
-            {% endfor %}
-        {% else %}
-            <div style="text-align: center; padding: 30px; color: var(--text-muted);">
-                <i class="fas fa-map-marked-alt" style="font-size: 3rem; margin-bottom: 15px; opacity: 0.5;"></i>
-                <p>No roadmaps yet. Create your first one!</p>
-            </div>
-        {% endif %}
-    </div>
-
-    <!-- Main Content -->
-    <div>
-        <div class="tab-buttons">
-            <button class="tab-button active" onclick="switchTab('single')">
-                <i class="fas fa-plus-circle"></i> Add Single Task
-            </button>
-            <button class="tab-button" onclick="switchTab('bulk')">
-                <i class="fas fa-bolt"></i> Bulk Import
-            </button>
-        </div>
-
-        <div id="single-tab" class="tab-content active">
-            <div class="glass-card">
-                <h3 style="margin-bottom: 15px; color: var(--text-primary);">
-                    <i class="fas fa-tasks"></i> Add New Task
-                </h3>
-                <form method="post" action="{{ url_for('add_task') }}">
-                    <div class="form-group">
-                        <input type="text" name="title" class="form-control" placeholder="Task title" required>
-                    </div>
-                    <div class="form-group">
-                        <textarea name="notes" class="form-control" placeholder="Notes (optional)" rows="3"></textarea>
-                    </div>
-                    <div class="form-group">
-                        <select name="category_id" class="form-control">
-                            <option value="">No Roadmap (General)</option>
-                            {% for category in categories %}
-                                <option value="{{ category.id }}">{{ category.name }}</option>
-                            {% endfor %}
-                        </select>
-                    </div>
-                    <button type="submit" class="btn">
-                        <i class="fas fa-plus"></i> Add Task
-                    </button>
-                </form>
-            </div>
-        </div>
-
-        <div id="bulk-tab" class="tab-content">
-            <div class="glass-card">
-                <h3 style="margin-bottom: 15px; color: var(--text-primary);">
-                    <i class="fas fa-bolt"></i> Bulk Import Tasks
-                </h3>
-                <form method="post" action="{{ url_for('bulk_import') }}">
-                    <div class="form-group">
-                        <textarea name="bulk_text" class="form-control" placeholder="Paste your roadmap here...&#10;&#10;Examples:&#10;Web Development = HTML Basics, CSS Styling, JavaScript&#10;Data Science: Python | Pandas | Machine Learning&#10;- Math Homework&#10;- Physics Lab" rows="8" required></textarea>
-                    </div>
-                    <div style="display: flex; gap: 10px; align-items: center; flex-wrap: wrap;">
-                        <button type="submit" class="btn btn-info">
-                            <i class="fas fa-upload"></i> Import Roadmap
-                        </button>
-                        <button type="button" class="btn btn-secondary" onclick="showImportExamples()">
-                            <i class="fas fa-question-circle"></i> Format Examples
-                        </button>
-                    </div>
-                </form>
-                <div class="import-example">
-                    <strong><i class="fas fa-lightbulb"></i> Supported formats:</strong><br>
-                    • <code>Category = Task1, Task2, Task3</code><br>
-                    • <code>Category: Task1 | Task2 | Task3</code><br>
-                    • Bullet points with <code>- Task</code> or <code>* Task</code>
-                </div>
-            </div>
-        </div>
-
-        <h2 style="margin-bottom: 20px; color: var(--text-primary); margin-top: 30px;">
-            <i class="fas fa-list-check"></i> Your Tasks
-        </h2>
-        {% if tasks %}
-            <div class="task-grid">
-                {% for t in tasks %}
-                    <div class="task-card {% if t['done'] %}done{% endif %}" id="task-{{ t['id'] }}">
-                        {% if t['category_name'] %}
-                            <div class="category-badge">
-                                <i class="fas fa-tag"></i> {{ t['category_name'] }}
-                            </div>
-                        {% endif %}
-                        <div class="task-title" style="font-weight: 600; margin-bottom: 10px; font-size: 1.1rem; color: var(--text-primary);">{{ t['title'] }}</div>
-                        {% if t['notes'] %}
-                            <div style="color: var(--text-secondary); margin-bottom: 12px; line-height: 1.5;">{{ t['notes'] }}</div>
-                        {% endif %}
-                        {% if t['done'] %}
-                            <div style="color: var(--accent-success); font-size: 0.9rem; margin-bottom: 12px; display: flex; align-items: center; gap: 6px;">
-                                <i class="fas fa-check-circle"></i>
-                                {% if t.done_at %}
-                                    Completed at {{ t.done_at[:16] }}
-                                {% else %}
-                                    Completed
-                                {% endif %}
-                            </div>
-                        {% else %}
-                            <div style="color: var(--text-muted); font-size: 0.9rem; margin-bottom: 12px; display: flex; align-items: center; gap: 6px;">
-                                <i class="fas fa-clock"></i>
-                                {% if t.created_at %}
-                                    Created: {{ t.created_at[:16] }}
-                                {% else %}
-                                    Created: Recently
-                                {% endif %}
-                            </div>
-                        {% endif %}
-                        <div class="task-actions">
-                            {% if t['done'] %}
-                                <button onclick="undoTask({{ t['id'] }})" class="btn btn-secondary btn-small">
-                                    <i class="fas fa-undo"></i> Undo
-                                </button>
-                            {% else %}
-                                <button onclick="markTaskDone({{ t['id'] }})" class="btn btn-success btn-small">
-                                    <i class="fas fa-check"></i> Mark Done
-                                </button>
-                                <button onclick="toggleEdit({{ t['id'] }})" class="btn btn-small">
-                                    <i class="fas fa-edit"></i> Edit
-                                </button>
-                            {% endif %}
-                            <form method="post" action="{{ url_for('delete_task', tid=t['id']) }}" style="display: inline;">
-                                <button type="submit" class="btn btn-danger btn-small" onclick="return confirm('Are you sure you want to delete this task?')">
-                                    <i class="fas fa-trash"></i> Delete
-                                </button>
-                            </form>
-                        </div>
-                        <div id="edit-form-{{ t['id'] }}" class="edit-form">
-                            <form method="post" action="{{ url_for('edit_task', tid=t['id']) }}">
-                                <div class="form-group">
-                                    <input type="text" name="title" class="form-control" value="{{ t['title'] }}" required>
-                                </div>
-                                <div class="form-group">
-                                    <textarea name="notes" class="form-control" rows="3">{{ t['notes'] or '' }}</textarea>
-                                </div>
-                                <div class="form-group">
-                                    <select name="category_id" class="form-control">
-                                        <option value="">No Roadmap (General)</option>
-                                        {% for category in categories %}
-                                            <option value="{{ category.id }}" {% if t.category_id == category.id %}selected{% endif %}>
-                                                {{ category.name }}
-                                            </option>
-                                        {% endfor %}
-                                    </select>
-                                </div>
-                                <div style="display: flex; gap: 10px;">
-                                    <button type="submit" class="btn">
-                                        <i class="fas fa-save"></i> Save Changes
-                                    </button>
-                                    <button type="button" class="btn btn-secondary" onclick="toggleEdit({{ t['id'] }})">
-                                        <i class="fas fa-times"></i> Cancel
-                                    </button>
-                                </div>
-                            </form>
-                        </div>
-                    </div>
-                {% endfor %}
-            </div>
-        {% else %}
-            <div class="glass-card" style="text-align: center; padding: 50px 30px;">
-                <i class="fas fa-tasks" style="font-size: 4rem; color: var(--text-muted); margin-bottom: 20px; opacity: 0.5;"></i>
-                <h3 style="color: var(--text-muted); margin-bottom: 15px;">No tasks yet</h3>
-                <p style="color: var(--text-secondary);">Start by adding your first task above!</p>
-            </div>
-        {% endif %}
-    </div>
-</div>
-"""
-
-TPL_404 = """
-<div class="glass-card" style="text-align: center; max-width: 500px; margin: 100px auto; padding: 50px 30px;">
-    <i class="fas fa-compass" style="font-size: 4rem; color: var(--accent-primary); margin-bottom: 20px;"></i>
-    <h1 style="font-size: 4rem; color: var(--accent-primary); margin-bottom: 20px;">404</h1>
-    <h2 style="margin-bottom: 20px; color: var(--text-primary);">Page Not Found</h2>
-    <p style="margin-bottom: 30px; color: var(--text-secondary);">The page you're looking for doesn't exist or has been moved.</p>
-    <a href="{{ url_for('dashboard') }}" class="btn">
-        <i class="fas fa-home"></i> Go to Dashboard
-    </a>
-</div>
-"""
-
-TPL_500 = """
-<div class="glass-card" style="text-align: center; max-width: 500px; margin: 100px auto; padding: 50px 30px;">
-    <i class="fas fa-exclamation-triangle" style="font-size: 4rem; color: var(--accent-danger); margin-bottom: 20px;"></i>
-    <h1 style="font-size: 4rem; color: var(--accent-danger); margin-bottom: 20px;">500</h1>
-    <h2 style="margin-bottom: 20px; color: var(--text-primary);">Internal Server Error</h2>
-    <p style="margin-bottom: 30px; color: var(--text-secondary);">Something went wrong on our end. Please try again later.</p>
-    <a href="{{ url_for('dashboard') }}" class="btn">
-        <i class="fas fa-home"></i> Go to Dashboard
-    </a>
-</div>
-"""
+    Writes always use get_db() and so stay on the primary.
+    """
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        g._use_replica = True
+        return f(*args, **kwargs)
+    return wrapper
 
-# ---------- DB Helpers ----------
-def get_db():
-    db = getattr(g, '_database', None)
-    if db is None:
-        if DEBUG:
-            db = g._database = sqlite3.connect(DATABASE_PATH)
-            db.row_factory = sqlite3.Row
-        else:
-            db = g._database = psycopg2.connect(DATABASE_URL)
-    return db
+@app.after_request
+def pin_writes_to_primary(response):
+    if DATABASE_READ_URL and request.method not in ('GET', 'HEAD', 'OPTIONS'):
+        response.set_cookie(READ_PIN_COOKIE, '1', max_age=READ_YOUR_WRITES_WINDOW, httponly=True,
+                            secure=app.config['SESSION_COOKIE_SECURE'], samesite='Lax')
+    return response
 
 @app.teardown_appcontext
 def close_connection(exception):
-    db = getattr(g, '_database', None)
-    if db is not None:
-        db.close()
+    for shard, db in g.pop('_databases', {}).items():
+        release_connection(shard, db)
+    if '_read_database' in g:
+        release_connection(None, g.pop('_read_database'))
 
 def init_db():
+    """Create the schema on every shard and index every shard's existing share links."""
+    for shard in each_shard():
+        create_schema()
+    tokens = []
+    for shard in each_shard():
+        tokens.extend((row['token'], row['user_id']) for row in fetch_all('SELECT token, user_id FROM share_snapshots'))
+    db = get_db(GLOBAL_SHARD)
+    cur = db.cursor()
+    cur.executemany('INSERT INTO share_tokens(token, user_id) VALUES(%s,%s) ON CONFLICT(token) DO NOTHING', tokens)
+    db.commit()
+
+def create_schema():
     db = get_db()
     cur = db.cursor()
     
@@ -1306,10 +635,47 @@ def init_db():
             notes TEXT,
             done BOOLEAN DEFAULT FALSE,
             done_at TIMESTAMP,
+            position REAL,
+            due_at TIMESTAMP,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
             FOREIGN KEY(category_id) REFERENCES categories(id) ON DELETE SET NULL
         )''')
+
+        cur.execute('''CREATE TABLE IF NOT EXISTS sessions (
+            id TEXT PRIMARY KEY,
+            user_id INTEGER,
+            data TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+        )''')
+
+        cur.execute('''CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            task_id INTEGER,
+            category_id INTEGER,
+            amount INTEGER NOT NULL DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+        )''')
+
+        cur.execute('''CREATE TABLE IF NOT EXISTS archived_tasks (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            category_id INTEGER,
+            title TEXT NOT NULL,
+            notes TEXT,
+            done BOOLEAN DEFAULT TRUE,
+            done_at TIMESTAMP,
+            position REAL,
+            due_at TIMESTAMP,
+            created_at TIMESTAMP,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY(category_id) REFERENCES categories(id) ON DELETE SET NULL
+        )''')
     else:
         cur.execute('''CREATE TABLE IF NOT EXISTS users (
             id SERIAL PRIMARY KEY,
@@ -1338,21 +704,212 @@ def init_db():
             notes TEXT,
             done BOOLEAN DEFAULT FALSE,
             done_at TIMESTAMP,
+            position DOUBLE PRECISION,
+            due_at TIMESTAMP,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
             FOREIGN KEY(category_id) REFERENCES categories(id) ON DELETE SET NULL
         )''')
-    
+
+        cur.execute('''CREATE TABLE IF NOT EXISTS sessions (
+            id TEXT PRIMARY KEY,
+            user_id INTEGER,
+            data TEXT NOT NULL,
+            expires_at DOUBLE PRECISION NOT NULL,
+            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+        )''')
+
+        cur.execute('''CREATE TABLE IF NOT EXISTS events (
+            id SERIAL PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            task_id INTEGER,
+            category_id INTEGER,
+            amount INTEGER NOT NULL DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+        )''')
+
+        cur.execute('''CREATE TABLE IF NOT EXISTS archived_tasks (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            category_id INTEGER,
+            title TEXT NOT NULL,
+            notes TEXT,
+            done BOOLEAN DEFAULT TRUE,
+            done_at TIMESTAMP,
+            position DOUBLE PRECISION,
+            due_at TIMESTAMP,
+            created_at TIMESTAMP,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY(category_id) REFERENCES categories(id) ON DELETE SET NULL
+        )''')
+
+    cur.execute('''CREATE TABLE IF NOT EXISTS task_dependencies (
+        user_id INTEGER NOT NULL,
+        task_id INTEGER NOT NULL,
+        depends_on_id INTEGER NOT NULL,
+        PRIMARY KEY(task_id, depends_on_id),
+        FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
+        FOREIGN KEY(task_id) REFERENCES tasks(id) ON DELETE CASCADE,
+        FOREIGN KEY(depends_on_id) REFERENCES tasks(id) ON DELETE CASCADE
+    )''')
+
+    # One row per user, roadmap (0 for uncategorized) and UTC day, kept up to date by record_event()
+    cur.execute('''CREATE TABLE IF NOT EXISTS daily_stats (
+        user_id INTEGER NOT NULL,
+        category_id INTEGER NOT NULL DEFAULT 0,
+        day DATE NOT NULL,
+        created INTEGER NOT NULL DEFAULT 0,
+        completed INTEGER NOT NULL DEFAULT 0,
+        reopened INTEGER NOT NULL DEFAULT 0,
+        deleted INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY(user_id, category_id, day),
+        FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+    )''')
+
+    # Public snapshot of a shared roadmap; html is NULL until the current version is rendered
+    cur.execute('''CREATE TABLE IF NOT EXISTS share_snapshots (
+        token TEXT PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        category_id INTEGER NOT NULL UNIQUE,
+        version INTEGER NOT NULL DEFAULT 1,
+        html TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
+        FOREIGN KEY(category_id) REFERENCES categories(id) ON DELETE CASCADE
+    )''')
+
+    # Roadmaps published to the template library, keyed by their category
+    cur.execute('''CREATE TABLE IF NOT EXISTS roadmap_templates (
+        category_id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        clones INTEGER NOT NULL DEFAULT 0,
+        published_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
+        FOREIGN KEY(category_id) REFERENCES categories(id) ON DELETE CASCADE
+    )''')
+
+    # Responses to keyed form posts, so a double submit replays instead of re-running
+    cur.execute('''CREATE TABLE IF NOT EXISTS idempotency_keys (
+        user_id INTEGER NOT NULL,
+        idempotency_key TEXT NOT NULL,
+        endpoint TEXT NOT NULL,
+        response TEXT,
+        expires_at DOUBLE PRECISION NOT NULL,
+        PRIMARY KEY(user_id, idempotency_key),
+        FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+    )''')
+
+    # Outbox of due-date reminders, one per open task with a future due date;
+    # sent_at is set once the reminder has gone out
+    cur.execute('''CREATE TABLE IF NOT EXISTS reminders (
+        task_id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        remind_at DOUBLE PRECISION NOT NULL,
+        sent_at DOUBLE PRECISION,
+        FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
+        FOREIGN KEY(task_id) REFERENCES tasks(id) ON DELETE CASCADE
+    )''')
+
+    # Global tables, only used on shard 0: where each user's data lives, and
+    # which user owns each public share link
+    cur.execute('''CREATE TABLE IF NOT EXISTS user_shards (
+        user_id INTEGER PRIMARY KEY,
+        shard INTEGER NOT NULL,
+        FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+    )''')
+
+    cur.execute('''CREATE TABLE IF NOT EXISTS share_tokens (
+        token TEXT PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+    )''')
+
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions(user_id)')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions(expires_at)')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_categories_user ON categories(user_id)')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_tasks_category ON tasks(category_id)')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_task_dependencies_user ON task_dependencies(user_id)')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_tasks_done_at ON tasks(done_at) WHERE done')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_archived_tasks_user ON archived_tasks(user_id, category_id)')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_events_user ON events(user_id, created_at)')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_task_dependencies_depends_on ON task_dependencies(depends_on_id)')
+
+    # Databases created before manual ordering get positions in creation order
+    if add_column_if_missing(cur, 'tasks', 'position', 'REAL' if DEBUG else 'DOUBLE PRECISION'):
+        cur.execute('UPDATE tasks SET position = id * %s WHERE position IS NULL', (POSITION_GAP,))
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_tasks_category_position ON tasks(category_id, position)')
+
+    add_column_if_missing(cur, 'tasks', 'due_at', 'TIMESTAMP')
+    add_column_if_missing(cur, 'archived_tasks', 'due_at', 'TIMESTAMP')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_tasks_user_due ON tasks(user_id, due_at)')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_reminders_pending ON reminders(remind_at) WHERE sent_at IS NULL')
+
+    # Set while move-user copies a user's rows, so nobody can log in and write to the old shard
+    add_column_if_missing(cur, 'user_shards', 'moving', 'BOOLEAN DEFAULT FALSE')
+
     db.commit()
 
-def execute_query(query, params=()):
-    db = get_db()
+def add_column_if_missing(cur, table, column, definition):
+    """Add a column to an existing table; returns True if it was missing."""
     if DEBUG:
-        cur = db.cursor()
+        cur.execute(f'PRAGMA table_info({table})')
+        exists = any(row[1] == column for row in cur.fetchall())
+    else:
+        cur.execute('SELECT 1 FROM information_schema.columns WHERE table_name=%s AND column_name=%s',
+                    (table, column))
+        exists = cur.fetchone() is not None
+    if not exists:
+        cur.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+    return not exists
+
+def discard_connection(db):
+    """Roll back a failed transaction, or forget the connection if it is gone so get_db() reconnects."""
+    try:
+        db.rollback()
+        return
+    except DB_ERRORS:
+        pass
+    databases = g.get('_databases', {})
+    for shard in [shard for shard, open_db in databases.items() if open_db is db]:
+        release_connection(shard, databases.pop(shard), broken=True)
+    if g.get('_read_database') is db:
+        release_connection(None, g.pop('_read_database'), broken=True)
+
+def retry_read(execute):
+    """Run ``execute(db)`` for a read, retrying transient failures with jittered backoff.
+
+    A read is only retried while its transaction holds no writes, since
+    rolling back or reconnecting would silently drop them. Once retries run
+    out the request fails with DatabaseUnavailable.
+    """
+    shard = current_shard()
+    for attempt in range(DB_RETRY_ATTEMPTS):
+        db = get_read_db()
+        try:
+            result = execute(db)
+        except DB_ERRORS as e:
+            if is_outage(e):
+                db_breakers[shard].record_failure()
+            if not is_transient(e):
+                raise
+            if db.wrote or attempt + 1 == DB_RETRY_ATTEMPTS:
+                raise DatabaseUnavailable(str(e)) from e
+            log_event(db_log, logging.WARNING, event='query_retry', attempt=attempt + 1, error=str(e))
+            discard_connection(db)
+            time.sleep(random.uniform(0, DB_RETRY_BASE_DELAY * 2 ** attempt))
+        else:
+            db_breakers[shard].record_success()
+            return result
+
+def execute_query(query, params=()):
+    def execute(db):
+        cur = db.cursor() if DEBUG else db.cursor(cursor_factory=PGDictCursor)
         cur.execute(query, params)
         return cur
-    else:
-        return db.cursor(cursor_factory=RealDictCursor)
+    return retry_read(execute)
 
 def fetch_all(query, params=()):
     cur = execute_query(query, params)
@@ -1366,22 +923,413 @@ def fetch_one(query, params=()):
     cur.close()
     return result
 
+def iter_query(query, params=(), itersize=1000):
+    """Yield rows one at a time without materializing the result set.
+
+    PostgreSQL uses a named (server-side) cursor fetching ``itersize`` rows per
+    round trip; SQLite cursors already step through results lazily. The query
+    runs on the shard current at the call, even if the rows are only read once
+    the view has returned, as streamed responses do.
+    """
+    shard = current_shard()
+
+    def execute(db):
+        if DEBUG:
+            cur = db.cursor()
+        else:
+            cur = db.cursor(name=f'iter_{secrets.token_hex(8)}', cursor_factory=PGDictCursor)
+            cur.itersize = itersize
+        cur.execute(query, params)
+        return cur
+
+    def rows():
+        with on_shard(shard):
+            cur = retry_read(execute)
+        try:
+            for row in cur:
+                yield row
+        finally:
+            cur.close()
+    return rows()
+
+# ---------- Sessions ----------
+class LRUCache:
+    """Thread-safe LRU mapping whose entries also expire after ``ttl`` seconds."""
+    def __init__(self, maxsize, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl else float('inf')
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def discard_where(self, predicate):
+        with self._lock:
+            for key in [k for k, (value, _) in self._data.items() if predicate(value)]:
+                del self._data[key]
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'size': len(self), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None}
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, new=False, expires_at=0.0):
+        def on_update(self):
+            self.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.expires_at = expires_at
+        self.original_user_id = self.get('user_id')
+        self.modified = False
+
+class DatabaseSessionInterface(SessionInterface):
+    """Sessions kept in the ``sessions`` table behind a per-process LRU.
+
+    The cookie only carries a random session id, so deleting rows revokes
+    sessions. Cached entries are trusted for SESSION_CACHE_TTL seconds, which
+    bounds how long a revocation made by another worker takes to apply.
+    Expiry slides with activity but the row is only rewritten once every
+    SESSION_REFRESH_INTERVAL seconds.
+    """
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self):
+        self.cache = LRUCache(SESSION_CACHE_SIZE, SESSION_CACHE_TTL)
+        self._last_cleanup = time.time()
+
+    @uses_global_shard
+    def open_session(self, app, request):
+        # Public share pages are cached by browsers and CDNs, so they never touch the session
+        if request.path.startswith(SHARE_PATH):
+            return None
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            record = self.cache.get(sid)
+            if record is None:
+                row = fetch_one('SELECT user_id, data, expires_at FROM sessions WHERE id=%s', (sid,))
+                if row:
+                    record = {'user_id': row['user_id'], 'data': row['data'], 'expires_at': row['expires_at']}
+                    self.cache.set(sid, record)
+            if record and record['expires_at'] > time.time():
+                return ServerSideSession(self.serializer.loads(record['data']), sid=sid,
+                                         expires_at=record['expires_at'])
+        return ServerSideSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if not session.new:
+                self.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        # A login or logout gets a fresh id so a pre-login cookie can't be fixed on a victim
+        if not session.new and session.get('user_id') != session.original_user_id:
+            self.delete(session.sid)
+            session.sid = secrets.token_urlsafe(32)
+            session.new = True
+
+        now = time.time()
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        if session.new or session.modified:
+            self.store(session, now + lifetime)
+        elif session.expires_at - now < lifetime - SESSION_REFRESH_INTERVAL:
+            self.touch(session, now + lifetime)
+
+        if session.new or self.should_set_cookie(app, session):
+            response.set_cookie(name, session.sid,
+                                expires=self.get_expiration_time(app, session),
+                                httponly=self.get_cookie_httponly(app),
+                                domain=domain, path=path,
+                                secure=self.get_cookie_secure(app),
+                                samesite=self.get_cookie_samesite(app))
+
+        if now - self._last_cleanup > SESSION_CLEANUP_INTERVAL:
+            self._last_cleanup = now
+            cleanup_expired_sessions()
+
+    @uses_global_shard
+    def store(self, session, expires_at):
+        data = self.serializer.dumps(dict(session))
+        user_id = session.get('user_id')
+        db = get_db()
+        cur = db.cursor()
+        if session.new:
+            cur.execute('INSERT INTO sessions(id, user_id, data, expires_at) VALUES(%s,%s,%s,%s)',
+                        (session.sid, user_id, data, expires_at))
+        else:
+            # Another worker may have revoked it while this one still had it cached
+            cur.execute('UPDATE sessions SET user_id=%s, data=%s, expires_at=%s WHERE id=%s',
+                        (user_id, data, expires_at, session.sid))
+        db.commit()
+        if not cur.rowcount:
+            self.cache.pop(session.sid)
+            return
+        session.expires_at = expires_at
+        self.cache.set(session.sid, {'user_id': user_id, 'data': data, 'expires_at': expires_at})
+
+    @uses_global_shard
+    def touch(self, session, expires_at):
+        db = get_db()
+        cur = db.cursor()
+        cur.execute('UPDATE sessions SET expires_at=%s WHERE id=%s', (expires_at, session.sid))
+        db.commit()
+        if not cur.rowcount:
+            self.cache.pop(session.sid)
+            return
+        session.expires_at = expires_at
+        record = self.cache.get(session.sid)
+        if record is not None:
+            self.cache.set(session.sid, dict(record, expires_at=expires_at))
+
+    @uses_global_shard
+    def delete(self, sid):
+        db = get_db()
+        cur = db.cursor()
+        cur.execute('DELETE FROM sessions WHERE id=%s', (sid,))
+        db.commit()
+        self.cache.pop(sid)
+
+    @uses_global_shard
+    def revoke_user(self, user_id):
+        """Log a user out everywhere."""
+        db = get_db()
+        cur = db.cursor()
+        cur.execute('DELETE FROM sessions WHERE user_id=%s', (user_id,))
+        db.commit()
+        self.cache.discard_where(lambda record: record['user_id'] == user_id)
+
+@uses_global_shard
+def cleanup_expired_sessions():
+    db = get_db()
+    cur = db.cursor()
+    cur.execute('DELETE FROM sessions WHERE expires_at < %s', (time.time(),))
+    db.commit()
+    return cur.rowcount
+
+app.session_interface = DatabaseSessionInterface()
+
+@app.cli.command('cleanup-sessions')
+def cleanup_sessions_command():
+    """Delete expired rows from the sessions and idempotency_keys tables."""
+    print(f"Removed {cleanup_expired_sessions()} expired sessions")
+    print(f"Removed {sum(cleanup_idempotency_keys() for shard in each_shard())} expired idempotency keys")
+
 # ---------- Auth helpers ----------
+@uses_global_shard
 def current_user():
     if 'user_id' in session:
+        if 'username' in session:
+            return {'id': session['user_id'], 'username': session['username']}
         user = fetch_one('SELECT * FROM users WHERE id=%s', (session['user_id'],))
+        if user:
+            session['username'] = user['username']
         return user
     return None
 
 def login_required(f):
+    """Require a logged-in user and run the view against that user's shard."""
     @wraps(f)
     def wrapper(*args, **kwargs):
         if not current_user():
             flash('Please log in first.', 'warning')
             return redirect(url_for('login'))
-        return f(*args, **kwargs)
+        if 'shard' not in session:
+            if user_is_moving(session['user_id']):
+                session.clear()
+                flash(MOVING_MESSAGE, 'warning')
+                return redirect(url_for('login'))
+            session['shard'] = shard_for_user(session['user_id'])
+        with on_shard(session['shard']):
+            return f(*args, **kwargs)
     return wrapper
 
+MOVING_MESSAGE = 'Your account is being moved to another server. Please log in again in a minute.'
+
+@uses_global_shard
+def user_is_moving(user_id):
+    """True while move-user is copying this user's roadmaps to another shard."""
+    row = fetch_one('SELECT moving FROM user_shards WHERE user_id=%s', (user_id,))
+    return bool(row and row['moving'])
+
+@uses_global_shard
+def shard_for_user(user_id):
+    """Shard holding a user's roadmaps; users from before sharding have no row and stay on shard 0."""
+    row = fetch_one('SELECT shard FROM user_shards WHERE user_id=%s', (user_id,))
+    return row['shard'] if row else GLOBAL_SHARD
+
+def copy_user_to_shard(user_id, username, shard):
+    """Give ``shard`` a users row for ``user_id`` so its tenant tables' foreign keys hold.
+
+    The copy only carries the id and username; logins always check shard 0.
+    """
+    if shard == GLOBAL_SHARD:
+        return
+    db = get_db(shard)
+    cur = db.cursor()
+    cur.execute("INSERT INTO users(id, username, password) VALUES(%s,%s,'') ON CONFLICT DO NOTHING",
+               (user_id, username))
+    db.commit()
+
+def is_admin():
+    user = current_user()
+    return bool(user) and user['username'] in ADMIN_USERNAMES
+
+# ---------- Profiling ----------
+class StackSampler:
+    """Samples one thread's Python stack on an interval.
+
+    Output is in the collapsed-stack format read by flamegraph.pl and
+    speedscope: one ``frame;frame;frame count`` line per distinct stack.
+    """
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if stack:
+                self.counts[';'.join(reversed(stack))] += 1
+
+    def dump(self, path):
+        write_collapsed(self.counts, path)
+
+def write_collapsed(counts, path):
+    with open(path, 'w') as f:
+        for stack, count in counts.most_common():
+            f.write(f'{stack} {count}\n')
+
+def collapse_cprofile(profiler):
+    """cProfile results as collapsed stacks, weighted by microseconds of own time.
+
+    cProfile only records caller/callee pairs, so a function's time is split
+    over the paths leading to it in proportion to the time each caller spent
+    in it. Recursive calls are folded into the outermost frame.
+    """
+    stats = pstats.Stats(profiler).stats
+    callees = {}
+    for func, (cc, nc, tt, ct, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    def label(func):
+        filename, line, name = func
+        return f'{name} ({os.path.basename(filename)}:{line})'
+
+    counts = Counter()
+
+    def walk(func, path, share):
+        path = path + [label(func)]
+        counts[';'.join(path)] += stats[func][2] * share * 1e6
+        for callee, edge_time in callees.get(func, ()):
+            callee_time = stats[callee][3]
+            # Skip recursion and paths worth less than a microsecond
+            if label(callee) not in path and callee_time and share * edge_time >= 1e-6:
+                walk(callee, path, share * edge_time / callee_time)
+
+    for func, value in stats.items():
+        if not value[4]:
+            walk(func, [], 1.0)
+    return Counter({stack: round(count) for stack, count in counts.items() if round(count)})
+
+def requested_profile_mode():
+    """('sample' or 'cprofile', whether an admin asked for it), or None for the current request."""
+    flag = request.args.get('profile') or request.headers.get('X-Profile')
+    if flag and is_admin():
+        return ('cprofile' if flag == 'cprofile' else 'sample'), True
+    if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+        return 'sample', False
+    return None
+
+@app.before_request
+def start_profiling():
+    requested = requested_profile_mode()
+    if requested is None:
+        return
+    mode, by_admin = requested
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.enable()
+    else:
+        profiler = StackSampler(threading.get_ident(), PROFILE_INTERVAL)
+        profiler.start()
+    name = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{request.endpoint}-{session.get('user_id', 'anon')}"
+    g._profile = (mode, profiler, os.path.join(PROFILE_DIR, name + '.collapsed'), by_admin)
+
+@app.after_request
+def finish_profiling(response):
+    profile = g.pop('_profile', None)
+    if profile is None:
+        return response
+    mode, profiler, path, by_admin = profile
+
+    # Stop once the body has been sent so streamed responses are profiled in full
+    def finish():
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        if mode == 'cprofile':
+            # Collapsed stacks for flame graphs, plus the raw stats for pstats/snakeviz
+            profiler.disable()
+            write_collapsed(collapse_cprofile(profiler), path)
+            profiler.dump_stats(path[:-len('.collapsed')] + '.pstats')
+        else:
+            profiler.stop()
+            profiler.dump(path)
+
+    response.call_on_close(finish)
+    # Sampled requests belong to ordinary users, who shouldn't see profile file names
+    if by_admin:
+        response.headers['X-Profile-Output'] = os.path.basename(path)
+    return response
+
 # ---------- Helper Functions ----------
 def get_current_date():
     return datetime.now().strftime("%A, %B %d, %Y at %I:%M %p")
@@ -1396,8 +1344,14 @@ def parse_bulk_import(text):
         line = line.strip()
         if not line:
             continue
-            
-        if '=' in line:
+
+        # Bullets are always tasks, whatever ':' or '=' their title contains
+        if line.startswith(('-', '*')):
+            task_title = line[1:].strip()
+            if current_category and task_title:
+                current_category['tasks'].append(task_title)
+
+        elif '=' in line:
             parts = line.split('=', 1)
             category_name = parts[0].strip()
             tasks_text = parts[1].strip()
@@ -1421,11 +1375,6 @@ def parse_bulk_import(text):
                 }
                 categories.append(current_category)
                 
-        elif line.startswith(('-', '*')):
-            task_title = line[1:].strip()
-            if current_category and task_title:
-                current_category['tasks'].append(task_title)
-                
         elif current_category:
             current_category['tasks'].append(line)
         else:
@@ -1436,14 +1385,1276 @@ def parse_bulk_import(text):
     
     return categories
 
+def format_bulk_import_header(name):
+    """Category line that parse_bulk_import() reads back as an empty category.
+
+    ``Name = ,`` opens the category without adding a task, so every task can
+    follow as a ``- title`` line regardless of the commas or pipes it contains.
+    A name cannot contain ``=`` in this format, so it is replaced with ``-``,
+    nor start with a bullet, so leading ``-`` and ``*`` are dropped.
+    """
+    return f"{name.replace('=', '-').strip().lstrip('-*').strip()} = ,"
+
+def format_bulk_import_task(title):
+    """Task line for parse_bulk_import(); bullets are read before headers, so any title survives.
+
+    >>> parse_bulk_import(format_bulk_import_header('Book') + '\\n' + format_bulk_import_task('Chapter 1: Intro = a, b'))
+    [{'name': 'Book', 'tasks': ['Chapter 1: Intro = a, b']}]
+    """
+    return f"- {' '.join(title.split())}"
+
+# ---------- Importers ----------
+# Every parser returns the parse_bulk_import() shape: a list of
+# {'name': ..., 'tasks': [...]} where a task is a title string or a dict with
+# 'title' and optional 'notes', 'done' and 'done_at'.
+TRUTHY = {'1', 'true', 'yes', 'y', 'x', 'done', 'completed'}
+MD_HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*$')
+MD_ITEM = re.compile(r'^\s*(?:[-*+]|\d+[.)])\s+(?:\[( |x|X)\]\s*)?(.*)$')
+MD_DONE_AT = re.compile(r'\s*(?:✅\s*(\d{4}-\d{2}-\d{2})|@done\(([^)]*)\))\s*')
+
+def parse_timestamp(value):
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+def make_task(title, notes=None, done=False, done_at=None):
+    title = ' '.join(str(title or '').split())
+    if not title:
+        return None
+    done_at = parse_timestamp(done_at)
+    return {'title': title, 'notes': notes or None, 'done': bool(done or done_at), 'done_at': done_at}
+
+class CategoryCollector:
+    """Groups tasks by roadmap name, keeping first-seen order."""
+    def __init__(self):
+        self.categories = {}
+
+    def category(self, name):
+        name = ' '.join(str(name or '').split()) or 'General'
+        return self.categories.setdefault(name, {'name': name, 'tasks': []})
+
+    def add(self, name, task):
+        category = self.category(name)
+        if task:
+            category['tasks'].append(task)
+
+    def result(self):
+        return list(self.categories.values())
+
+def parse_csv_import(text):
+    """CSV with a header row; the column names match the CSV export."""
+    reader = csv.DictReader(io.StringIO(text))
+    columns = {name.strip().lower(): name for name in reader.fieldnames or []}
+    title_col = columns.get('title') or columns.get('task')
+    category_col = columns.get('category') or columns.get('roadmap')
+    if not title_col:
+        raise ValueError('CSV import needs a "title" column')
+
+    def get(row, key):
+        column = columns.get(key)
+        return (row.get(column) or '').strip() if column else ''
+
+    collector = CategoryCollector()
+    for row in reader:
+        done = get(row, 'done').lower() in TRUTHY
+        collector.add(row.get(category_col) if category_col else None,
+                      make_task(row.get(title_col), get(row, 'notes'), done, get(row, 'done_at') if done else None))
+    return collector.result()
+
+def json_task(item):
+    if isinstance(item, dict):
+        return make_task(item.get('title') or item.get('name') or item.get('text'),
+                         item.get('notes') or item.get('note'),
+                         item.get('done') or item.get('completed'),
+                         item.get('done_at') or item.get('completed_at'))
+    return make_task(item)
+
+def parse_json_import(text):
+    """JSON documents, JSON Lines, and the JSON Lines export format.
+
+    Accepted documents: a list of roadmaps (``name`` plus ``tasks``), an
+    object holding such a list under ``roadmaps``/``categories``, an object
+    mapping roadmap names to task lists, or a list of tasks that each name
+    their ``category``.
+    """
+    try:
+        records = json.loads(text)
+    except ValueError:
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+    if isinstance(records, dict):
+        records = records.get('roadmaps') or records.get('categories') or [
+            {'name': name, 'tasks': tasks} for name, tasks in records.items()]
+
+    collector = CategoryCollector()
+    exported = {}
+    for record in records:
+        if not isinstance(record, dict):
+            collector.add(None, json_task(record))
+        elif record.get('type') == 'category':
+            exported[record.get('id')] = record.get('name')
+            collector.category(record.get('name'))
+        elif record.get('type') == 'task':
+            collector.add(exported.get(record.get('category_id')), json_task(record))
+        elif 'tasks' in record or 'items' in record:
+            name = record.get('name') or record.get('title') or record.get('category')
+            collector.category(name)
+            for item in record.get('tasks') or record.get('items') or []:
+                collector.add(name, json_task(item))
+        else:
+            collector.add(record.get('category') or record.get('roadmap'), json_task(record))
+    return collector.result()
+
+def parse_markdown_import(text):
+    """Headings start roadmaps; list items and ``- [x]`` checklists become tasks.
+
+    A checked item is imported as done, with its completion date taken from
+    a ``✅ 2024-01-31`` or ``@done(2024-01-31 18:00)`` marker when present.
+    """
+    collector = CategoryCollector()
+    current = None
+    for line in text.splitlines():
+        heading = MD_HEADING.match(line.strip())
+        if heading:
+            current = heading.group(2)
+            collector.category(current)
+            continue
+        item = MD_ITEM.match(line)
+        if not item:
+            continue
+        checked, title = item.groups()
+        done_at = None
+        marker = MD_DONE_AT.search(title)
+        if marker:
+            done_at = marker.group(1) or marker.group(2)
+            title = MD_DONE_AT.sub(' ', title)
+        collector.add(current, make_task(title, done=checked in ('x', 'X'), done_at=done_at))
+    return collector.result()
+
+def parse_opml_import(text):
+    """Top-level outlines are roadmaps and every nested outline is a task."""
+    root = ElementTree.fromstring(text.encode())
+    body = root.find('body')
+    if body is None:
+        raise ValueError('OPML document has no <body>')
+
+    def outline_task(outline):
+        return make_task(outline.get('text') or outline.get('title'), outline.get('_note'),
+                         (outline.get('_complete') or '').lower() == 'true')
+
+    collector = CategoryCollector()
+    for top in body.findall('outline'):
+        children = list(top.iter('outline'))[1:]
+        if not children:
+            collector.add(None, outline_task(top))
+            continue
+        name = top.get('text') or top.get('title')
+        collector.category(name)
+        for outline in children:
+            collector.add(name, outline_task(outline))
+    return collector.result()
+
+IMPORT_PARSERS = {
+    'text': parse_bulk_import,
+    'csv': parse_csv_import,
+    'json': parse_json_import,
+    'markdown': parse_markdown_import,
+    'opml': parse_opml_import,
+}
+
+def detect_import_format(text):
+    stripped = text.lstrip()
+    if stripped.startswith('<') and '<opml' in stripped[:1000].lower():
+        return 'opml'
+    lines = [line for line in stripped.splitlines() if line.strip()]
+    if stripped[:1] in ('[', '{'):
+        # A JSON document or JSON Lines; text such as "[Project] = a, b" starts the same way
+        for candidate in (stripped, lines[0]):
+            try:
+                json.loads(candidate)
+                return 'json'
+            except ValueError:
+                pass
+    if any(MD_HEADING.match(line.strip()) or re.match(r'^\s*[-*+]\s+\[( |x|X)\]', line) for line in lines):
+        return 'markdown'
+    if lines:
+        header = {column.strip().lower() for column in next(csv.reader([lines[0]]))}
+        if header & {'title', 'task'}:
+            return 'csv'
+    return 'text'
+
+def parse_import(text, fmt='auto'):
+    if fmt not in IMPORT_PARSERS:
+        fmt = detect_import_format(text)
+    return IMPORT_PARSERS[fmt](text)
+
+_footer_cache = (None, None)
+
+def get_footer():
+    """Rendered footer, shared by all requests within the same minute.
+
+    The server time is shown to the minute and the links never change, so
+    the footer only needs re-rendering when the minute rolls over.
+    """
+    global _footer_cache
+    minute = int(time.time() // 60)
+    cached_minute, footer = _footer_cache
+    if cached_minute != minute:
+        footer = Markup(app.jinja_env.get_template('footer.html').render(current_date=get_current_date(), **FOOTER_LINKS))
+        _footer_cache = (minute, footer)
+    return footer
+
+@app.context_processor
+def inject_footer():
+    return dict(footer=get_footer())
+
 def render_with_footer(template, **kwargs):
-    footer = TPL_FOOTER.replace('{{ current_date }}', get_current_date())\
-                      .replace('{{ portfolio_url }}', PORTFOLIO_URL)\
-                      .replace('{{ github_url }}', GITHUB_URL)\
-                      .replace('{{ linkedin_url }}', LINKEDIN_URL)\
-                      .replace('{{ contact_email }}', CONTACT_EMAIL)
-    
-    return render_template_string(TPL_BASE.replace('{{content}}', template).replace('{{footer}}', footer), **kwargs)
+    return render_template(template, **kwargs)
+
+STREAM_FLUSH = Markup('<!--flush-->')
+
+def stream_with_footer(template, **kwargs):
+    """Like render_with_footer() but returns the page as a generator of chunks.
+
+    Output is held back until the template prints ``{{ flush }}``, so each
+    chunk sent to the client is a whole section of the page. The template runs
+    after the session has been saved, so anything it needs from the session
+    (flashed messages included) must be read by the view and passed in.
+    """
+    pieces = stream_template(template, flush=STREAM_FLUSH, **kwargs)
+
+    def chunks():
+        buffer = []
+        for piece in pieces:
+            if STREAM_FLUSH in piece:
+                buffer.append(piece.replace(STREAM_FLUSH, ''))
+                yield ''.join(buffer)
+                buffer = []
+            else:
+                buffer.append(piece)
+        if buffer:
+            yield ''.join(buffer)
+
+    return chunks()
+
+# ---------- Task ordering ----------
+# Tasks are ordered within a roadmap by a float rank. Ranks start POSITION_GAP
+# apart so a move only rewrites the moved row; a list is renumbered once
+# repeated halving leaves neighbours closer than POSITION_MIN_GAP.
+POSITION_GAP = 1024.0
+POSITION_MIN_GAP = 1e-6
+
+def category_clause(category_id):
+    """WHERE fragment and params selecting one roadmap, or uncategorized tasks."""
+    if category_id is None:
+        return 'category_id IS NULL', ()
+    return 'category_id=%s', (category_id,)
+
+def next_position(cur, user_id, category_id):
+    """Rank that appends a task to the end of a roadmap."""
+    clause, params = category_clause(category_id)
+    cur.execute(f'SELECT MAX(position) FROM tasks WHERE user_id=%s AND {clause}', (user_id, *params))
+    last = cur.fetchone()[0]
+    return (last or 0) + POSITION_GAP
+
+def position_between(before, after):
+    """Rank for a task dropped between two neighbours (None at either end)."""
+    if before is None and after is None:
+        return POSITION_GAP
+    if after is None:
+        return before + POSITION_GAP
+    if before is None:
+        return after - POSITION_GAP
+    return (before + after) / 2
+
+def rebalance_positions(user_id, category_id):
+    """Renumber one roadmap POSITION_GAP apart, keeping its current order."""
+    clause, params = category_clause(category_id)
+    db = get_db()
+    cur = db.cursor()
+    cur.execute(f'''UPDATE tasks SET position = ranked.rank * %s
+                    FROM (SELECT id, ROW_NUMBER() OVER (ORDER BY position, id) AS rank
+                          FROM tasks WHERE user_id=%s AND {clause}) ranked
+                    WHERE tasks.id = ranked.id''', (POSITION_GAP, user_id, *params))
+    db.commit()
+    return cur.rowcount
+
+def schedule_rebalance(user_id, category_id):
+    """Queue a crowded roadmap for renumbering on the background worker.
+
+    A dropped job is harmless: the next crowded move queues it again, and the
+    rebalance-positions command catches anything left over.
+    """
+    shard = current_shard()
+
+    def rebalance():
+        with on_shard(shard):
+            rebalance_positions(user_id, category_id)
+    background_jobs.submit(rebalance)
+
+@app.cli.command('rebalance-positions')
+def rebalance_positions_command():
+    """Renumber every roadmap whose task ranks have run out of room."""
+    rebalanced = 0
+    for shard in each_shard():
+        crowded = fetch_all('''SELECT DISTINCT user_id, category_id
+                               FROM (SELECT user_id, category_id,
+                                            position - LAG(position) OVER (PARTITION BY user_id, category_id
+                                                                           ORDER BY position) AS gap
+                                     FROM tasks) gaps
+                               WHERE gap < %s''', (POSITION_MIN_GAP,))
+        for row in crowded:
+            rebalance_positions(row['user_id'], row['category_id'])
+        rebalanced += len(crowded)
+    print(f"Rebalanced {rebalanced} roadmaps")
+
+# ---------- Task dependencies ----------
+NEXT_UP_PER_ROADMAP = 3
+
+class DependencyGraph:
+    """One roadmap's tasks in dependency order, with a count of open prerequisites per task.
+
+    The order is fixed when the graph is built; completing or reopening a
+    task only adjusts the counts of the tasks that depend on it.
+    """
+    def __init__(self, tasks, edges):
+        self.titles = {task['id']: task['title'] for task in tasks}
+        self.done = {task['id'] for task in tasks if task['done']}
+        self.depends_on = {}
+        self.dependents = {}
+        for task_id, depends_on_id in edges:
+            self.depends_on.setdefault(task_id, []).append(depends_on_id)
+            self.dependents.setdefault(depends_on_id, []).append(task_id)
+        self.waiting = {task_id: sum(dep not in self.done for dep in self.depends_on.get(task_id, ()))
+                        for task_id in self.titles}
+        self.order = self._topological_order(tasks)
+        self._lock = threading.Lock()
+
+    def _topological_order(self, tasks):
+        # Kahn's algorithm, breaking ties by position so the order follows the list
+        rank = {task['id']: (task['position'] is None, task['position'] or 0, task['id']) for task in tasks}
+        indegree = {task_id: len(self.depends_on.get(task_id, ())) for task_id in self.titles}
+        ready = [rank[task_id] + (task_id,) for task_id, degree in indegree.items() if degree == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            task_id = heapq.heappop(ready)[-1]
+            order.append(task_id)
+            for dependent in self.dependents.get(task_id, ()):
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    heapq.heappush(ready, rank[dependent] + (dependent,))
+        return order
+
+    def set_done(self, task_id, done):
+        with self._lock:
+            if task_id not in self.titles or (task_id in self.done) == done:
+                return
+            if done:
+                self.done.add(task_id)
+            else:
+                self.done.discard(task_id)
+            for dependent in self.dependents.get(task_id, ()):
+                self.waiting[dependent] += -1 if done else 1
+
+    def next_up(self, limit=None):
+        """Open tasks whose prerequisites are all done, in dependency order."""
+        ready = [task_id for task_id in self.order if task_id not in self.done and not self.waiting[task_id]]
+        return ready[:limit]
+
+dependency_graphs = LRUCache(DEPENDENCY_CACHE_SIZE, DEPENDENCY_CACHE_TTL)
+
+def get_dependency_graphs(user_id):
+    """A user's DependencyGraph per roadmap id (None for uncategorized tasks)."""
+    graphs = dependency_graphs.get(user_id)
+    if graphs is None:
+        tasks = fetch_all('SELECT id, category_id, title, done, position FROM tasks WHERE user_id=%s', (user_id,))
+        edges = fetch_all('''SELECT d.task_id, d.depends_on_id, t.category_id
+                             FROM task_dependencies d
+                             JOIN tasks t ON t.id = d.task_id
+                             JOIN tasks p ON p.id = d.depends_on_id
+                             WHERE d.user_id=%s AND (t.category_id = p.category_id
+                                                     OR (t.category_id IS NULL AND p.category_id IS NULL))''',
+                          (user_id,))
+        by_category = {}
+        for task in tasks:
+            by_category.setdefault(task['category_id'], ([], []))[0].append(task)
+        for edge in edges:
+            by_category[edge['category_id']][1].append((edge['task_id'], edge['depends_on_id']))
+        graphs = {category_id: DependencyGraph(*parts) for category_id, parts in by_category.items()}
+        dependency_graphs.set(user_id, graphs)
+    return graphs
+
+def set_cached_task_done(user_id, task_id, done):
+    """Apply a completion to the cached graph instead of rebuilding it."""
+    graphs = dependency_graphs.get(user_id)
+    if graphs is not None and task_id is not None:
+        for graph in graphs.values():
+            graph.set_done(int(task_id), done)
+
+def invalidate_dependency_graphs(user_id):
+    dependency_graphs.pop(user_id)
+
+def creates_cycle(cur, task_id, depends_on_id):
+    """True if task_id is already upstream of depends_on_id."""
+    cur.execute('''WITH RECURSIVE upstream(id) AS (
+                       SELECT %s
+                       UNION
+                       SELECT d.depends_on_id FROM task_dependencies d JOIN upstream u ON d.task_id = u.id
+                   )
+                   SELECT 1 FROM upstream WHERE id=%s LIMIT 1''', (depends_on_id, task_id))
+    return cur.fetchone() is not None
+
+def clear_dependencies(cur, user_id, task_id):
+    """Drop every edge touching a task, e.g. when it leaves its roadmap."""
+    cur.execute('DELETE FROM task_dependencies WHERE user_id=%s AND (task_id=%s OR depends_on_id=%s)',
+               (user_id, task_id, task_id))
+
+def set_dependencies(cur, user_id, task_id, category_id, depends_on_ids):
+    """Replace a task's prerequisites; they must be tasks in the same roadmap.
+
+    Raises ValueError if a new edge would close a cycle.
+    """
+    cur.execute('SELECT depends_on_id FROM task_dependencies WHERE user_id=%s AND task_id=%s', (user_id, task_id))
+    current = {row[0] for row in cur.fetchall()}
+    for depends_on_id in current - depends_on_ids:
+        cur.execute('DELETE FROM task_dependencies WHERE task_id=%s AND depends_on_id=%s', (task_id, depends_on_id))
+    added = depends_on_ids - current
+    if not added:
+        return
+    clause, params = category_clause(category_id)
+    placeholders = ','.join(['%s'] * len(added))
+    cur.execute(f'SELECT id, title FROM tasks WHERE user_id=%s AND {clause} AND id IN ({placeholders})',
+                (user_id, *params, *added))
+    for depends_on_id, title in cur.fetchall():
+        if creates_cycle(cur, task_id, depends_on_id):
+            raise ValueError(f'"{title}" already depends on this task')
+        cur.execute('INSERT INTO task_dependencies(user_id,task_id,depends_on_id) VALUES(%s,%s,%s)',
+                   (user_id, task_id, depends_on_id))
+
+# ---------- Archive ----------
+# Long-completed tasks live in archived_tasks under their original ids, so the
+# hot table only holds what the dashboard shows by default.
+TASK_COLUMNS = 'id, user_id, category_id, title, notes, done, done_at, position, due_at, created_at'
+
+def tasks_table(include_archived=False):
+    """FROM target for task queries, optionally with archived tasks appended."""
+    if not include_archived:
+        return 'tasks'
+    return (f'(SELECT {TASK_COLUMNS}, FALSE AS archived FROM tasks '
+            f'UNION ALL SELECT {TASK_COLUMNS}, TRUE AS archived FROM archived_tasks)')
+
+def archive_completed_tasks(older_than_days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE):
+    """Move tasks completed more than ``older_than_days`` ago into archived_tasks.
+
+    Each batch commits on its own so the hot table is never locked for long.
+    Returns the number of tasks moved.
+    """
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=older_than_days)
+    db = get_db()
+    cur = db.cursor()
+    archived = 0
+    while True:
+        cur.execute('SELECT id FROM tasks WHERE done AND done_at < %s ORDER BY done_at LIMIT %s', (cutoff, batch_size))
+        ids = [row[0] for row in cur.fetchall()]
+        if not ids:
+            break
+        placeholders = ','.join(['%s'] * len(ids))
+        cur.execute(f'''INSERT INTO archived_tasks({TASK_COLUMNS})
+                        SELECT {TASK_COLUMNS} FROM tasks WHERE id IN ({placeholders})
+                        ON CONFLICT(id) DO NOTHING''', ids)
+        cur.execute(f'DELETE FROM task_dependencies WHERE task_id IN ({placeholders}) OR depends_on_id IN ({placeholders})',
+                    ids * 2)
+        cur.execute(f'SELECT DISTINCT category_id FROM tasks WHERE id IN ({placeholders})', ids)
+        expire_share_snapshots(cur, *(row[0] for row in cur.fetchall()))
+        cur.execute(f'DELETE FROM tasks WHERE id IN ({placeholders})', ids)
+        db.commit()
+        archived += len(ids)
+        if len(ids) < batch_size:
+            break
+    return archived
+
+class BackgroundWorker:
+    """A daemon thread running queued jobs in an app context, so they never hold a request worker."""
+    def __init__(self, name, maxsize):
+        self.name = name
+        self.queue = queue.Queue(maxsize)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, job):
+        """Queue ``job``; False if the queue is full and the job was dropped."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        try:
+            self.queue.put_nowait(job)
+            return True
+        except queue.Full:
+            return False
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            try:
+                with app.app_context():
+                    job()
+            except Exception as e:
+                log_event(db_log, logging.WARNING, event='background_job_error', job=job.__name__, error=str(e))
+            finally:
+                self.queue.task_done()
+
+background_jobs = BackgroundWorker('background-jobs', 10)
+last_archive_run = time.time()
+
+def archive_all_shards():
+    for shard in each_shard():
+        archive_completed_tasks()
+
+@app.after_request
+def schedule_archiving(response):
+    """Queue the archive job on the background worker once ARCHIVE_INTERVAL has passed."""
+    global last_archive_run
+    now = time.time()
+    if ARCHIVE_INTERVAL and now - last_archive_run > ARCHIVE_INTERVAL:
+        last_archive_run = now
+        background_jobs.submit(archive_all_shards)
+    return response
+
+@app.cli.command('archive-tasks')
+def archive_tasks_command():
+    """Move long-completed tasks out of the tasks table."""
+    archived = sum(archive_completed_tasks() for shard in each_shard())
+    print(f"Archived {archived} tasks completed over {ARCHIVE_AFTER_DAYS} days ago")
+
+# ---------- Activity ----------
+# Every mutation appends to events; the kinds below are also counted into
+# daily_stats in the same transaction, so analytics never scan raw rows.
+ROLLUP_KINDS = {'created', 'completed', 'reopened', 'deleted'}
+ANALYTICS_MAX_DAYS = 365
+
+def record_event(cur, user_id, kind, task_id=None, category_id=None, amount=1, rollup=True):
+    """Append an event and bump its daily rollup; the caller commits, which also pushes it to live streams."""
+    cur.execute('INSERT INTO events(user_id,kind,task_id,category_id,amount) VALUES(%s,%s,%s,%s,%s)',
+               (user_id, kind, task_id, category_id, amount))
+    # The tab that made the change already shows it, and skips events carrying its own id
+    origin = (request.headers.get(CLIENT_ID_HEADER, '')[:64] or None) if has_request_context() else None
+    cur.connection.after_commit(lambda: change_broker.publish(user_id, kind, {'task_id': task_id,
+                                                                              'category_id': category_id,
+                                                                              'origin': origin}))
+    if rollup and kind in ROLLUP_KINDS:
+        cur.execute(f'''INSERT INTO daily_stats(user_id,category_id,day,{kind}) VALUES(%s,%s,%s,%s)
+                        ON CONFLICT(user_id, category_id, day) DO UPDATE SET {kind} = daily_stats.{kind} + excluded.{kind}''',
+                   (user_id, category_id or 0, datetime.now(timezone.utc).date(), amount))
+
+def as_date(value):
+    """DATE columns come back as strings from SQLite and dates from PostgreSQL."""
+    return value if not isinstance(value, str) else datetime.strptime(value[:10], '%Y-%m-%d').date()
+
+def completion_streaks(user_id):
+    """(current, longest) runs of consecutive UTC days with a completed task.
+
+    The current streak survives until a full day passes without one.
+    """
+    days = [as_date(row['day']) for row in fetch_all('''SELECT day FROM daily_stats
+                                                        WHERE user_id=%s AND completed > 0
+                                                        GROUP BY day ORDER BY day''', (user_id,))]
+    longest = run = 0
+    previous = None
+    for day in days:
+        run = run + 1 if previous is not None and (day - previous).days == 1 else 1
+        longest = max(longest, run)
+        previous = day
+    today = datetime.now(timezone.utc).date()
+    current = run if previous is not None and (today - previous).days <= 1 else 0
+    return current, longest
+
+def activity_summary(user_id, days):
+    """Daily created/completed series, per-roadmap totals and a burn-down, all from daily_stats.
+
+    The burn-down is anchored on today's open task count and walked backwards,
+    so it stays exact even for tasks that predate the rollups.
+    """
+    today = datetime.now(timezone.utc).date()
+    start = today - timedelta(days=days - 1)
+    rows = fetch_all('''SELECT s.day, s.category_id, c.name AS category_name,
+                               s.created, s.completed, s.reopened, s.deleted
+                        FROM daily_stats s
+                        LEFT JOIN categories c ON c.id = s.category_id
+                        WHERE s.user_id=%s AND s.day >= %s''', (user_id, start))
+    open_tasks = fetch_one('SELECT COUNT(*) AS open FROM tasks WHERE user_id=%s AND NOT done', (user_id,))['open']
+
+    series = OrderedDict((start + timedelta(days=offset), Counter()) for offset in range(days))
+    categories = {}
+    for row in rows:
+        counts = series[as_date(row['day'])]
+        for column in ROLLUP_KINDS:
+            counts[column] += row[column]
+        category = categories.setdefault(row['category_id'], {
+            'category_id': row['category_id'] or None,
+            'name': row['category_name'] or ('General' if not row['category_id'] else None),
+            'created': 0, 'completed': 0})
+        category['created'] += row['created']
+        category['completed'] += row['completed']
+
+    burndown = []
+    remaining = open_tasks
+    for day, counts in reversed(series.items()):
+        burndown.append({'day': day.isoformat(), 'remaining': remaining})
+        remaining -= counts['created'] + counts['reopened'] - counts['completed'] - counts['deleted']
+    current, longest = completion_streaks(user_id)
+    return {
+        'days': [{'day': day.isoformat(), 'created': counts['created'], 'completed': counts['completed']}
+                 for day, counts in series.items()],
+        'categories': list(categories.values()),
+        'burndown': burndown[::-1],
+        'streak': {'current': current, 'longest': longest},
+    }
+
+@app.cli.command('rebuild-rollups')
+def rebuild_rollups_command():
+    """Recompute daily_stats from task timestamps, e.g. for data older than the rollups."""
+    rebuilt = sum(rebuild_rollups() for shard in each_shard())
+    print(f"Rebuilt {rebuilt} daily rollups")
+
+def rebuild_rollups():
+    """Rebuild daily_stats on the current shard; returns the number of rollup rows."""
+    counts = Counter()
+    for row in iter_query(f'SELECT user_id, category_id, done, done_at, created_at FROM {tasks_table(True)} t'):
+        if row['created_at']:
+            counts[(row['user_id'], row['category_id'] or 0, str(row['created_at'])[:10], 'created')] += 1
+        if row['done'] and row['done_at']:
+            # Imported tasks may carry a done_at older than the task itself
+            day = max(str(row['done_at'])[:10], str(row['created_at'] or '')[:10])
+            counts[(row['user_id'], row['category_id'] or 0, day, 'completed')] += 1
+    db = get_db()
+    cur = db.cursor()
+    cur.execute('DELETE FROM daily_stats')
+    cur.executemany('''INSERT INTO daily_stats(user_id,category_id,day,created,completed) VALUES(%s,%s,%s,%s,%s)
+                       ON CONFLICT(user_id, category_id, day) DO UPDATE
+                       SET created = daily_stats.created + excluded.created,
+                           completed = daily_stats.completed + excluded.completed''',
+                    [(user_id, category_id, day, amount if kind == 'created' else 0, amount if kind == 'completed' else 0)
+                     for (user_id, category_id, day, kind), amount in counts.items()])
+    db.commit()
+    return len({key[:3] for key in counts})
+
+# ---------- Live updates ----------
+class ChangeBroker:
+    """In-process pub/sub of per-user change events for the /events stream.
+
+    Each user's recent events are kept so a reconnecting stream can resume
+    after its Last-Event-ID. Event ids are microsecond timestamps, so they
+    also order events that came from other workers.
+    """
+    def __init__(self, replay_size, replay_ttl):
+        self.replay_size = replay_size
+        self._recent = LRUCache(10000, replay_ttl)
+        self._subscribers = {}
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    def next_id(self):
+        with self._lock:
+            self._last_id = max(self._last_id + 1, time.time_ns() // 1000)
+            return self._last_id
+
+    def publish(self, user_id, kind, data):
+        self.deliver({'id': self.next_id(), 'user_id': user_id, 'kind': kind, 'data': data})
+
+    def deliver(self, event):
+        with self._lock:
+            recent = self._recent.get(event['user_id']) or deque(maxlen=self.replay_size)
+            recent.append(event)
+            self._recent.set(event['user_id'], recent)
+            subscribers = list(self._subscribers.get(event['user_id'], ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                # A stalled client: end its stream, it catches up from the buffer on reconnect
+                with subscriber.mutex:
+                    subscriber.queue.clear()
+                subscriber.put_nowait(None)
+
+    def subscribe(self, user_id, subscriber=None):
+        """Register a queue for the user's events; anything with put_nowait() will do."""
+        subscriber = subscriber or queue.Queue(self.replay_size)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, user_id, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id, set())
+            subscribers.discard(subscriber)
+            if not subscribers:
+                self._subscribers.pop(user_id, None)
+
+    def replay(self, user_id, after_id):
+        with self._lock:
+            return [event for event in self._recent.get(user_id) or () if event['id'] > after_id]
+
+    def stats(self):
+        with self._lock:
+            return {'users': len(self._subscribers), 'streams': sum(map(len, self._subscribers.values()))}
+
+class PostgresChangeBroker(ChangeBroker):
+    """Relays change events between workers with PostgreSQL LISTEN/NOTIFY.
+
+    publish() only sends a NOTIFY; every worker, including the sender, hands
+    the notifications it hears to its own streams from a listener thread.
+    """
+    channel = 'roadmap_changes'
+
+    def __init__(self, dsn, replay_size, replay_ttl):
+        super().__init__(replay_size, replay_ttl)
+        self.dsn = dsn
+        self._notify_db = None
+        self._notify_lock = threading.Lock()
+        self._listener = None
+
+    def publish(self, user_id, kind, data):
+        self.listen()
+        event = json.dumps({'id': self.next_id(), 'user_id': user_id, 'kind': kind, 'data': data})
+        with self._notify_lock:
+            if self._notify_db is None or self._notify_db.closed:
+                self._notify_db = psycopg2.connect(self.dsn, connect_timeout=DB_CONNECT_TIMEOUT)
+                self._notify_db.autocommit = True
+            with self._notify_db.cursor() as cur:
+                cur.execute('SELECT pg_notify(%s, %s)', (self.channel, event))
+
+    def subscribe(self, user_id, subscriber=None):
+        self.listen()
+        return super().subscribe(user_id, subscriber)
+
+    def listen(self):
+        with self._notify_lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                db = psycopg2.connect(self.dsn, connect_timeout=DB_CONNECT_TIMEOUT)
+                db.autocommit = True
+                db.cursor().execute(f'LISTEN {self.channel}')
+                while True:
+                    if select.select([db], [], [], EVENT_STREAM_HEARTBEAT) == ([], [], []):
+                        continue
+                    db.poll()
+                    while db.notifies:
+                        self.deliver(json.loads(db.notifies.pop(0).payload))
+            except psycopg2.Error as e:
+                log_event(db_log, logging.WARNING, event='change_listener_error', error=str(e))
+                time.sleep(1)
+
+if EVENT_BROKER == 'postgres' and not DEBUG:
+    change_broker = PostgresChangeBroker(SHARDS[GLOBAL_SHARD], EVENT_REPLAY_SIZE, EVENT_REPLAY_TTL)
+else:
+    change_broker = ChangeBroker(EVENT_REPLAY_SIZE, EVENT_REPLAY_TTL)
+
+EVENTS_PATH = '/events'
+CLIENT_ID_HEADER = 'X-Client-Id'
+ASGI_ENVIRON_KEY = 'roadmap.asgi'
+
+def live_updates_enabled():
+    """Whether this request's server can hold /events streams open cheaply."""
+    return LIVE_UPDATES or request.environ.get(ASGI_ENVIRON_KEY, False)
+SSE_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+def stream_resume_point():
+    """Event id the current /events request resumes after: its Last-Event-ID, or now for a new stream."""
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id', '')
+    return int(last_event_id) if last_event_id.isdigit() else change_broker.next_id()
+
+def format_sse(event):
+    return f"id: {event['id']}\nevent: {event['kind']}\ndata: {json.dumps(event['data'])}\n\n"
+
+def event_stream(user_id, last_event_id):
+    """Yield a user's change events as SSE frames, starting after ``last_event_id``.
+
+    Runs after the request context is gone, so it never holds a database
+    connection while it waits.
+    """
+    subscriber = change_broker.subscribe(user_id)
+    try:
+        yield f'retry: {EVENT_STREAM_HEARTBEAT * 1000}\n\n'
+        sent = last_event_id
+        for event in change_broker.replay(user_id, last_event_id):
+            sent = event['id']
+            yield format_sse(event)
+        deadline = time.time() + EVENT_STREAM_MAX_AGE
+        while time.time() < deadline:
+            try:
+                event = subscriber.get(timeout=EVENT_STREAM_HEARTBEAT)
+            except queue.Empty:
+                yield ': heartbeat\n\n'
+                continue
+            if event is None:
+                return
+            # Events published between subscribing and replaying arrive twice
+            if event['id'] > sent:
+                sent = event['id']
+                yield format_sse(event)
+    finally:
+        change_broker.unsubscribe(user_id, subscriber)
+
+# ---------- Reminders ----------
+# Setting a due date writes the task's reminder to the reminders outbox in the
+# same transaction. The scheduler reads that table a window at a time through
+# the partial index on pending rows, so no tick ever scans tasks.
+DEADLINES_SHOWN = 15
+def parse_due_at(value):
+    """A form's due date as naive UTC; a bare date means the end of that day."""
+    value = (value or '').strip()
+    due_at = parse_timestamp(value)
+    if due_at is None:
+        return None
+    if due_at.tzinfo:
+        due_at = due_at.astimezone(timezone.utc).replace(tzinfo=None)
+    elif len(value) == 10:
+        due_at = due_at.replace(hour=23, minute=59)
+    return due_at.replace(second=0, microsecond=0)
+
+def schedule_reminder(cur, user_id, task_id, due_at):
+    """Write or clear the task's reminder; the caller commits, which also hands it to the scheduler.
+
+    Only open tasks due in the future have one. Rewriting an unchanged due date
+    keeps a reminder that has already been sent from going out again.
+    """
+    if due_at is None or due_at <= datetime.now(timezone.utc).replace(tzinfo=None):
+        cur.execute('DELETE FROM reminders WHERE task_id=%s', (task_id,))
+        return
+    remind_at = due_at.replace(tzinfo=timezone.utc).timestamp() - REMINDER_LEAD_MINUTES * 60
+    cur.execute('''INSERT INTO reminders(task_id, user_id, remind_at) VALUES(%s,%s,%s)
+                   ON CONFLICT(task_id) DO UPDATE SET remind_at=excluded.remind_at, sent_at=NULL
+                   WHERE reminders.remind_at <> excluded.remind_at''', (task_id, user_id, remind_at))
+    shard = current_shard()
+    cur.connection.after_commit(lambda: reminder_scheduler.schedule(shard, task_id, remind_at))
+
+def upcoming_deadlines(user_id):
+    """Open tasks that are overdue or due within UPCOMING_DAYS, soonest first."""
+    horizon = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(days=UPCOMING_DAYS)
+    return fetch_all('''SELECT t.id, t.title, t.due_at, c.name AS category_name
+                        FROM tasks t LEFT JOIN categories c ON c.id = t.category_id
+                        WHERE t.user_id=%s AND t.due_at <= %s AND NOT t.done
+                        ORDER BY t.due_at LIMIT %s''', (user_id, horizon, DEADLINES_SHOWN))
+
+def log_reminder(reminder):
+    log_event(reminder_log, logging.INFO, event='reminder', **reminder)
+
+def publish_reminder(reminder):
+    """Show the reminder on the user's open dashboards."""
+    change_broker.publish(reminder['user_id'], 'reminder', reminder)
+
+NOTIFIERS = {'log': log_reminder, 'live': publish_reminder}
+
+class ReminderScheduler:
+    """Sends due reminders from a min-heap of (remind_at, shard, task_id).
+
+    The heap holds the pending reminders due up to ``loaded_until`` and is
+    refilled from the reminders table once that passes. Reminders this worker
+    writes are pushed on directly; other workers' arrive with the next refill.
+    Every worker may hold the same reminder, so sending one starts by claiming
+    its row, and heap entries for reminders since moved or deleted simply fail
+    that claim.
+    """
+    def __init__(self, notifiers, window, batch_size):
+        self.notifiers = notifiers
+        self.window = window
+        self.batch_size = batch_size
+        self.heap = []
+        self.loaded_until = 0.0
+        self._wakeup = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        with self._wakeup:
+            if self._thread is None and self.notifiers:
+                self._thread = threading.Thread(target=self._run, name='reminders', daemon=True)
+                self._thread.start()
+
+    def schedule(self, shard, task_id, remind_at):
+        with self._wakeup:
+            if remind_at <= self.loaded_until:
+                heapq.heappush(self.heap, (remind_at, shard, task_id))
+                self._wakeup.notify()
+
+    def load(self, now):
+        """Refill the heap with every shard's pending reminders due in the next window."""
+        loaded_until = now + self.window
+        entries = []
+        for shard in each_shard():
+            rows = fetch_all('''SELECT task_id, remind_at FROM reminders
+                                WHERE sent_at IS NULL AND remind_at <= %s
+                                ORDER BY remind_at LIMIT %s''', (loaded_until, self.batch_size))
+            if len(rows) == self.batch_size:
+                # The rest of this shard's window comes with the next refill
+                loaded_until = min(loaded_until, rows[-1]['remind_at'])
+            entries.extend((row['remind_at'], shard, row['task_id']) for row in rows)
+        with self._wakeup:
+            self.heap = [entry for entry in set(self.heap) | set(entries) if entry[0] <= loaded_until]
+            heapq.heapify(self.heap)
+            self.loaded_until = loaded_until
+
+    def pop_due(self, now):
+        due = []
+        with self._wakeup:
+            while self.heap and self.heap[0][0] <= now:
+                due.append(heapq.heappop(self.heap))
+        return due
+
+    def send(self, shard, task_id, remind_at):
+        """Claim and deliver one reminder; False if it was stale or another worker got it first."""
+        with on_shard(shard):
+            db = get_db()
+            cur = db.cursor()
+            cur.execute('UPDATE reminders SET sent_at=%s WHERE task_id=%s AND remind_at=%s AND sent_at IS NULL',
+                        (time.time(), task_id, remind_at))
+            if not cur.rowcount:
+                db.rollback()
+                return False
+            task = fetch_one('''SELECT t.id, t.user_id, t.category_id, t.title, t.due_at, c.name AS category_name
+                                FROM tasks t LEFT JOIN categories c ON c.id = t.category_id
+                                WHERE t.id=%s''', (task_id,))
+            db.commit()
+            reminder = {'task_id': task['id'], 'user_id': task['user_id'], 'category_id': task['category_id'],
+                        'title': task['title'], 'category_name': task['category_name'],
+                        'due_at': str(task['due_at'])[:16]}
+            try:
+                for name in self.notifiers:
+                    NOTIFIERS[name](reminder)
+            except Exception as e:
+                # Unclaim it so the next refill tries again
+                log_event(reminder_log, logging.WARNING, event='reminder_error', task_id=task_id, error=str(e))
+                cur.execute('UPDATE reminders SET sent_at=NULL WHERE task_id=%s AND remind_at=%s', (task_id, remind_at))
+                db.commit()
+                return False
+        process_stats.incr('reminders_sent')
+        return True
+
+    def tick(self):
+        now = time.time()
+        if now >= self.loaded_until:
+            self.load(now)
+        for remind_at, shard, task_id in self.pop_due(now):
+            self.send(shard, task_id, remind_at)
+
+    def _run(self):
+        while True:
+            try:
+                with app.app_context():
+                    self.tick()
+            except Exception as e:
+                log_event(reminder_log, logging.WARNING, event='reminder_error', error=str(e))
+                time.sleep(1)
+            with self._wakeup:
+                wake_at = min(self.heap[0][0], self.loaded_until) if self.heap else self.loaded_until
+                self._wakeup.wait(max(wake_at - time.time(), 0))
+
+    def stats(self):
+        with self._wakeup:
+            return {'pending': len(self.heap), 'loaded_until': round(self.loaded_until),
+                    'sent': process_stats.get('reminders_sent')}
+
+reminder_scheduler = ReminderScheduler([name for name in REMINDER_NOTIFIERS if name in NOTIFIERS],
+                                       REMINDER_WINDOW, REMINDER_BATCH_SIZE)
+
+@app.before_request
+def start_reminder_scheduler():
+    reminder_scheduler.start()
+
+# ---------- Sharing ----------
+# A shared roadmap is served from a pre-rendered page. Any change to the
+# roadmap bumps the snapshot version and clears its html; the next view
+# renders it once and every view after that is a cache hit.
+SHARE_PATH = '/share/'
+share_cache = LRUCache(SHARE_CACHE_SIZE, SHARE_MAX_AGE)
+
+def expire_share_snapshots(cur, *category_ids):
+    """Mark the snapshots of changed roadmaps stale; the caller commits."""
+    category_ids = {category_id for category_id in category_ids if category_id is not None}
+    if not category_ids:
+        return
+    placeholders = ','.join(['%s'] * len(category_ids))
+    cur.execute(f'UPDATE share_snapshots SET html=NULL, version=version+1 WHERE category_id IN ({placeholders})',
+                tuple(category_ids))
+    if cur.rowcount:
+        share_cache.discard_where(lambda snapshot: snapshot['category_id'] in category_ids)
+
+def share_token_shard(token):
+    """Shard holding a share token's snapshot, looked up in the global share_tokens index."""
+    row = fetch_one('SELECT user_id FROM share_tokens WHERE token=%s', (token,))
+    return None if row is None else shard_for_user(row['user_id'])
+
+def drop_share_tokens(tokens):
+    if not tokens:
+        return
+    db = get_db(GLOBAL_SHARD)
+    cur = db.cursor()
+    cur.executemany('DELETE FROM share_tokens WHERE token=%s', [(token,) for token in tokens])
+    db.commit()
+
+def load_share_snapshot(token):
+    """The current snapshot for a share token, rendering it if stale; None if not shared."""
+    row = fetch_one('SELECT category_id, version, html FROM share_snapshots WHERE token=%s', (token,))
+    if row is None:
+        return None
+    html = row['html']
+    if html is None:
+        category = fetch_one('SELECT * FROM categories WHERE id=%s', (row['category_id'],))
+        tasks = fetch_all('''SELECT title, notes, done, done_at FROM tasks
+                             WHERE category_id=%s AND user_id=%s ORDER BY position, id''',
+                          (row['category_id'], category['user_id']))
+        html = render_with_footer('share.html', category=category, tasks=tasks,
+                                  completed=sum(1 for task in tasks if task['done']))
+        # Only store it if the roadmap did not change while we were rendering
+        db = get_db()
+        cur = db.cursor()
+        cur.execute('UPDATE share_snapshots SET html=%s WHERE token=%s AND version=%s AND html IS NULL',
+                    (html, token, row['version']))
+        db.commit()
+    return {'category_id': row['category_id'], 'html': html, 'etag': f"{token}-{row['version']}"}
+
+# ---------- Sharding ----------
+# Tables copied when a user moves shard, in dependency order; user_id rows are
+# deleted from the source in the reverse order once the copy has committed.
+TENANT_TABLES = ['categories', 'tasks', 'archived_tasks', 'task_dependencies', 'reminders', 'events',
+                 'daily_stats', 'share_snapshots', 'roadmap_templates']
+
+def copy_tenant_rows(source, target, user_id):
+    """Copy a user's rows from one shard to another, giving categories and tasks new ids there.
+
+    Ids are only unique within a shard, so every reference is remapped. The
+    target transaction is left for the caller to commit.
+    """
+    def rows(query):
+        with on_shard(source):
+            return fetch_all(query, (user_id,))
+
+    cur = get_db(target).cursor()
+    category_ids = {}
+    for row in rows('SELECT * FROM categories WHERE user_id=%s ORDER BY id'):
+        cur.execute('''INSERT INTO categories(user_id, name, description, color, created_at)
+                       VALUES(%s,%s,%s,%s,%s) RETURNING id''',
+                    (user_id, row['name'], row['description'], row['color'], row['created_at']))
+        category_ids[row['id']] = cur.fetchone()[0]
+
+    # Archived tasks take their ids from the tasks sequence too, so restoring one can't collide
+    task_ids = {}
+    for table, columns in (('tasks', TASK_COLUMNS), ('archived_tasks', f'{TASK_COLUMNS}, archived_at')):
+        for row in rows(f'SELECT {columns} FROM {table} WHERE user_id=%s ORDER BY id'):
+            cur.execute('''INSERT INTO tasks(user_id, category_id, title, notes, done, done_at, position, due_at,
+                                            created_at)
+                           VALUES(%s,%s,%s,%s,%s,%s,%s,%s,%s) RETURNING id''',
+                        (user_id, category_ids.get(row['category_id']), row['title'], row['notes'], row['done'],
+                         row['done_at'], row['position'], row['due_at'], row['created_at']))
+            task_ids[row['id']] = cur.fetchone()[0]
+            if table == 'archived_tasks':
+                cur.execute(f'''INSERT INTO archived_tasks({TASK_COLUMNS}, archived_at)
+                                SELECT {TASK_COLUMNS}, %s FROM tasks WHERE id=%s''',
+                            (row['archived_at'], task_ids[row['id']]))
+                cur.execute('DELETE FROM tasks WHERE id=%s', (task_ids[row['id']],))
+
+    cur.executemany('INSERT INTO task_dependencies(user_id, task_id, depends_on_id) VALUES(%s,%s,%s)',
+                    [(user_id, task_ids[row['task_id']], task_ids[row['depends_on_id']])
+                     for row in rows('SELECT * FROM task_dependencies WHERE user_id=%s')])
+    cur.executemany('INSERT INTO reminders(task_id, user_id, remind_at, sent_at) VALUES(%s,%s,%s,%s)',
+                    [(task_ids[row['task_id']], user_id, row['remind_at'], row['sent_at'])
+                     for row in rows('SELECT * FROM reminders WHERE user_id=%s')])
+    cur.executemany('''INSERT INTO events(user_id, kind, task_id, category_id, amount, created_at)
+                       VALUES(%s,%s,%s,%s,%s,%s)''',
+                    [(user_id, row['kind'], task_ids.get(row['task_id']), category_ids.get(row['category_id']),
+                      row['amount'], row['created_at'])
+                     for row in rows('SELECT * FROM events WHERE user_id=%s ORDER BY id')])
+    cur.executemany('''INSERT INTO daily_stats(user_id, category_id, day, created, completed, reopened, deleted)
+                       VALUES(%s,%s,%s,%s,%s,%s,%s)
+                       ON CONFLICT(user_id, category_id, day) DO UPDATE
+                       SET created = daily_stats.created + excluded.created,
+                           completed = daily_stats.completed + excluded.completed,
+                           reopened = daily_stats.reopened + excluded.reopened,
+                           deleted = daily_stats.deleted + excluded.deleted''',
+                    [(user_id, category_ids.get(row['category_id'], 0), row['day'], row['created'],
+                      row['completed'], row['reopened'], row['deleted'])
+                     for row in rows('SELECT * FROM daily_stats WHERE user_id=%s')])
+    # Share links keep their token; the page is rendered afresh on the new shard
+    cur.executemany('''INSERT INTO share_snapshots(token, user_id, category_id, version, created_at)
+                       VALUES(%s,%s,%s,%s,%s)''',
+                    [(row['token'], user_id, category_ids[row['category_id']], row['version'] + 1, row['created_at'])
+                     for row in rows('SELECT * FROM share_snapshots WHERE user_id=%s')])
+    cur.executemany('''INSERT INTO roadmap_templates(category_id, user_id, clones, published_at)
+                       VALUES(%s,%s,%s,%s)''',
+                    [(category_ids[row['category_id']], user_id, row['clones'], row['published_at'])
+                     for row in rows('SELECT * FROM roadmap_templates WHERE user_id=%s')])
+    return {'categories': len(category_ids), 'tasks': len(task_ids)}
+
+@uses_global_shard
+def set_user_shard(user_id, shard, moving=False):
+    """Point the shard map at ``shard``; ``moving`` locks the user out until it is cleared."""
+    db = get_db()
+    cur = db.cursor()
+    try:
+        cur.execute('''INSERT INTO user_shards(user_id, shard, moving) VALUES(%s,%s,%s)
+                       ON CONFLICT(user_id) DO UPDATE SET shard=excluded.shard, moving=excluded.moving''',
+                    (user_id, shard, moving))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+@app.cli.command('move-user')
+@click.argument('user_id', type=int)
+@click.argument('shard', type=int)
+def move_user_command(user_id, shard):
+    """Move one user's roadmaps to another shard, e.g. to even out shard sizes.
+
+    The user is marked as moving, which blocks new logins, and logged out
+    everywhere. Web workers can keep trusting a cached session for up to
+    SESSION_CACHE_TTL seconds, so the copy only starts once that window (plus
+    a statement timeout for requests already running) has passed and no
+    request can still write to the old shard. The source rows are deleted
+    after the shard map points at the new shard. If the copy or the switch
+    fails, the copied rows are removed again and the source shard stays in
+    charge.
+    """
+    if not 0 <= shard < len(SHARDS):
+        raise click.BadParameter(f'there are {len(SHARDS)} shards', param_hint='SHARD')
+    with on_shard(GLOBAL_SHARD):
+        user = fetch_one('SELECT id, username FROM users WHERE id=%s', (user_id,))
+    if user is None:
+        raise click.BadParameter('no such user', param_hint='USER_ID')
+    source = shard_for_user(user_id)
+    if source == shard:
+        print(f"User {user_id} is already on shard {shard}")
+        return
+    with on_shard(shard):
+        if any(fetch_one(f'SELECT 1 FROM {table} WHERE user_id=%s', (user_id,)) for table in TENANT_TABLES):
+            raise click.ClickException(f'shard {shard} already has rows for user {user_id}')
+
+    set_user_shard(user_id, source, moving=True)
+    try:
+        app.session_interface.revoke_user(user_id)
+        grace = SESSION_CACHE_TTL + DB_STATEMENT_TIMEOUT_MS / 1000
+        print(f"Waiting {grace:g}s for cached sessions of user {user_id} to expire")
+        time.sleep(grace)
+
+        copy_user_to_shard(user_id, user['username'], shard)
+        try:
+            copied = copy_tenant_rows(source, shard, user_id)
+            get_db(shard).commit()
+        except Exception:
+            get_db(shard).rollback()
+            raise
+
+        try:
+            set_user_shard(user_id, shard)
+        except Exception:
+            target = get_db(shard)
+            cur = target.cursor()
+            for table in reversed(TENANT_TABLES):
+                cur.execute(f'DELETE FROM {table} WHERE user_id=%s', (user_id,))
+            target.commit()
+            raise
+    except Exception:
+        set_user_shard(user_id, source)
+        raise
+
+    db = get_db(source)
+    cur = db.cursor()
+    for table in reversed(TENANT_TABLES):
+        cur.execute(f'DELETE FROM {table} WHERE user_id=%s', (user_id,))
+    db.commit()
+    print(f"Moved user {user_id} from shard {source} to shard {shard}: "
+          f"{copied['categories']} roadmaps, {copied['tasks']} tasks")
+
+# ---------- Idempotency ----------
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_FIELD = 'idempotency_key'
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+@app.template_global()
+def new_idempotency_key():
+    """Fresh key for a form; re-submitting the rendered form sends the same one."""
+    return secrets.token_urlsafe(16)
+
+def cleanup_idempotency_keys():
+    db = get_db()
+    cur = db.cursor()
+    cur.execute('DELETE FROM idempotency_keys WHERE expires_at < %s', (time.time(),))
+    db.commit()
+    return cur.rowcount
+
+def idempotent(f):
+    """Answer a repeated idempotency key with the first response instead of running the view again.
+
+    The key comes from the Idempotency-Key header or an ``idempotency_key``
+    form field; requests without one run as usual. The key is claimed in its
+    own transaction before the view runs, so a duplicate that arrives while
+    the first request is still working is turned away too. Use it below
+    login_required, as keys are stored per user on the user's shard.
+    """
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER) or request.form.get(IDEMPOTENCY_FIELD)
+        if not key:
+            return f(*args, **kwargs)
+        if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            abort(400)
+        user_id = session['user_id']
+        now = time.time()
+        db = get_db()
+        cur = db.cursor()
+        cur.execute('DELETE FROM idempotency_keys WHERE user_id=%s AND expires_at < %s', (user_id, now))
+        cur.execute('''INSERT INTO idempotency_keys(user_id, idempotency_key, endpoint, expires_at)
+                       VALUES(%s,%s,%s,%s) ON CONFLICT(user_id, idempotency_key) DO NOTHING''',
+                    (user_id, key, request.endpoint, now + IDEMPOTENCY_KEY_TTL))
+        claimed = cur.rowcount
+        db.commit()
+        if not claimed:
+            return replay_response(fetch_one('''SELECT endpoint, response FROM idempotency_keys
+                                                 WHERE user_id=%s AND idempotency_key=%s''', (user_id, key)))
+
+        flashed = len(session.get('_flashes', []))
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            # Let the client retry with the same key
+            db.rollback()
+            cur = db.cursor()
+            cur.execute('DELETE FROM idempotency_keys WHERE user_id=%s AND idempotency_key=%s', (user_id, key))
+            db.commit()
+            raise
+        stored = {'status': response.status_code, 'location': response.headers.get('Location'),
+                  'flashes': session.get('_flashes', [])[flashed:]}
+        if stored['location'] is None:
+            stored.update(body=response.get_data(as_text=True), mimetype=response.mimetype)
+        cur = db.cursor()
+        cur.execute('UPDATE idempotency_keys SET response=%s WHERE user_id=%s AND idempotency_key=%s',
+                    (json.dumps(stored), user_id, key))
+        db.commit()
+        return response
+    return wrapper
+
+def replay_response(row):
+    """Rebuild the response stored for an idempotency key, flashes included."""
+    if row is None or row['endpoint'] != request.endpoint:
+        abort(422)
+    if row['response'] is None:
+        flash('Your previous submission is still being processed.', 'info')
+        return redirect(url_for('dashboard'))
+    stored = json.loads(row['response'])
+    for category, message in stored['flashes']:
+        flash(message, category)
+    if stored['location'] is not None:
+        return redirect(stored['location'], stored['status'])
+    return Response(stored['body'], stored['status'], mimetype=stored['mimetype'])
 
 # ---------- Routes ----------
 @app.route('/')
@@ -1471,15 +2682,22 @@ def register():
             db = get_db()
             cur = db.cursor()
             try:
-                cur.execute('INSERT INTO users(username,password,secret_question,secret_answer) VALUES(%s,%s,%s,%s)',
+                cur.execute('''INSERT INTO users(username,password,secret_question,secret_answer) VALUES(%s,%s,%s,%s)
+                               RETURNING id''',
                            (username, generate_password_hash(password), secret_q, generate_password_hash(secret_a.lower())))
+                user_id = cur.fetchone()[0]
+                shard = user_id % len(SHARDS)
+                cur.execute('INSERT INTO user_shards(user_id, shard) VALUES(%s,%s)', (user_id, shard))
+                copy_user_to_shard(user_id, username, shard)
                 db.commit()
                 flash('Account created successfully! You can now log in.', 'success')
                 return redirect(url_for('login'))
-            except Exception as e:
+            except INTEGRITY_ERRORS:
+                # PostgreSQL aborts the transaction, and the session is saved on this connection
+                db.rollback()
                 flash('Username already taken.', 'error')
     
-    return render_with_footer(TPL_REGISTER)
+    return render_with_footer('register.html')
 
 @app.route('/login', methods=['GET','POST'])
 def login():
@@ -1490,13 +2708,17 @@ def login():
         password = request.form['password']
         user = fetch_one('SELECT * FROM users WHERE username=%s', (username,))
         if user and check_password_hash(user['password'], password):
+            if user_is_moving(user['id']):
+                flash(MOVING_MESSAGE, 'warning')
+                return render_with_footer('login.html')
             session['user_id'] = user['id']
+            session['username'] = user['username']
             session.permanent = True
             flash(f'Welcome back, {username}!', 'success')
             return redirect(url_for('dashboard'))
         flash('Invalid credentials.', 'error')
     
-    return render_with_footer(TPL_LOGIN)
+    return render_with_footer('login.html')
 
 @app.route('/forgot', methods=['GET','POST'])
 def forgot():
@@ -1507,10 +2729,10 @@ def forgot():
         user = fetch_one('SELECT * FROM users WHERE username=%s', (username,))
         if user:
             session['reset_user'] = user['id']
-            return render_with_footer(TPL_FORGOT_Q, question=user['secret_question'])
+            return render_with_footer('forgot_q.html', question=user['secret_question'])
         flash('Username not found.', 'error')
     
-    return render_with_footer(TPL_FORGOT)
+    return render_with_footer('forgot.html')
 
 @app.route('/reset', methods=['POST'])
 def reset():
@@ -1524,18 +2746,19 @@ def reset():
     if len(newpass) < 6:
         flash('Password must be at least 6 characters long.', 'error')
         user = fetch_one('SELECT * FROM users WHERE id=%s', (uid,))
-        return render_with_footer(TPL_FORGOT_Q, question=user['secret_question'])
+        return render_with_footer('forgot_q.html', question=user['secret_question'])
     user = fetch_one('SELECT * FROM users WHERE id=%s', (uid,))
     if user and check_password_hash(user['secret_answer'], answer):
         db = get_db()
         cur = db.cursor()
         cur.execute('UPDATE users SET password=%s WHERE id=%s', (generate_password_hash(newpass), uid))
         db.commit()
+        app.session_interface.revoke_user(uid)
         session.pop('reset_user', None)
         flash('Password reset successful. Please log in.', 'success')
         return redirect(url_for('login'))
     flash('Incorrect answer.', 'error')
-    return render_with_footer(TPL_FORGOT_Q, question=user['secret_question'])
+    return render_with_footer('forgot_q.html', question=user['secret_question'])
 
 @app.route('/logout')
 def logout():
@@ -1543,29 +2766,86 @@ def logout():
     flash('You have been logged out successfully.', 'info')
     return redirect(url_for('login'))
 
+def task_counts(user_id):
+    """Numbers for the stat cards; archived tasks count as completed ones."""
+    row = fetch_one('''SELECT COUNT(*) AS active, SUM(CASE WHEN done THEN 1 ELSE 0 END) AS completed,
+                             (SELECT COUNT(*) FROM archived_tasks WHERE user_id=%s) AS archived
+                      FROM tasks WHERE user_id=%s''', (user_id, user_id))
+    return {'active': row['active'], 'archived': row['archived'],
+            'total': row['active'] + row['archived'], 'completed': (row['completed'] or 0) + row['archived']}
+
+def next_up_steps(graphs, category_names):
+    """The Next Up card: the first ready tasks of every roadmap, roadmaps by name."""
+    return [dict(id=task_id, title=graph.titles[task_id], category_name=category_names.get(category_id))
+            for category_id, graph in sorted(graphs.items(), key=lambda item: (item[0] is None,
+                                                                               category_names.get(item[0], '')))
+            for task_id in graph.next_up(NEXT_UP_PER_ROADMAP)]
+
+def task_update(user_id, tid):
+    """JSON for the dashboard to redraw one task card, the stat cards and Next Up without a reload."""
+    task = fetch_one('SELECT id, category_id, done, done_at, created_at FROM tasks WHERE id=%s AND user_id=%s',
+                     (tid, user_id))
+    counts = task_counts(user_id)
+    graphs = get_dependency_graphs(user_id)
+    graph = graphs.get(task['category_id'])
+    categories = fetch_all('SELECT id, name FROM categories WHERE user_id=%s', (user_id,))
+    return jsonify({
+        'ok': True,
+        'task': {'id': task['id'], 'done': bool(task['done']),
+                 'done_at': str(task['done_at'])[:16] if task['done_at'] else None,
+                 'created_at': str(task['created_at'])[:16] if task['created_at'] else None},
+        'counts': {'total': counts['total'], 'completed': counts['completed'],
+                   'streak': completion_streaks(user_id)[0]},
+        'waiting': graph.waiting if graph else {},
+        'next_up': next_up_steps(graphs, {category['id']: category['name'] for category in categories}),
+    })
+
 @app.route('/dashboard')
 @login_required
+@use_replica
 def dashboard():
     user = current_user()
-    categories = fetch_all('SELECT * FROM categories WHERE user_id=%s ORDER BY name', (user['id'],))
-    tasks = fetch_all('''SELECT t.*, c.name as category_name, c.color as category_color 
-                       FROM tasks t 
-                       LEFT JOIN categories c ON t.category_id = c.id 
-                       WHERE t.user_id=%s 
-                       ORDER BY t.done, t.created_at DESC''', (user['id'],))
+    categories = fetch_all('''SELECT c.*, s.token AS share_token, rt.category_id IS NOT NULL AS is_template
+                              FROM categories c
+                              LEFT JOIN share_snapshots s ON s.category_id = c.id
+                              LEFT JOIN roadmap_templates rt ON rt.category_id = c.id
+                              WHERE c.user_id=%s ORDER BY c.name''', (user['id'],))
+    include_archived = request.args.get('archived') == '1'
+    counts = task_counts(user['id'])
+    tasks_query = f'''SELECT t.*, c.name as category_name, c.color as category_color 
+                     FROM {tasks_table(include_archived)} t 
+                     LEFT JOIN categories c ON t.category_id = c.id 
+                     WHERE t.user_id=%s 
+                     ORDER BY t.done, t.category_id, t.position, t.id'''
+    
+    graphs = get_dependency_graphs(user['id'])
+    next_up = next_up_steps(graphs, {category['id']: category['name'] for category in categories})
     
-    total_tasks = len(tasks)
-    completed_tasks = sum(1 for task in tasks if task['done'])
+    context = dict(categories=categories,
+                   username=user['username'],
+                   total_tasks=counts['total'],
+                   completed_tasks=counts['completed'],
+                   archived_tasks=counts['archived'],
+                   streak=completion_streaks(user['id'])[0],
+                   include_archived=include_archived,
+                   next_up=next_up,
+                   waiting={task_id: count for graph in graphs.values()
+                            for task_id, count in graph.waiting.items() if count},
+                   depends_on={task_id: deps for graph in graphs.values()
+                               for task_id, deps in graph.depends_on.items()},
+                   deadlines=upcoming_deadlines(user['id']),
+                   now=datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M'),
+                   live_since=change_broker.next_id() if live_updates_enabled() else None,
+                   flush_every=DASHBOARD_FLUSH_EVERY,
+                   messages=get_flashed_messages(with_categories=True))
     
-    return render_with_footer(TPL_DASHBOARD, 
-                            tasks=tasks,
-                            categories=categories,
-                            username=user['username'],
-                            total_tasks=total_tasks,
-                            completed_tasks=completed_tasks)
+    if counts['active'] + (counts['archived'] if include_archived else 0) >= DASHBOARD_STREAM_THRESHOLD:
+        return Response(stream_with_footer('dashboard.html', tasks=iter_query(tasks_query, (user['id'],)), **context))
+    return render_with_footer('dashboard.html', tasks=fetch_all(tasks_query, (user['id'],)), **context)
 
 @app.route('/add_category', methods=['POST'])
 @login_required
+@idempotent
 def add_category():
     name = request.form.get('name','').strip()
     description = request.form.get('description','').strip()
@@ -1573,8 +2853,9 @@ def add_category():
     if name:
         db = get_db()
         cur = db.cursor()
-        cur.execute('INSERT INTO categories(user_id,name,description,color) VALUES(%s,%s,%s,%s)', 
+        cur.execute('INSERT INTO categories(user_id,name,description,color) VALUES(%s,%s,%s,%s) RETURNING id', 
                    (session['user_id'], name, description, color))
+        record_event(cur, session['user_id'], 'category_created', category_id=cur.fetchone()[0])
         db.commit()
         flash('Roadmap added successfully!', 'success')
     else:
@@ -1583,56 +2864,152 @@ def add_category():
 
 @app.route('/add_task', methods=['POST'])
 @login_required
+@idempotent
 def add_task():
     title = request.form.get('title','').strip()
     notes = request.form.get('notes','').strip()
     category_id = request.form.get('category_id')
+    due_at = parse_due_at(request.form.get('due_at'))
     if title:
+        category_id = int(category_id) if category_id else None
         db = get_db()
         cur = db.cursor()
-        cur.execute('INSERT INTO tasks(user_id,title,notes,category_id) VALUES(%s,%s,%s,%s)', 
-                   (session['user_id'], title, notes, category_id if category_id else None))
+        cur.execute('INSERT INTO tasks(user_id,title,notes,category_id,position,due_at) VALUES(%s,%s,%s,%s,%s,%s) RETURNING id', 
+                   (session['user_id'], title, notes, category_id,
+                    next_position(cur, session['user_id'], category_id), due_at))
+        tid = cur.fetchone()[0]
+        record_event(cur, session['user_id'], 'created', task_id=tid, category_id=category_id)
+        schedule_reminder(cur, session['user_id'], tid, due_at)
+        expire_share_snapshots(cur, category_id)
         db.commit()
+        invalidate_dependency_graphs(session['user_id'])
         flash('Task added successfully!', 'success')
     else:
         flash('Task title cannot be empty.', 'error')
     return redirect(url_for('dashboard'))
 
+IMPORT_COLORS = ['#6366f1', '#8b5cf6', '#f59e0b', '#10b981', '#ef4444', '#06b6d4']
+IMPORT_BATCH_SIZE = 1000
+
+def insert_tasks(cur, rows):
+    """Insert (user_id, category_id, title, notes, done, done_at, position) rows in batched statements."""
+    if not rows:
+        return
+    if DEBUG:
+        cur.executemany('INSERT INTO tasks(user_id,category_id,title,notes,done,done_at,position) '
+                        'VALUES(%s,%s,%s,%s,%s,%s,%s)', rows)
+    else:
+        execute_values(cur, 'INSERT INTO tasks(user_id,category_id,title,notes,done,done_at,position) VALUES %s',
+                       rows, page_size=IMPORT_BATCH_SIZE)
+
+def import_categories(user_id, categories_data, merge=True):
+    """Insert parsed roadmaps and return created/merged/skipped/imported counts.
+
+    With ``merge``, roadmaps are matched to existing ones by name
+    (case-insensitively) and tasks already in the target roadmap are
+    skipped. Existing roadmaps and their titles are loaded in a single query
+    for the whole import, and new tasks go in through batched inserts.
+    """
+    db = get_db()
+    cur = db.cursor()
+    counts = {'created': 0, 'merged': 0, 'skipped': 0, 'imported': 0}
+    existing = {}
+    seen = set()
+    last_position = {}
+
+    names = {category_data['name'].lower() for category_data in categories_data}
+    if merge and names:
+        placeholders = ','.join(['%s'] * len(names))
+        cur.execute(f'''SELECT c.id, c.name, t.title, t.position
+                        FROM categories c
+                        LEFT JOIN {tasks_table(include_archived=True)} t ON t.category_id = c.id AND t.user_id = c.user_id
+                        WHERE c.user_id=%s AND lower(c.name) IN ({placeholders})
+                        ORDER BY c.id''', (user_id, *names))
+        for category_id, name, title, position in cur.fetchall():
+            existing.setdefault(name.lower(), category_id)
+            if title is not None:
+                seen.add((category_id, title.lower()))
+            if position is not None:
+                last_position[category_id] = max(position, last_position.get(category_id, 0))
+    preexisting = set(existing.values())
+    merged = set()
+
+    rows = []
+    imported = 0
+    created = Counter()
+    completed = Counter()
+    now = datetime.now(timezone.utc)
+    for category_data in categories_data:
+        key = category_data['name'].lower()
+        category_id = existing.get(key)
+        if category_id is None:
+            cur.execute('INSERT INTO categories(user_id,name,color) VALUES(%s,%s,%s) RETURNING id', 
+                       (user_id, category_data['name'], random.choice(IMPORT_COLORS)))
+            category_id = cur.fetchone()[0]
+            counts['created'] += 1
+            record_event(cur, user_id, 'category_created', category_id=category_id)
+            if merge:
+                existing[key] = category_id
+        elif category_id in preexisting and category_id not in merged:
+            merged.add(category_id)
+            counts['merged'] += 1
+
+        for task in category_data['tasks']:
+            if isinstance(task, str):
+                task = {'title': task}
+            if merge:
+                task_key = (category_id, task['title'].lower())
+                if task_key in seen:
+                    counts['skipped'] += 1
+                    continue
+                seen.add(task_key)
+            last_position[category_id] = last_position.get(category_id, 0) + POSITION_GAP
+            created[category_id] += 1
+            done = bool(task.get('done'))
+            # A task can't be finished before it exists here, so the burn-down counts it done on import
+            completed[category_id] += done
+            rows.append((user_id, category_id, task['title'], task.get('notes'),
+                         done, (task.get('done_at') or now) if done else None, last_position[category_id]))
+            if len(rows) >= IMPORT_BATCH_SIZE:
+                insert_tasks(cur, rows)
+                imported += len(rows)
+                rows = []
+
+    insert_tasks(cur, rows)
+    for category_id, amount in created.items():
+        record_event(cur, user_id, 'created', category_id=category_id, amount=amount)
+    for category_id, amount in completed.items():
+        if amount:
+            record_event(cur, user_id, 'completed', category_id=category_id, amount=amount)
+    expire_share_snapshots(cur, *created)
+    db.commit()
+    counts['imported'] = imported + len(rows)
+    return counts
+
 @app.route('/bulk_import', methods=['POST'])
 @login_required
+@idempotent
 def bulk_import():
     bulk_text = request.form.get('bulk_text', '').strip()
+    upload = request.files.get('bulk_file')
+    if upload and upload.filename:
+        bulk_text = upload.read().decode('utf-8-sig').strip()
     if not bulk_text:
         flash('Please enter some content to import.', 'error')
         return redirect(url_for('dashboard'))
     
     try:
-        categories_data = parse_bulk_import(bulk_text)
-        db = get_db()
-        cur = db.cursor()
-        
-        imported_count = 0
-        colors = ['#6366f1', '#8b5cf6', '#f59e0b', '#10b981', '#ef4444', '#06b6d4']
-        
-        for category_data in categories_data:
-            color = random.choice(colors)
-            cur.execute('INSERT INTO categories(user_id,name,color) VALUES(%s,%s,%s) RETURNING id', 
-                       (session['user_id'], category_data['name'], color))
-            
-            if DEBUG:
-                category_id = cur.lastrowid
-            else:
-                category_id = cur.fetchone()[0]
-            
-            for task_title in category_data['tasks']:
-                cur.execute('INSERT INTO tasks(user_id,title,category_id) VALUES(%s,%s,%s)', 
-                           (session['user_id'], task_title, category_id))
-                imported_count += 1
-        
-        db.commit()
-        flash(f'Successfully imported {imported_count} tasks across {len(categories_data)} roadmaps!', 'success')
+        categories_data = parse_import(bulk_text, request.form.get('format', 'auto'))
+        counts = import_categories(session['user_id'], categories_data, merge=bool(request.form.get('merge')))
+        invalidate_dependency_graphs(session['user_id'])
+        flash(f"Imported {counts['imported']} tasks: {counts['created']} new roadmaps, "
+              f"{counts['merged']} merged, {counts['skipped']} duplicate tasks skipped.", 'success')
         
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
+        # Leave the connection usable for @idempotent, which stores this response on it
+        get_db().rollback()
         flash(f'Error importing data: {str(e)}', 'error')
     
     return redirect(url_for('dashboard'))
@@ -1642,24 +3019,326 @@ def bulk_import():
 def mark_done():
     data = request.get_json()
     tid = data.get('id')
+    task = fetch_one('SELECT category_id FROM tasks WHERE id=%s AND user_id=%s', (tid, session['user_id']))
+    if task is None:
+        return jsonify({'ok': False, 'error': 'Task not found'}), 404
     db = get_db()
     cur = db.cursor()
-    cur.execute('UPDATE tasks SET done=TRUE, done_at=%s WHERE id=%s AND user_id=%s',
+    cur.execute('UPDATE tasks SET done=TRUE, done_at=%s WHERE id=%s AND user_id=%s AND NOT done',
                (datetime.now(timezone.utc), tid, session['user_id']))
+    if cur.rowcount:
+        record_event(cur, session['user_id'], 'completed', task_id=tid, category_id=task['category_id'])
+        schedule_reminder(cur, session['user_id'], tid, None)
+        expire_share_snapshots(cur, task['category_id'])
     db.commit()
-    return jsonify({'ok': True})
+    set_cached_task_done(session['user_id'], tid, True)
+    return task_update(session['user_id'], tid)
 
 @app.route('/unset_done', methods=['POST'])
 @login_required
 def unset_done():
     data = request.get_json()
     tid = data.get('id')
+    task = fetch_one('SELECT category_id, due_at FROM tasks WHERE id=%s AND user_id=%s', (tid, session['user_id']))
+    if task is None:
+        return jsonify({'ok': False, 'error': 'Task not found'}), 404
     db = get_db()
     cur = db.cursor()
-    cur.execute('UPDATE tasks SET done=FALSE, done_at=NULL WHERE id=%s AND user_id=%s', 
+    cur.execute('UPDATE tasks SET done=FALSE, done_at=NULL WHERE id=%s AND user_id=%s AND done', 
                (tid, session['user_id']))
+    if cur.rowcount:
+        record_event(cur, session['user_id'], 'reopened', task_id=tid, category_id=task['category_id'])
+        schedule_reminder(cur, session['user_id'], tid, parse_timestamp(task['due_at']))
+        expire_share_snapshots(cur, task['category_id'])
     db.commit()
-    return jsonify({'ok': True})
+    set_cached_task_done(session['user_id'], tid, False)
+    return task_update(session['user_id'], tid)
+
+@app.route('/move_task', methods=['POST'])
+@login_required
+def move_task():
+    """Move a task between two neighbours, rewriting only the moved row.
+
+    The task joins the roadmap of ``after_id`` (the task it now follows),
+    or of ``before_id`` when dropped first in a list.
+    """
+    data = request.get_json()
+    tid = data.get('id')
+    neighbour_ids = [nid for nid in (data.get('after_id'), data.get('before_id')) if nid]
+    if not tid or not neighbour_ids:
+        return jsonify({'ok': False, 'error': 'A neighbouring task is required'}), 400
+    placeholders = ','.join(['%s'] * (len(neighbour_ids) + 1))
+    rows = {row['id']: row for row in fetch_all(
+        f'SELECT id, category_id, position FROM tasks WHERE user_id=%s AND id IN ({placeholders})',
+        (session['user_id'], tid, *neighbour_ids))}
+    task = rows.get(tid)
+    after = rows.get(data.get('after_id'))
+    before = rows.get(data.get('before_id'))
+    if task is None or (after is None and before is None):
+        return jsonify({'ok': False, 'error': 'Task not found'}), 404
+    category_id = (after or before)['category_id']
+    if after is not None and before is not None and before['category_id'] != category_id:
+        before = None
+
+    lower = after['position'] if after else None
+    upper = before['position'] if before else None
+    position = position_between(lower, upper)
+    db = get_db()
+    cur = db.cursor()
+    cur.execute('UPDATE tasks SET category_id=%s, position=%s WHERE id=%s AND user_id=%s',
+               (category_id, position, tid, session['user_id']))
+    if category_id != task['category_id']:
+        clear_dependencies(cur, session['user_id'], tid)
+    record_event(cur, session['user_id'], 'moved', task_id=tid, category_id=category_id)
+    expire_share_snapshots(cur, category_id, task['category_id'])
+    db.commit()
+    invalidate_dependency_graphs(session['user_id'])
+    if lower is not None and upper is not None and upper - lower < 2 * POSITION_MIN_GAP:
+        schedule_rebalance(session['user_id'], category_id)
+    return jsonify({'ok': True, 'category_id': category_id, 'position': position})
+
+@app.route('/next_up')
+@login_required
+@use_replica
+def next_up():
+    """Open tasks with no unfinished prerequisites, for one roadmap or all of them."""
+    category_id = request.args.get('category_id', type=int)
+    graphs = get_dependency_graphs(session['user_id'])
+    if 'category_id' in request.args:
+        graphs = {category_id: graphs[category_id]} if category_id in graphs else {}
+    limit = request.args.get('limit', NEXT_UP_PER_ROADMAP, type=int)
+    return jsonify({'tasks': [{'id': task_id, 'title': graph.titles[task_id], 'category_id': cid}
+                              for cid, graph in graphs.items() for task_id in graph.next_up(limit)]})
+
+@app.route(EVENTS_PATH)
+@login_required
+def events():
+    """Server-Sent Events stream of the user's changes, for dashboards open in other tabs and devices.
+
+    Under asgi_app this view is bypassed and the stream runs on the event loop.
+    """
+    if not live_updates_enabled():
+        abort(404)
+    return Response(event_stream(session['user_id'], stream_resume_point()), mimetype='text/event-stream',
+                    headers=SSE_HEADERS)
+
+@app.route('/tasks/<int:tid>/state')
+@login_required
+def task_state(tid):
+    """The same JSON mark_done returns, for a dashboard catching up on another tab's change."""
+    if fetch_one('SELECT 1 FROM tasks WHERE id=%s AND user_id=%s', (tid, session['user_id'])) is None:
+        return jsonify({'ok': False, 'error': 'Task not found'}), 404
+    return task_update(session['user_id'], tid)
+
+@app.route('/analytics')
+@login_required
+@use_replica
+def analytics():
+    """Progress series, streaks and burn-down for charts, served from the daily rollups."""
+    days = max(1, min(request.args.get('days', 30, type=int), ANALYTICS_MAX_DAYS))
+    return jsonify(activity_summary(session['user_id'], days))
+
+@app.route('/share_category/<int:cid>', methods=['POST'])
+@login_required
+def share_category(cid):
+    token = secrets.token_urlsafe(16)
+    db = get_db()
+    cur = db.cursor()
+    cur.execute('''INSERT INTO share_snapshots(token, user_id, category_id)
+                   SELECT %s, user_id, id FROM categories WHERE id=%s AND user_id=%s
+                   ON CONFLICT(category_id) DO NOTHING''', (token, cid, session['user_id']))
+    shared = cur.rowcount
+    db.commit()
+    if shared:
+        global_db = get_db(GLOBAL_SHARD)
+        global_db.cursor().execute('INSERT INTO share_tokens(token, user_id) VALUES(%s,%s)', (token, session['user_id']))
+        global_db.commit()
+    flash('Roadmap shared. Anyone with the link can view it.', 'success')
+    return redirect(url_for('dashboard'))
+
+@app.route('/unshare_category/<int:cid>', methods=['POST'])
+@login_required
+def unshare_category(cid):
+    db = get_db()
+    cur = db.cursor()
+    cur.execute('DELETE FROM share_snapshots WHERE category_id=%s AND user_id=%s RETURNING token',
+                (cid, session['user_id']))
+    tokens = [row[0] for row in cur.fetchall()]
+    db.commit()
+    drop_share_tokens(tokens)
+    share_cache.discard_where(lambda snapshot: snapshot['category_id'] == cid)
+    flash('Roadmap is no longer shared.', 'info')
+    return redirect(url_for('dashboard'))
+
+@app.route(SHARE_PATH + '<token>')
+@use_replica
+def shared_roadmap(token):
+    """Public read-only roadmap page; no session, and usually no query or render either."""
+    snapshot = share_cache.get(token)
+    if snapshot is None:
+        shard = share_token_shard(token)
+        if shard is None:
+            abort(404)
+        with on_shard(shard):
+            snapshot = load_share_snapshot(token)
+        if snapshot is None:
+            abort(404)
+        share_cache.set(token, snapshot)
+    response = Response(snapshot['html'], mimetype='text/html')
+    response.set_etag(snapshot['etag'])
+    response.cache_control.public = True
+    response.cache_control.max_age = SHARE_MAX_AGE
+    return response.make_conditional(request)
+
+TEMPLATE_LIBRARY_SIZE = 100
+
+@app.route('/templates')
+@login_required
+@use_replica
+def template_library():
+    # Each shard returns its own top templates; the library keeps the best of those
+    templates = []
+    for shard in each_shard():
+        templates += fetch_all('''SELECT c.id, c.name, c.description, c.color, u.username, rt.user_id AS owner_id,
+                                         rt.clones, rt.published_at,
+                                         (SELECT COUNT(*) FROM tasks t WHERE t.category_id = c.id AND t.user_id = c.user_id) AS steps
+                                  FROM roadmap_templates rt
+                                  JOIN categories c ON c.id = rt.category_id
+                                  JOIN users u ON u.id = rt.user_id
+                                  ORDER BY rt.clones DESC, rt.published_at DESC
+                                  LIMIT %s''', (TEMPLATE_LIBRARY_SIZE,))
+    templates = heapq.nlargest(TEMPLATE_LIBRARY_SIZE, templates,
+                               key=lambda template: (template['clones'], str(template['published_at'])))
+    return render_with_footer('template_library.html', templates=templates)
+
+@app.route('/publish_category/<int:cid>', methods=['POST'])
+@login_required
+def publish_category(cid):
+    db = get_db()
+    cur = db.cursor()
+    cur.execute('''INSERT INTO roadmap_templates(category_id, user_id)
+                   SELECT id, user_id FROM categories WHERE id=%s AND user_id=%s
+                   ON CONFLICT(category_id) DO NOTHING''', (cid, session['user_id']))
+    db.commit()
+    flash('Roadmap published to the template library.', 'success')
+    return redirect(url_for('dashboard'))
+
+@app.route('/unpublish_category/<int:cid>', methods=['POST'])
+@login_required
+def unpublish_category(cid):
+    db = get_db()
+    cur = db.cursor()
+    cur.execute('DELETE FROM roadmap_templates WHERE category_id=%s AND user_id=%s', (cid, session['user_id']))
+    db.commit()
+    flash('Roadmap removed from the template library.', 'info')
+    return redirect(url_for('dashboard'))
+
+def reserve_task_ids(cur, count):
+    """Reserve ``count`` task ids in one statement, for inserts that need their ids up front.
+
+    On SQLite the ids continue the table's AUTOINCREMENT counter; call this
+    after the transaction's first write so the database lock keeps them ours
+    until commit. Inserting them moves the counter past the block.
+    """
+    if not count:
+        return []
+    if DEBUG:
+        cur.execute("SELECT seq FROM sqlite_sequence WHERE name='tasks'")
+        row = cur.fetchone()
+        first = (row[0] if row else 0) + 1
+        return list(range(first, first + count))
+    cur.execute("SELECT nextval(pg_get_serial_sequence('tasks', 'id')) FROM generate_series(1, %s)", (count,))
+    return [row[0] for row in cur.fetchall()]
+
+def copy_template_tasks(cur, user_id, category_id, tasks, edges):
+    """Insert copies of a template's tasks into ``category_id``, then the dependencies between them.
+
+    Ids for the copies are reserved up front, so dependencies are remapped by
+    the original task id (titles and positions may repeat within a roadmap)
+    and both tables are filled with batched inserts; the number of queries
+    does not grow with the roadmap.
+    """
+    copy_of = dict(zip([task['id'] for task in tasks], reserve_task_ids(cur, len(tasks))))
+    task_rows = [(copy_of[task['id']], user_id, category_id, task['title'], task['notes'], task['position'])
+                 for task in tasks]
+    edge_rows = [(user_id, copy_of[edge['task_id']], copy_of[edge['depends_on_id']])
+                 for edge in edges if edge['task_id'] in copy_of and edge['depends_on_id'] in copy_of]
+    if DEBUG:
+        cur.executemany('INSERT INTO tasks(id,user_id,category_id,title,notes,position) VALUES(%s,%s,%s,%s,%s,%s)',
+                        task_rows)
+        cur.executemany('''INSERT INTO task_dependencies(user_id, task_id, depends_on_id) VALUES(%s,%s,%s)
+                           ON CONFLICT(task_id, depends_on_id) DO NOTHING''', edge_rows)
+    else:
+        execute_values(cur, 'INSERT INTO tasks(id,user_id,category_id,title,notes,position) VALUES %s',
+                       task_rows, page_size=IMPORT_BATCH_SIZE)
+        execute_values(cur, '''INSERT INTO task_dependencies(user_id, task_id, depends_on_id) VALUES %s
+                               ON CONFLICT(task_id, depends_on_id) DO NOTHING''',
+                       edge_rows, page_size=IMPORT_BATCH_SIZE)
+
+def template_tasks(owner_id, cid):
+    """A template's tasks and the dependencies between them, read from the current shard."""
+    tasks = fetch_all('''SELECT id, title, notes, position FROM tasks
+                         WHERE category_id=%s AND user_id=%s ORDER BY position, id''', (cid, owner_id))
+    edges = fetch_all('''SELECT d.task_id, d.depends_on_id FROM task_dependencies d
+                         JOIN tasks t ON t.id = d.task_id WHERE t.category_id=%s AND d.user_id=%s''',
+                      (cid, owner_id))
+    return tasks, edges
+
+def copy_template_within_shard(cur, user_id, owner_id, cid):
+    """Clone a template that lives on the current shard; returns (category_id, steps), or None if not published."""
+    cur.execute('''INSERT INTO categories(user_id, name, description, color)
+                   SELECT %s, c.name, c.description, c.color
+                   FROM roadmap_templates rt JOIN categories c ON c.id = rt.category_id
+                   WHERE rt.category_id=%s AND rt.user_id=%s
+                   RETURNING id''', (user_id, cid, owner_id))
+    row = cur.fetchone()
+    if row is None:
+        return None
+    category_id = row[0]
+    tasks, edges = template_tasks(owner_id, cid)
+    copy_template_tasks(cur, user_id, category_id, tasks, edges)
+    cur.execute('UPDATE roadmap_templates SET clones = clones + 1 WHERE category_id=%s', (cid,))
+    return category_id, len(tasks)
+
+def copy_template_across_shards(cur, user_id, owner_id, owner_shard, cid):
+    """Clone a template from another shard: read it there, then batch-insert it here."""
+    with on_shard(owner_shard):
+        category = fetch_one('''SELECT c.name, c.description, c.color
+                                FROM roadmap_templates rt JOIN categories c ON c.id = rt.category_id
+                                WHERE rt.category_id=%s AND rt.user_id=%s''', (cid, owner_id))
+        if category is None:
+            return None
+        tasks, edges = template_tasks(owner_id, cid)
+    cur.execute('INSERT INTO categories(user_id, name, description, color) VALUES(%s,%s,%s,%s) RETURNING id',
+               (user_id, category['name'], category['description'], category['color']))
+    category_id = cur.fetchone()[0]
+    copy_template_tasks(cur, user_id, category_id, tasks, edges)
+    owner_db = get_db(owner_shard)
+    owner_db.cursor().execute('UPDATE roadmap_templates SET clones = clones + 1 WHERE category_id=%s', (cid,))
+    owner_db.commit()
+    return category_id, len(tasks)
+
+@app.route('/templates/<int:owner_id>/<int:cid>/clone', methods=['POST'])
+@login_required
+def clone_template(owner_id, cid):
+    """Copy a published roadmap into the current account, wherever the owner's shard is."""
+    user_id = session['user_id']
+    owner_shard = shard_for_user(owner_id)
+    db = get_db()
+    cur = db.cursor()
+    if owner_shard == current_shard():
+        cloned = copy_template_within_shard(cur, user_id, owner_id, cid)
+    else:
+        cloned = copy_template_across_shards(cur, user_id, owner_id, owner_shard, cid)
+    if cloned is None:
+        abort(404)
+    category_id, steps = cloned
+    record_event(cur, user_id, 'category_created', category_id=category_id)
+    record_event(cur, user_id, 'created', category_id=category_id, amount=steps)
+    db.commit()
+    invalidate_dependency_graphs(user_id)
+    flash(f'Roadmap cloned with {steps} steps.', 'success')
+    return redirect(url_for('dashboard'))
 
 @app.route('/delete_category/<int:cid>', methods=['POST'])
 @login_required
@@ -1667,45 +3346,523 @@ def delete_category(cid):
     db = get_db()
     cur = db.cursor()
     cur.execute('DELETE FROM categories WHERE id=%s AND user_id=%s', (cid, session['user_id']))
+    if cur.rowcount:
+        record_event(cur, session['user_id'], 'category_deleted', category_id=cid)
+        cur.execute('DELETE FROM share_snapshots WHERE category_id=%s RETURNING token', (cid,))
+        tokens = [row[0] for row in cur.fetchall()]
+        cur.execute('DELETE FROM roadmap_templates WHERE category_id=%s', (cid,))
+        share_cache.discard_where(lambda snapshot: snapshot['category_id'] == cid)
+    else:
+        tokens = []
     db.commit()
+    drop_share_tokens(tokens)
+    invalidate_dependency_graphs(session['user_id'])
     flash('Roadmap deleted successfully!', 'success')
     return redirect(url_for('dashboard'))
 
 @app.route('/delete_task/<int:tid>', methods=['POST'])
 @login_required
 def delete_task(tid):
+    task = fetch_one(f'SELECT category_id, done FROM {tasks_table(True)} t WHERE id=%s AND user_id=%s',
+                     (tid, session['user_id']))
     db = get_db()
     cur = db.cursor()
+    clear_dependencies(cur, session['user_id'], tid)
+    if task:
+        schedule_reminder(cur, session['user_id'], tid, None)
     cur.execute('DELETE FROM tasks WHERE id=%s AND user_id=%s', (tid, session['user_id']))
+    cur.execute('DELETE FROM archived_tasks WHERE id=%s AND user_id=%s', (tid, session['user_id']))
+    if task:
+        # Only open tasks count towards the burn-down
+        record_event(cur, session['user_id'], 'deleted', task_id=tid, category_id=task['category_id'],
+                     rollup=not task['done'])
+        expire_share_snapshots(cur, task['category_id'])
     db.commit()
+    invalidate_dependency_graphs(session['user_id'])
     flash('Task deleted successfully!', 'success')
     return redirect(url_for('dashboard'))
 
+@app.route('/restore_task/<int:tid>', methods=['POST'])
+@login_required
+def restore_task(tid):
+    db = get_db()
+    cur = db.cursor()
+    cur.execute(f'''INSERT INTO tasks({TASK_COLUMNS})
+                    SELECT {TASK_COLUMNS} FROM archived_tasks WHERE id=%s AND user_id=%s''', (tid, session['user_id']))
+    if cur.rowcount:
+        record_event(cur, session['user_id'], 'restored', task_id=tid)
+        cur.execute('SELECT category_id FROM tasks WHERE id=%s', (tid,))
+        expire_share_snapshots(cur, cur.fetchone()[0])
+    cur.execute('DELETE FROM archived_tasks WHERE id=%s AND user_id=%s', (tid, session['user_id']))
+    db.commit()
+    invalidate_dependency_graphs(session['user_id'])
+    flash('Task restored from the archive.', 'success')
+    return redirect(url_for('dashboard', archived=1))
+
 @app.route('/edit_task/<int:tid>', methods=['POST'])
 @login_required
 def edit_task(tid):
     title = request.form.get('title','').strip()
     notes = request.form.get('notes','').strip()
     category_id = request.form.get('category_id')
+    due_at = parse_due_at(request.form.get('due_at'))
     if title:
+        category_id = int(category_id) if category_id else None
         db = get_db()
         cur = db.cursor()
-        cur.execute('UPDATE tasks SET title=%s, notes=%s, category_id=%s WHERE id=%s AND user_id=%s', 
-                   (title, notes, category_id if category_id else None, tid, session['user_id']))
+        task = fetch_one('SELECT category_id, position, done FROM tasks WHERE id=%s AND user_id=%s', (tid, session['user_id']))
+        if not task:
+            abort(404)
+        moved = task['category_id'] != category_id
+        position = None if moved else task['position']
+        if position is None:
+            position = next_position(cur, session['user_id'], category_id)
+        cur.execute('UPDATE tasks SET title=%s, notes=%s, category_id=%s, position=%s, due_at=%s WHERE id=%s AND user_id=%s', 
+                   (title, notes, category_id, position, due_at, tid, session['user_id']))
+        try:
+            if moved:
+                clear_dependencies(cur, session['user_id'], tid)
+            else:
+                set_dependencies(cur, session['user_id'], tid, category_id,
+                                 {int(dep) for dep in request.form.getlist('depends_on') if dep})
+        except ValueError as e:
+            db.rollback()
+            flash(f'Task not updated: {e}', 'error')
+            return redirect(url_for('dashboard'))
+        record_event(cur, session['user_id'], 'moved' if moved else 'edited', task_id=tid, category_id=category_id)
+        schedule_reminder(cur, session['user_id'], tid, None if task['done'] else due_at)
+        expire_share_snapshots(cur, category_id, task['category_id'])
         db.commit()
+        invalidate_dependency_graphs(session['user_id'])
         flash('Task updated successfully!', 'success')
     else:
         flash('Task title cannot be empty.', 'error')
     return redirect(url_for('dashboard'))
 
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'text': ('text/plain', 'txt'),
+}
+EXPORT_CHUNK_ROWS = 500
+EXPORT_COLUMNS = ['category', 'category_description', 'category_color',
+                  'title', 'notes', 'done', 'done_at', 'created_at']
+
+def iter_export_rows(user_id, include_archived=True):
+    """Stream a user's tasks grouped by roadmap, uncategorized tasks last.
+
+    Roadmaps without tasks are yielded once with ``task_id`` set to None.
+    """
+    source = tasks_table(include_archived)
+    return itertools.chain(iter_query(f'''SELECT c.id AS category_id, c.name AS category_name,
+                                                c.description AS category_description, c.color AS category_color,
+                                                c.created_at AS category_created_at,
+                                                t.id AS task_id, t.title, t.notes, t.done, t.done_at, t.created_at
+                                         FROM categories c
+                                         LEFT JOIN {source} t ON t.category_id = c.id AND t.user_id = c.user_id
+                                         WHERE c.user_id=%s
+                                         ORDER BY c.name, c.id, t.position, t.id''', (user_id,)),
+                           iter_query(f'''SELECT NULL AS category_id, NULL AS category_name,
+                                                NULL AS category_description, NULL AS category_color,
+                                                NULL AS category_created_at,
+                                                id AS task_id, title, notes, done, done_at, created_at
+                                         FROM {source} t
+                                         WHERE user_id=%s AND category_id IS NULL
+                                         ORDER BY position, id''', (user_id,)))
+
+def export_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for i, row in enumerate(rows, 1):
+        writer.writerow([row['category_name'] or '', row['category_description'] or '', row['category_color'] or '',
+                         row['title'] or '', row['notes'] or '',
+                         '' if row['task_id'] is None else int(bool(row['done'])),
+                         row['done_at'] or '', row['created_at'] or ''])
+        if i % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def export_jsonl(rows):
+    chunk = []
+    last_category = None
+    for row in rows:
+        if row['category_id'] is not None and row['category_id'] != last_category:
+            last_category = row['category_id']
+            chunk.append(json.dumps({'type': 'category', 'id': row['category_id'], 'name': row['category_name'],
+                                     'description': row['category_description'], 'color': row['category_color'],
+                                     'created_at': row['category_created_at']}, default=str))
+        if row['task_id'] is not None:
+            chunk.append(json.dumps({'type': 'task', 'id': row['task_id'], 'category_id': row['category_id'],
+                                     'title': row['title'], 'notes': row['notes'], 'done': bool(row['done']),
+                                     'done_at': row['done_at'], 'created_at': row['created_at']}, default=str))
+        if len(chunk) >= EXPORT_CHUNK_ROWS:
+            yield '\n'.join(chunk) + '\n'
+            chunk = []
+    if chunk:
+        yield '\n'.join(chunk) + '\n'
+
+def export_text(rows):
+    """Bulk-import text format; parse_bulk_import() reads it back into the same roadmaps."""
+    chunk = []
+    last_category = None
+    for row in rows:
+        category = row['category_id'] if row['category_id'] is not None else 'general'
+        if category != last_category:
+            last_category = category
+            if chunk:
+                chunk.append('')
+            chunk.append(format_bulk_import_header(row['category_name'] or 'General'))
+        if row['task_id'] is not None:
+            chunk.append(format_bulk_import_task(row['title']))
+        if len(chunk) >= EXPORT_CHUNK_ROWS:
+            yield '\n'.join(chunk) + '\n'
+            chunk = []
+    if chunk:
+        yield '\n'.join(chunk) + '\n'
+
+EXPORTERS = {'csv': export_csv, 'jsonl': export_jsonl, 'text': export_text}
+
+@app.route('/export')
+@login_required
+@use_replica
+def export():
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in EXPORT_FORMATS:
+        flash('Unknown export format.', 'error')
+        return redirect(url_for('dashboard'))
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    filename = f"roadmaps-{datetime.now().strftime('%Y%m%d')}.{extension}"
+    body = EXPORTERS[fmt](iter_export_rows(session['user_id'], include_archived=request.args.get('archived') != '0'))
+    return Response(stream_with_context(body), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+# ---------- Health ----------
+class InFlightMiddleware:
+    """Counts requests from arrival until their response body is closed."""
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        process_stats.incr('requests_in_flight')
+        process_stats.incr('requests_total')
+        try:
+            app_iter = self.wsgi_app(environ, start_response)
+        except BaseException:
+            process_stats.incr('requests_in_flight', -1)
+            raise
+        return ClosingIterator(app_iter, lambda: process_stats.incr('requests_in_flight', -1))
+
+app.wsgi_app = InFlightMiddleware(app.wsgi_app)
+
+@app.route('/healthz')
+def healthz():
+    return jsonify({'status': 'ok'})
+
+def wait_for_poll(db, deadline):
+    """Drive an async psycopg2 connection until its pending operation finishes or ``deadline`` passes."""
+    while True:
+        state = db.poll()
+        if state == psycopg2.extensions.POLL_OK:
+            return
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise TimeoutError('database check timed out')
+        waiting = [db.fileno()]
+        if state == psycopg2.extensions.POLL_READ:
+            select.select(waiting, [], [], remaining)
+        else:
+            select.select([], waiting, [], remaining)
+
+def probe_shard(shard, timeout_ms):
+    """Run SELECT 1 on a fresh connection to ``shard``, giving up after ``timeout_ms``.
+
+    get_db() would wait DB_CONNECT_TIMEOUT for an unreachable server, and
+    libpq's own connect timeout has whole-second resolution, so the probe
+    drives an async connection against its own deadline.
+    """
+    if not db_breakers[shard].allow():
+        raise DatabaseUnavailable(f'circuit open for shard {shard}')
+    if DEBUG:
+        db = sqlite3.connect(SHARDS[shard], timeout=timeout_ms / 1000)
+        try:
+            db.execute('SELECT 1')
+        finally:
+            db.close()
+        return
+    deadline = time.perf_counter() + timeout_ms / 1000
+    db = psycopg2.connect(SHARDS[shard], async_=True)
+    try:
+        wait_for_poll(db, deadline)
+        db.cursor().execute('SELECT 1')
+        wait_for_poll(db, deadline)
+    finally:
+        db.close()
+
+@app.route('/readyz')
+def readyz():
+    started = time.perf_counter()
+    for shard in range(len(SHARDS)):
+        remaining_ms = READY_TIMEOUT_MS - (time.perf_counter() - started) * 1000
+        if remaining_ms <= 0:
+            break
+        try:
+            probe_shard(shard, remaining_ms)
+        except Exception as e:
+            return jsonify({'status': 'unavailable', 'shard': shard, 'error': str(e)}), 503
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if elapsed_ms > READY_TIMEOUT_MS:
+        return jsonify({'status': 'unavailable', 'error': 'database check timed out', 'db_ms': round(elapsed_ms, 2)}), 503
+    return jsonify({'status': 'ready', 'db_ms': round(elapsed_ms, 2)})
+
+@app.route('/admin/status')
+def admin_status():
+    if not is_admin():
+        abort(404)
+    return jsonify({
+        'pid': os.getpid(),
+        'uptime_s': round(time.time() - process_stats.started),
+        'requests': {
+            'in_flight': process_stats.get('requests_in_flight'),
+            'total': process_stats.get('requests_total'),
+        },
+        'db': {
+            'backend': 'sqlite' if DEBUG else 'postgresql',
+            'shards': len(SHARDS),
+            'connections_open': process_stats.get('db_connections_open'),
+            'connections_opened': process_stats.get('db_connections_opened'),
+            'replica_configured': bool(DATABASE_READ_URL),
+            'replica_connections_opened': process_stats.get('db_replica_connections_opened'),
+            'breakers': [breaker.state() for breaker in db_breakers],
+            'pools': pool_stats(),
+        },
+        'caches': {
+            'sessions': app.session_interface.cache.stats(),
+            'shares': share_cache.stats(),
+            'dependency_graphs': dependency_graphs.stats(),
+            'templates': {'size': len(app.jinja_env.cache)},
+        },
+        'event_streams': change_broker.stats(),
+        'reminders': reminder_scheduler.stats(),
+        'queues': {
+            'log': {'depth': log_queue.qsize(), 'maxsize': log_queue.maxsize, 'dropped': log_handler.dropped},
+            'background': {'depth': background_jobs.queue.qsize(), 'maxsize': background_jobs.queue.maxsize},
+        },
+    })
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
-    return render_with_footer(TPL_404), 404
+    return render_with_footer('404.html'), 404
 
 @app.errorhandler(500)
 def internal_error(error):
-    return render_with_footer(TPL_500), 500
+    # Errors raised while opening the session arrive here wrapped in a 500
+    if isinstance(getattr(error, 'original_exception', None), DatabaseUnavailable):
+        return database_unavailable(error.original_exception)
+    return render_with_footer('500.html'), 500
+
+@app.errorhandler(DatabaseUnavailable)
+def database_unavailable(error):
+    log_event(db_log, logging.ERROR, event='database_unavailable', error=str(error))
+    return render_with_footer('503.html'), 503, {'Retry-After': str(DB_BREAKER_RESET)}
+
+# ---------- ASGI ----------
+class AsyncSubscriber:
+    """Change-broker subscriber that passes events to a coroutine on ``loop``."""
+    def __init__(self, loop, maxsize):
+        self.loop = loop
+        self.maxsize = maxsize
+        self.queue = asyncio.Queue()
+
+    def put_nowait(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # the loop has shut down
+
+    def _put(self, event):
+        if self.queue.qsize() >= self.maxsize:
+            # A stalled client, as in ChangeBroker.deliver(): end the stream
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = None
+        self.queue.put_nowait(event)
+
+class ASGIAdapter:
+    """Serves the app to an ASGI server, e.g. ``uvicorn app:asgi_app``.
+
+    Live-update streams are coroutines, so an open /events connection costs
+    no thread. Every other request runs the WSGI app on a bounded thread pool,
+    where SQLite and psycopg2 calls block only their own thread. The pool
+    size also bounds the database connections in use.
+    """
+    def __init__(self, wsgi_app, threads):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(threads, thread_name_prefix='asgi')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    self.executor.shutdown(wait=False)
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        if scope['type'] != 'http':
+            return
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        environ = self.environ(scope, bytes(body))
+        if scope['path'] == EVENTS_PATH and scope['method'] == 'GET':
+            await self.serve_events(environ, receive, send)
+        else:
+            await self.serve_wsgi(environ, send)
+
+    def environ(self, scope, body):
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope['query_string'].decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+            'REMOTE_ADDR': client[0],
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+            ASGI_ENVIRON_KEY: True,
+        }
+        for name, value in scope['headers']:
+            name = name.decode('latin-1').upper().replace('-', '_')
+            key = name if name in ('CONTENT_TYPE', 'CONTENT_LENGTH') else 'HTTP_' + name
+            value = value.decode('latin-1')
+            if key in environ:
+                value = environ[key] + ('; ' if key == 'HTTP_COOKIE' else ',') + value
+            environ[key] = value
+        # The body is already buffered, chunked or not
+        environ['CONTENT_LENGTH'] = str(len(body))
+        return environ
+
+    async def serve_wsgi(self, environ, send):
+        """Run the WSGI app on the thread pool, streaming its body back chunk by chunk."""
+        loop = asyncio.get_running_loop()
+        messages = asyncio.Queue(maxsize=16)
+
+        def put(message):
+            # Blocks the worker thread while the client is slow to read
+            asyncio.run_coroutine_threadsafe(messages.put(message), loop).result()
+
+        def run():
+            started = []
+
+            def start_response(status, headers, exc_info=None):
+                started[:] = [int(status.split(' ', 1)[0]),
+                              [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]]
+                return lambda data: put({'type': 'http.response.body', 'body': data, 'more_body': True})
+
+            try:
+                result = self.wsgi_app(environ, start_response)
+                try:
+                    put({'type': 'http.response.start', 'status': started[0], 'headers': started[1]})
+                    for chunk in result:
+                        if chunk:
+                            put({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                finally:
+                    if hasattr(result, 'close'):
+                        result.close()
+            finally:
+                put(None)
+
+        future = loop.run_in_executor(self.executor, run)
+        connected = True
+        while True:
+            message = await messages.get()
+            if message is None:
+                break
+            if connected:
+                try:
+                    await send(message)
+                except OSError:
+                    connected = False  # keep draining so the worker thread can finish
+        await future
+        if connected:
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+    async def serve_events(self, environ, receive, send):
+        """The /events stream as a coroutine; same frames as event_stream()."""
+        loop = asyncio.get_running_loop()
+        user_id, last_event_id, login_url = await loop.run_in_executor(self.executor, open_event_stream, environ)
+        if user_id is None:
+            await send({'type': 'http.response.start', 'status': 302,
+                        'headers': [(b'location', login_url.encode('latin-1'))]})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': [(b'content-type', b'text/event-stream; charset=utf-8')] +
+                               [(name.lower().encode(), value.encode()) for name, value in SSE_HEADERS.items()]})
+
+        async def write(text):
+            await send({'type': 'http.response.body', 'body': text.encode('utf-8'), 'more_body': True})
+
+        async def disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+
+        subscriber = change_broker.subscribe(user_id, AsyncSubscriber(loop, EVENT_REPLAY_SIZE))
+        disconnected = asyncio.ensure_future(disconnect())
+        try:
+            await write(f'retry: {EVENT_STREAM_HEARTBEAT * 1000}\n\n')
+            sent = last_event_id
+            for event in change_broker.replay(user_id, last_event_id):
+                sent = event['id']
+                await write(format_sse(event))
+            deadline = loop.time() + EVENT_STREAM_MAX_AGE
+            while loop.time() < deadline:
+                next_event = asyncio.ensure_future(subscriber.queue.get())
+                done, _ = await asyncio.wait({next_event, disconnected}, timeout=EVENT_STREAM_HEARTBEAT,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if disconnected in done:
+                    next_event.cancel()
+                    return
+                if next_event not in done:
+                    next_event.cancel()
+                    await write(': heartbeat\n\n')
+                    continue
+                event = next_event.result()
+                if event is None:
+                    break
+                if event['id'] > sent:
+                    sent = event['id']
+                    await write(format_sse(event))
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            change_broker.unsubscribe(user_id, subscriber)
+            disconnected.cancel()
+
+def open_event_stream(environ):
+    """Authenticate an /events request the way login_required would; runs on the thread pool."""
+    with app.request_context(environ):
+        return session.get('user_id'), stream_resume_point(), url_for('login')
+
+asgi_app = ASGIAdapter(app.wsgi_app, ASGI_THREADS)
 
 if __name__ == '__main__':
     with app.app_context():
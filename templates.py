@@ -1,4 +1,4 @@
-# templates.py
+# templates.py - Jinja templates for the Roadmap App, served to Flask through TEMPLATES
 TPL_BASE = """
 <!DOCTYPE html>
 <html lang="en">
@@ -7,183 +7,383 @@ TPL_BASE = """
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Roadmap App</title>
     <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap" rel="stylesheet">
+    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css" rel="stylesheet">
     <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
+        :root {
+            --bg-primary: #0f0f23;
+            --bg-secondary: #1a1a2e;
+            --bg-glass: rgba(255, 255, 255, 0.05);
+            --bg-glass-hover: rgba(255, 255, 255, 0.1);
+            --text-primary: #ffffff;
+            --text-secondary: #b0b0b0;
+            --text-muted: #888888;
+            --accent-primary: #6366f1;
+            --accent-secondary: #8b5cf6;
+            --accent-success: #10b981;
+            --accent-danger: #ef4444;
+            --accent-warning: #f59e0b;
+            --border-radius: 16px;
+            --transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
+            --shadow: 0 8px 32px rgba(0, 0, 0, 0.3);
+            --shadow-hover: 0 12px 48px rgba(0, 0, 0, 0.4);
+        }
+
+        * { 
+            margin: 0; 
+            padding: 0; 
+            box-sizing: border-box; 
+        }
+
         body { 
             font-family: 'Inter', sans-serif; 
-            background: {{background}};
+            background: linear-gradient(135deg, var(--bg-primary) 0%, var(--bg-secondary) 100%);
+            color: var(--text-primary);
             min-height: 100vh;
             padding: 20px;
-            transition: background 0.5s ease;
+            transition: var(--transition);
         }
+
         .container { 
             max-width: 1400px; 
             margin: 0 auto; 
+            min-height: calc(100vh - 160px);
         }
+
         .glass-card {
-            background: rgba(255, 255, 255, 0.95);
-            backdrop-filter: blur(10px);
-            border-radius: 20px;
+            background: var(--bg-glass);
+            backdrop-filter: blur(20px);
+            border-radius: var(--border-radius);
             padding: 30px;
-            box-shadow: 0 8px 32px rgba(0, 0, 0, 0.1);
-            border: 1px solid rgba(255, 255, 255, 0.2);
+            box-shadow: var(--shadow);
+            border: 1px solid rgba(255, 255, 255, 0.1);
             margin-bottom: 20px;
-            transition: all 0.3s ease;
+            transition: var(--transition);
+            position: relative;
+            overflow: hidden;
         }
+
+        .glass-card::before {
+            content: '';
+            position: absolute;
+            top: 0;
+            left: -100%;
+            width: 100%;
+            height: 100%;
+            background: linear-gradient(90deg, transparent, rgba(255,255,255,0.1), transparent);
+            transition: var(--transition);
+        }
+
+        .glass-card:hover::before {
+            left: 100%;
+        }
+
         .glass-card:hover {
             transform: translateY(-5px);
-            box-shadow: 0 12px 40px rgba(0, 0, 0, 0.15);
+            box-shadow: var(--shadow-hover);
+            background: var(--bg-glass-hover);
         }
+
         .btn {
-            background: linear-gradient(135deg, #667eea, #764ba2);
+            background: linear-gradient(135deg, var(--accent-primary), var(--accent-secondary));
             color: white;
             border: none;
-            padding: 10px 20px;
-            border-radius: 10px;
+            padding: 12px 24px;
+            border-radius: 12px;
             cursor: pointer;
-            font-weight: 500;
-            transition: all 0.3s ease;
+            font-weight: 600;
+            transition: var(--transition);
             text-decoration: none;
-            display: inline-block;
+            display: inline-flex;
+            align-items: center;
+            gap: 8px;
             font-size: 14px;
+            position: relative;
+            overflow: hidden;
+        }
+
+        .btn::before {
+            content: '';
+            position: absolute;
+            top: 0;
+            left: -100%;
+            width: 100%;
+            height: 100%;
+            background: linear-gradient(90deg, transparent, rgba(255,255,255,0.2), transparent);
+            transition: var(--transition);
+        }
+
+        .btn:hover::before {
+            left: 100%;
         }
+
         .btn:hover {
             transform: translateY(-2px);
-            box-shadow: 0 5px 15px rgba(0, 0, 0, 0.2);
-        }
-        .btn-success { background: linear-gradient(135deg, #28a745, #20c997); }
-        .btn-danger { background: linear-gradient(135deg, #dc3545, #e83e8c); }
-        .btn-secondary { background: linear-gradient(135deg, #6c757d, #868e96); }
-        .btn-info { background: linear-gradient(135deg, #17a2b8, #6f42c1); }
-        .btn-small { padding: 6px 12px; font-size: 12px; }
-        .form-group { margin-bottom: 15px; }
+            box-shadow: 0 8px 25px rgba(99, 102, 241, 0.3);
+        }
+
+        .btn-success { 
+            background: linear-gradient(135deg, var(--accent-success), #059669); 
+        }
+        .btn-danger { 
+            background: linear-gradient(135deg, var(--accent-danger), #dc2626); 
+        }
+        .btn-secondary { 
+            background: linear-gradient(135deg, #6b7280, #4b5563); 
+        }
+        .btn-info { 
+            background: linear-gradient(135deg, #06b6d4, #0891b2); 
+        }
+        .btn-small { 
+            padding: 8px 16px; 
+            font-size: 12px; 
+        }
+
+        .form-group { 
+            margin-bottom: 20px; 
+        }
+
         .form-control {
             width: 100%;
-            padding: 12px 16px;
-            border: 2px solid #e1e5e9;
-            border-radius: 10px;
+            padding: 14px 18px;
+            background: rgba(255, 255, 255, 0.05);
+            border: 2px solid rgba(255, 255, 255, 0.1);
+            border-radius: 12px;
             font-size: 14px;
-            transition: all 0.3s ease;
+            transition: var(--transition);
+            color: var(--text-primary);
+        }
+
+        .form-control::placeholder {
+            color: var(--text-muted);
         }
+
         .form-control:focus {
             outline: none;
-            border-color: #667eea;
-            box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
+            border-color: var(--accent-primary);
+            box-shadow: 0 0 0 3px rgba(99, 102, 241, 0.1);
+            background: rgba(255, 255, 255, 0.08);
         }
+
         textarea.form-control {
-            min-height: 100px;
+            min-height: 120px;
             resize: vertical;
         }
+
         .alert {
-            padding: 12px 16px;
-            border-radius: 10px;
+            padding: 16px 20px;
+            border-radius: 12px;
             margin-bottom: 20px;
-            animation: slideIn 0.5s ease;
+            animation: slideIn 0.5s cubic-bezier(0.4, 0, 0.2, 1);
+            border: 1px solid;
+            background: var(--bg-glass);
+        }
+
+        .alert-success { 
+            color: #10b981; 
+            border-color: rgba(16, 185, 129, 0.3); 
+        }
+        .alert-error { 
+            color: #ef4444; 
+            border-color: rgba(239, 68, 68, 0.3); 
+        }
+        .alert-warning { 
+            color: #f59e0b; 
+            border-color: rgba(245, 158, 11, 0.3); 
         }
-        .alert-success { background: #d4edda; color: #155724; border: 1px solid #c3e6cb; }
-        .alert-error { background: #f8d7da; color: #721c24; border: 1px solid #f5c6cb; }
-        .alert-warning { background: #fff3cd; color: #856404; border: 1px solid #ffeaa7; }
-        .alert-info { background: #d1ecf1; color: #0c5460; border: 1px solid #bee5eb; }
+        .alert-info { 
+            color: #06b6d4; 
+            border-color: rgba(6, 182, 212, 0.3); 
+        }
+
         .task-card {
-            background: white;
-            border-radius: 15px;
-            padding: 20px;
-            margin-bottom: 15px;
-            box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
-            transition: all 0.3s ease;
-            border-left: 5px solid #667eea;
+            background: var(--bg-glass);
+            border-radius: var(--border-radius);
+            padding: 24px;
+            margin-bottom: 16px;
+            box-shadow: var(--shadow);
+            transition: var(--transition);
+            border-left: 4px solid var(--accent-primary);
             animation: fadeIn 0.5s ease;
+            position: relative;
+            overflow: hidden;
         }
+
+        .task-card::before {
+            content: '';
+            position: absolute;
+            top: 0;
+            left: 0;
+            width: 4px;
+            height: 100%;
+            background: var(--accent-primary);
+            transition: var(--transition);
+        }
+
         .task-card:hover {
-            transform: translateX(5px);
-            box-shadow: 0 6px 20px rgba(0, 0, 0, 0.15);
+            transform: translateX(8px);
+            box-shadow: var(--shadow-hover);
+            background: var(--bg-glass-hover);
         }
+
         .task-card.done {
-            border-left-color: #28a745;
+            border-left-color: var(--accent-success);
             opacity: 0.8;
         }
+
+        .task-card.done::before {
+            background: var(--accent-success);
+        }
+
         .task-card.done .task-title {
             text-decoration: line-through;
-            color: #6c757d;
+            color: var(--text-muted);
         }
+
+        .task-card[draggable="true"] {
+            cursor: grab;
+        }
+
+        .task-card.dragging {
+            opacity: 0.4;
+        }
+
         .category-badge {
-            display: inline-block;
-            padding: 4px 8px;
-            border-radius: 6px;
+            display: inline-flex;
+            align-items: center;
+            gap: 6px;
+            padding: 6px 12px;
+            border-radius: 20px;
             font-size: 12px;
-            font-weight: 500;
+            font-weight: 600;
             color: white;
-            margin-bottom: 8px;
+            margin-bottom: 12px;
+            background: linear-gradient(135deg, var(--accent-primary), var(--accent-secondary));
         }
+
         .stats-grid {
             display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+            grid-template-columns: repeat(auto-fit, minmax(220px, 1fr));
             gap: 20px;
             margin-bottom: 30px;
         }
+
         .stat-card {
-            background: linear-gradient(135deg, #667eea, #764ba2);
+            background: linear-gradient(135deg, var(--accent-primary), var(--accent-secondary));
             color: white;
-            padding: 20px;
-            border-radius: 15px;
+            padding: 24px;
+            border-radius: var(--border-radius);
             text-align: center;
             animation: fadeIn 1s ease;
+            position: relative;
+            overflow: hidden;
+        }
+
+        .stat-card::before {
+            content: '';
+            position: absolute;
+            top: -50%;
+            left: -50%;
+            width: 200%;
+            height: 200%;
+            background: radial-gradient(circle, rgba(255,255,255,0.1) 0%, transparent 70%);
+            animation: rotate 10s linear infinite;
         }
-        .stat-card.success { background: linear-gradient(135deg, #28a745, #20c997); }
+
+        .stat-card.success { 
+            background: linear-gradient(135deg, var(--accent-success), #059669); 
+        }
+
         .task-actions {
             display: flex;
             gap: 10px;
-            margin-top: 15px;
+            margin-top: 16px;
             flex-wrap: wrap;
         }
+
+        .task-toggle {
+            display: contents;
+        }
+
         .dashboard-grid {
             display: grid;
             grid-template-columns: 1fr 2fr;
-            gap: 20px;
+            gap: 24px;
         }
+
         .categories-sidebar {
-            background: rgba(255, 255, 255, 0.95);
-            border-radius: 20px;
-            padding: 20px;
+            background: var(--bg-glass);
+            border-radius: var(--border-radius);
+            padding: 24px;
             height: fit-content;
+            backdrop-filter: blur(20px);
         }
+
         .category-item {
-            padding: 10px;
-            margin: 8px 0;
-            border-radius: 10px;
-            background: #f8f9fa;
+            padding: 16px;
+            margin: 12px 0;
+            border-radius: 12px;
+            background: rgba(255, 255, 255, 0.05);
             border-left: 4px solid;
+            transition: var(--transition);
         }
-        .bulk-import-section {
-            margin: 20px 0;
+
+        .category-item:hover {
+            background: rgba(255, 255, 255, 0.08);
+            transform: translateX(4px);
         }
+
         .import-example {
-            background: #f8f9fa;
-            padding: 15px;
-            border-radius: 10px;
-            margin-top: 10px;
+            background: rgba(255, 255, 255, 0.05);
+            padding: 16px;
+            border-radius: 12px;
+            margin-top: 12px;
             font-size: 0.9em;
+            border: 1px solid rgba(255, 255, 255, 0.1);
         }
+
         .import-example code {
-            background: #e9ecef;
-            padding: 2px 6px;
-            border-radius: 4px;
-            font-family: monospace;
+            background: rgba(255, 255, 255, 0.1);
+            padding: 4px 8px;
+            border-radius: 6px;
+            font-family: 'Courier New', monospace;
+            color: var(--accent-primary);
         }
+
         @keyframes slideIn {
-            from { transform: translateY(-20px); opacity: 0; }
-            to { transform: translateY(0); opacity: 1; }
+            from { 
+                transform: translateY(-20px); 
+                opacity: 0; 
+            }
+            to { 
+                transform: translateY(0); 
+                opacity: 1; 
+            }
         }
+
         @keyframes fadeIn {
-            from { opacity: 0; transform: translateY(20px); }
-            to { opacity: 1; transform: translateY(0); }
+            from { 
+                opacity: 0; 
+                transform: translateY(20px); 
+            }
+            to { 
+                opacity: 1; 
+                transform: translateY(0); 
+            }
         }
+
         @keyframes pulse {
             0% { transform: scale(1); }
             50% { transform: scale(1.05); }
             100% { transform: scale(1); }
         }
+
+        @keyframes rotate {
+            from { transform: rotate(0deg); }
+            to { transform: rotate(360deg); }
+        }
+
         .pulse { animation: pulse 2s infinite; }
+
         .header { 
             display: flex; 
             justify-content: space-between; 
@@ -192,75 +392,208 @@ TPL_BASE = """
             flex-wrap: wrap;
             gap: 20px;
         }
+
         .task-grid {
             display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(350px, 1fr));
+            grid-template-columns: repeat(auto-fill, minmax(380px, 1fr));
             gap: 20px;
         }
+
         .welcome-text {
-            font-size: 1.5rem;
-            font-weight: 600;
-            color: #2d3748;
-            margin-bottom: 10px;
+            font-size: 2rem;
+            font-weight: 700;
+            background: linear-gradient(135deg, var(--accent-primary), var(--accent-secondary));
+            -webkit-background-clip: text;
+            -webkit-text-fill-color: transparent;
+            margin-bottom: 8px;
         }
+
         .subtitle {
-            color: #718096;
+            color: var(--text-secondary);
             margin-bottom: 20px;
+            font-size: 1.1rem;
         }
+
         .edit-form {
             display: none;
-            margin-top: 15px;
-            padding: 15px;
-            background: #f8f9fa;
-            border-radius: 10px;
+            margin-top: 16px;
+            padding: 20px;
+            background: rgba(255, 255, 255, 0.05);
+            border-radius: 12px;
+            border: 1px solid rgba(255, 255, 255, 0.1);
         }
+
         .color-preview {
-            width: 30px;
-            height: 30px;
-            border-radius: 6px;
+            width: 32px;
+            height: 32px;
+            border-radius: 8px;
             display: inline-block;
-            margin-right: 10px;
-            border: 2px solid #e1e5e9;
+            margin-right: 12px;
+            border: 2px solid rgba(255, 255, 255, 0.2);
+            transition: var(--transition);
+        }
+
+        .color-preview:hover {
+            transform: scale(1.1);
         }
+
         .tab-buttons {
             display: flex;
-            margin-bottom: 20px;
-            background: rgba(255, 255, 255, 0.1);
-            border-radius: 10px;
-            padding: 5px;
+            margin-bottom: 24px;
+            background: rgba(255, 255, 255, 0.05);
+            border-radius: 12px;
+            padding: 6px;
+            gap: 4px;
         }
+
         .tab-button {
             flex: 1;
-            padding: 10px;
+            padding: 12px;
             text-align: center;
             background: transparent;
             border: none;
             border-radius: 8px;
             cursor: pointer;
-            transition: all 0.3s ease;
+            transition: var(--transition);
+            color: var(--text-secondary);
+            font-weight: 500;
         }
+
         .tab-button.active {
-            background: white;
-            box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
+            background: var(--accent-primary);
+            color: white;
+            box-shadow: 0 4px 15px rgba(99, 102, 241, 0.3);
         }
+
         .tab-content {
             display: none;
         }
+
         .tab-content.active {
             display: block;
         }
+
+        /* Advanced Footer */
+        .app-footer {
+            margin-top: 60px;
+            padding: 40px 0 20px;
+            border-top: 1px solid rgba(255, 255, 255, 0.1);
+        }
+
+        .footer-content {
+            display: grid;
+            grid-template-columns: 2fr 1fr 1fr;
+            gap: 40px;
+            margin-bottom: 30px;
+        }
+
+        .footer-brand h3 {
+            background: linear-gradient(135deg, var(--accent-primary), var(--accent-secondary));
+            -webkit-background-clip: text;
+            -webkit-text-fill-color: transparent;
+            margin-bottom: 16px;
+            font-size: 1.5rem;
+        }
+
+        .footer-brand p {
+            color: var(--text-secondary);
+            line-height: 1.6;
+        }
+
+        .footer-links h4 {
+            color: var(--text-primary);
+            margin-bottom: 16px;
+            font-size: 1.1rem;
+        }
+
+        .footer-links ul {
+            list-style: none;
+        }
+
+        .footer-links li {
+            margin-bottom: 10px;
+        }
+
+        .footer-links a {
+            color: var(--text-secondary);
+            text-decoration: none;
+            transition: var(--transition);
+            display: flex;
+            align-items: center;
+            gap: 8px;
+        }
+
+        .footer-links a:hover {
+            color: var(--accent-primary);
+            transform: translateX(4px);
+        }
+
+        .footer-bottom {
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+            padding-top: 20px;
+            border-top: 1px solid rgba(255, 255, 255, 0.1);
+            color: var(--text-muted);
+            font-size: 0.9rem;
+        }
+
+        .footer-social {
+            display: flex;
+            gap: 16px;
+        }
+
+        .footer-social a {
+            color: var(--text-secondary);
+            font-size: 1.2rem;
+            transition: var(--transition);
+            padding: 8px;
+            border-radius: 8px;
+            background: rgba(255, 255, 255, 0.05);
+        }
+
+        .footer-social a:hover {
+            color: var(--accent-primary);
+            background: rgba(99, 102, 241, 0.1);
+            transform: translateY(-2px);
+        }
+
+        .current-date {
+            color: var(--accent-primary);
+            font-weight: 600;
+        }
+
         @media (max-width: 768px) {
             .dashboard-grid {
                 grid-template-columns: 1fr;
             }
+            
+            .footer-content {
+                grid-template-columns: 1fr;
+                gap: 30px;
+            }
+            
+            .footer-bottom {
+                flex-direction: column;
+                gap: 16px;
+                text-align: center;
+            }
+            
+            .task-grid {
+                grid-template-columns: 1fr;
+            }
         }
     </style>
 </head>
 <body>
     <div class="container">
-        {{content}}
+        {% block content %}{% endblock %}
     </div>
+
+    {{ footer }}
+
     <script>
+        // Flash message auto-hide
         setTimeout(() => {
             const alerts = document.querySelectorAll('.alert');
             alerts.forEach(alert => {
@@ -283,238 +616,604 @@ TPL_BASE = """
         }
 
         function showImportExamples() {
-            const examples = `Quick Import Formats:
+            const examples = `🚀 Quick Import Formats:
 
-1. Category = Task1, Task2, Task3
+📁 Category = Task1, Task2, Task3
    Web Development = HTML Basics, CSS Styling, JavaScript Fundamentals
 
-2. Category: Task1 | Task2 | Task3  
+📊 Category: Task1 | Task2 | Task3  
    Data Science: Python Basics | Pandas | Machine Learning
 
-3. Bullet points:
+📝 Bullet points:
    Study Plan
    - Math Chapter 1
    - Physics Lab Report
    - Chemistry Homework
 
-4. Mixed format:
+🔄 Mixed format:
    Fitness = Morning Run, Gym Session
    Fitness: Yoga | Meditation
-   - Healthy Cooking`;
+   - Healthy Cooking
+
+✅ Markdown checklist:
+   # Study Plan
+   - [x] Math Chapter 1 ✅ 2024-01-31
+   - [ ] Physics Lab Report
+
+📄 Also CSV (with a "title" column), JSON and OPML exports from other tools.`;
             alert(examples);
         }
 
-        async function markTaskDone(taskId) {
+        // Sent with this tab's own changes so its live-update stream can skip their echo
+        const CLIENT_ID = Math.random().toString(36).slice(2) + Date.now().toString(36);
+
+        function markTaskDone(taskId) {
+            return updateTask('/mark_done', taskId, true);
+        }
+
+        function undoTask(taskId) {
+            return updateTask('/unset_done', taskId, false);
+        }
+
+        // Flip the card straight away, then redraw from the server's answer;
+        // anything unexpected falls back to a full reload.
+        async function updateTask(url, taskId, done) {
+            setTaskState(taskId, done);
             try {
-                const response = await fetch('/mark_done', {
+                const response = await fetch(url, {
                     method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
+                    headers: { 'Content-Type': 'application/json', 'X-Client-Id': CLIENT_ID },
                     body: JSON.stringify({ id: taskId })
                 });
                 const result = await response.json();
-                if (result.ok) {
-                    const taskCard = document.getElementById('task-' + taskId);
-                    taskCard.style.animation = 'pulse 0.5s ease';
-                    setTimeout(() => {
-                        location.reload();
-                    }, 500);
-                } else {
-                    alert('Error: ' + result.error);
+                if (!result.ok) {
+                    throw new Error(result.error);
                 }
+                applyTaskUpdate(result);
+                const taskCard = document.getElementById('task-' + taskId);
+                taskCard.style.animation = 'pulse 0.5s ease';
+                setTimeout(() => { taskCard.style.animation = ''; }, 500);
             } catch (error) {
-                alert('An error occurred. Please try again.');
+                location.reload();
             }
         }
 
-        async function undoTask(taskId) {
-            try {
-                const response = await fetch('/unset_done', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ id: taskId })
-                });
-                if (response.ok) {
-                    const taskCard = document.getElementById('task-' + taskId);
-                    taskCard.style.animation = 'pulse 0.5s ease';
-                    setTimeout(() => {
-                        location.reload();
-                    }, 500);
+        function setTaskState(taskId, done) {
+            const taskCard = document.getElementById('task-' + taskId);
+            taskCard.classList.toggle('done', done);
+            if (done) {
+                taskCard.removeAttribute('draggable');
+            } else {
+                taskCard.setAttribute('draggable', 'true');
+            }
+            taskCard.querySelector('.task-toggle').innerHTML = done
+                ? `<button onclick="undoTask(${taskId})" class="btn btn-secondary btn-small">
+                       <i class="fas fa-undo"></i> Undo
+                   </button>`
+                : `<button onclick="markTaskDone(${taskId})" class="btn btn-success btn-small">
+                       <i class="fas fa-check"></i> Mark Done
+                   </button>
+                   <button onclick="toggleEdit(${taskId})" class="btn btn-small">
+                       <i class="fas fa-edit"></i> Edit
+                   </button>`;
+        }
+
+        function applyTaskUpdate(result) {
+            const task = result.task;
+            setTaskState(task.id, task.done);
+            const status = document.getElementById('task-' + task.id).querySelector('.task-status');
+            status.style.color = task.done ? 'var(--accent-success)' : 'var(--text-muted)';
+            status.querySelector('i').className = 'fas fa-' + (task.done ? 'check-circle' : 'clock');
+            status.querySelector('span').textContent = task.done
+                ? (task.done_at ? 'Completed at ' + task.done_at : 'Completed')
+                : 'Created: ' + (task.created_at || 'Recently');
+            const due = document.getElementById('task-' + task.id).querySelector('.task-due');
+            if (due) {
+                due.style.display = task.done ? 'none' : 'flex';
+            }
+            document.querySelectorAll(`.deadline[data-task-id="${task.id}"]`).forEach(row => {
+                row.style.display = task.done ? 'none' : 'flex';
+            });
+
+            for (const [id, count] of Object.entries(result.waiting)) {
+                const card = document.getElementById('task-' + id);
+                const badge = card && card.querySelector('.task-waiting');
+                if (badge) {
+                    badge.style.display = count && !card.classList.contains('done') ? 'flex' : 'none';
+                    badge.querySelector('span').textContent = `Waiting on ${count} task${count === 1 ? '' : 's'}`;
                 }
-            } catch (error) {
-                alert('An error occurred. Please try again.');
             }
+
+            const counts = result.counts;
+            document.getElementById('stat-total').textContent = counts.total;
+            document.getElementById('stat-completed').textContent = counts.completed;
+            document.getElementById('stat-progress').textContent =
+                (counts.total ? Math.round(counts.completed / counts.total * 100) : 0) + '%';
+            document.getElementById('stat-streak').textContent = counts.streak;
+
+            const nextUp = document.getElementById('next-up');
+            const list = nextUp.querySelector('.next-up-list');
+            list.replaceChildren(...result.next_up.map(step => {
+                const row = document.getElementById('next-up-step-template').content.firstElementChild.cloneNode(true);
+                row.querySelector('.next-up-title').textContent = step.title;
+                const badge = row.querySelector('.category-badge');
+                if (step.category_name) {
+                    badge.querySelector('span').textContent = step.category_name;
+                } else {
+                    badge.remove();
+                }
+                return row;
+            }));
+            nextUp.style.display = result.next_up.length ? '' : 'none';
+        }
+
+        function buildEditForm(taskId) {
+            const taskCard = document.getElementById('task-' + taskId);
+            const editForm = document.getElementById('edit-form-template').content.firstElementChild.cloneNode(true);
+            const form = editForm.querySelector('form');
+            const notes = taskCard.querySelector('.task-notes');
+            editForm.id = 'edit-form-' + taskId;
+            form.action = '/edit_task/' + taskId;
+            form.elements.title.value = taskCard.querySelector('.task-title').textContent;
+            form.elements.notes.value = notes ? notes.textContent : '';
+            form.elements.category_id.value = taskCard.dataset.categoryId;
+            form.elements.due_at.value = taskCard.dataset.dueAt;
+            const dependsOn = taskCard.dataset.dependsOn.split(',');
+            document.querySelectorAll('.task-card[data-task-id]').forEach(card => {
+                if (card !== taskCard && card.dataset.categoryId === taskCard.dataset.categoryId) {
+                    const option = new Option(card.querySelector('.task-title').textContent, card.dataset.taskId);
+                    option.selected = dependsOn.includes(card.dataset.taskId);
+                    form.elements.depends_on.add(option);
+                }
+            });
+            editForm.querySelector('.edit-cancel').addEventListener('click', () => toggleEdit(taskId));
+            taskCard.appendChild(editForm);
+            return editForm;
         }
 
         function toggleEdit(taskId) {
-            const editForm = document.getElementById('edit-form-' + taskId);
+            const editForm = document.getElementById('edit-form-' + taskId) || buildEditForm(taskId);
             if (editForm.style.display === 'block') {
                 editForm.style.display = 'none';
             } else {
                 editForm.style.display = 'block';
             }
         }
+
+        // Drag-and-drop reordering: the server only needs the new neighbours
+        let draggedCard = null;
+
+        document.addEventListener('dragstart', event => {
+            draggedCard = event.target.closest && event.target.closest('.task-card[draggable="true"]');
+            if (draggedCard) {
+                draggedCard.classList.add('dragging');
+            }
+        });
+
+        document.addEventListener('dragover', event => {
+            const target = draggedCard && event.target.closest('.task-card[draggable="true"]');
+            if (!target || target === draggedCard) {
+                return;
+            }
+            event.preventDefault();
+            const rect = target.getBoundingClientRect();
+            target.parentNode.insertBefore(draggedCard, event.clientY < rect.top + rect.height / 2 ? target : target.nextSibling);
+        });
+
+        document.addEventListener('dragend', async () => {
+            const card = draggedCard;
+            draggedCard = null;
+            if (!card) {
+                return;
+            }
+            card.classList.remove('dragging');
+            const sibling = (node, step) => {
+                do { node = node[step]; } while (node && !(node.dataset && node.dataset.taskId));
+                return node && node.getAttribute('draggable') === 'true' ? node : null;
+            };
+            const after = sibling(card, 'previousElementSibling');
+            const before = sibling(card, 'nextElementSibling');
+            if (!after && !before) {
+                return;
+            }
+            try {
+                const response = await fetch('/move_task', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json', 'X-Client-Id': CLIENT_ID },
+                    body: JSON.stringify({
+                        id: Number(card.dataset.taskId),
+                        after_id: after ? Number(after.dataset.taskId) : null,
+                        before_id: before ? Number(before.dataset.taskId) : null
+                    })
+                });
+                const result = await response.json();
+                if (!result.ok || String(result.category_id || '') !== card.dataset.categoryId) {
+                    location.reload();
+                }
+            } catch (error) {
+                location.reload();
+            }
+        });
+
+        // Live updates: changes made in other tabs and devices arrive over SSE.
+        // Completions are redrawn in place; anything structural reloads the page.
+        document.addEventListener('DOMContentLoaded', () => {
+            const live = document.getElementById('live-updates');
+            if (!live || !window.EventSource) {
+                return;
+            }
+            const source = new EventSource(live.dataset.url + '?last_event_id=' + live.dataset.since);
+            let reloadTimer = null;
+            const reloadSoon = () => {
+                clearTimeout(reloadTimer);
+                reloadTimer = setTimeout(() => location.reload(), 1000);
+            };
+            for (const kind of ['completed', 'reopened']) {
+                source.addEventListener(kind, async event => {
+                    const change = JSON.parse(event.data);
+                    if (change.origin === CLIENT_ID) {
+                        return;
+                    }
+                    const taskCard = document.getElementById('task-' + change.task_id);
+                    if (!taskCard) {
+                        return reloadSoon();
+                    }
+                    // Another tab may have made the same change; that card is already up to date
+                    if (taskCard.classList.contains('done') === (kind === 'completed')) {
+                        return;
+                    }
+                    try {
+                        const response = await fetch('/tasks/' + change.task_id + '/state');
+                        const result = await response.json();
+                        if (!result.ok) {
+                            throw new Error(result.error);
+                        }
+                        applyTaskUpdate(result);
+                    } catch (error) {
+                        reloadSoon();
+                    }
+                });
+            }
+            for (const kind of ['created', 'edited', 'moved', 'deleted', 'restored', 'category_created', 'category_deleted']) {
+                source.addEventListener(kind, event => {
+                    // This tab's own drags are already in place
+                    if (JSON.parse(event.data).origin !== CLIENT_ID) {
+                        reloadSoon();
+                    }
+                });
+            }
+            source.addEventListener('reminder', event => {
+                const reminder = JSON.parse(event.data);
+                const alert = document.createElement('div');
+                alert.className = 'alert alert-warning';
+                alert.innerHTML = '<i class="fas fa-bell"></i> ';
+                alert.append(`"${reminder.title}" is due ${reminder.due_at} UTC`);
+                live.after(alert);
+            });
+        });
+
+        // Add floating animation to stats cards
+        document.addEventListener('DOMContentLoaded', () => {
+            const stats = document.querySelectorAll('.stat-card');
+            stats.forEach((stat, index) => {
+                stat.style.animationDelay = `${index * 0.2}s`;
+            });
+        });
     </script>
 </body>
 </html>
 """
 
-TPL_LOGIN = """
-<div class="glass-card" style="max-width: 400px; margin: 50px auto;">
-    <h2 style="text-align: center; margin-bottom: 30px; color: #2d3748;">Welcome Back</h2>
+TPL_FOOTER = """
+<footer class="app-footer">
+    <div class="footer-content">
+        <div class="footer-brand">
+            <h3>🚀 Roadmap App</h3>
+            <p>Transform your goals into actionable roadmaps. Organize tasks, track progress, and achieve more with our intuitive planning platform.</p>
+        </div>
+        
+        <div class="footer-links">
+            <h4>Quick Links</h4>
+            <ul>
+                <li><a href="{{ url_for('dashboard') }}"><i class="fas fa-home"></i> Dashboard</a></li>
+                <li><a href="{{ url_for('login') }}"><i class="fas fa-sign-in-alt"></i> Login</a></li>
+                <li><a href="{{ url_for('register') }}"><i class="fas fa-user-plus"></i> Register</a></li>
+            </ul>
+        </div>
+        
+        <div class="footer-links">
+            <h4>Connect</h4>
+            <ul>
+                <li><a href="{{ portfolio_url }}" target="_blank"><i class="fas fa-briefcase"></i> Portfolio</a></li>
+                <li><a href="{{ github_url }}" target="_blank"><i class="fab fa-github"></i> GitHub</a></li>
+                <li><a href="{{ linkedin_url }}" target="_blank"><i class="fab fa-linkedin"></i> LinkedIn</a></li>
+                <li><a href="mailto:{{ contact_email }}"><i class="fas fa-envelope"></i> Contact</a></li>
+            </ul>
+        </div>
+    </div>
+    
+    <div class="footer-bottom">
+        <div>
+            <p>© 2024 Roadmap App. Built with <i class="fas fa-heart" style="color: #ef4444;"></i> using Flask & PostgreSQL</p>
+            <p>Server Time: <span class="current-date">{{ current_date }}</span></p>
+        </div>
+        
+        <div class="footer-social">
+            <a href="{{ github_url }}" target="_blank" title="GitHub">
+                <i class="fab fa-github"></i>
+            </a>
+            <a href="{{ linkedin_url }}" target="_blank" title="LinkedIn">
+                <i class="fab fa-linkedin"></i>
+            </a>
+            <a href="mailto:{{ contact_email }}" title="Email">
+                <i class="fas fa-envelope"></i>
+            </a>
+        </div>
+    </div>
+</footer>
+"""
+
+TPL_LOGIN = """{% extends "base.html" %}{% block content %}
+<div class="glass-card" style="max-width: 420px; margin: 80px auto;">
+    <div style="text-align: center; margin-bottom: 30px;">
+        <h2 style="font-size: 2rem; margin-bottom: 8px;">Welcome Back</h2>
+        <p style="color: var(--text-secondary);">Sign in to your roadmap dashboard</p>
+    </div>
+    
     {% with messages = get_flashed_messages(with_categories=true) %}
         {% if messages %}
             {% for category, message in messages %}
-                <div class="alert alert-{{ 'error' if category == 'error' else 'success' if category == 'success' else 'warning' if category == 'warning' else 'info' }}">{{ message }}</div>
+                <div class="alert alert-{{ 'error' if category == 'error' else 'success' if category == 'success' else 'warning' if category == 'warning' else 'info' }}">
+                    <i class="fas fa-{% if category == 'error' %}exclamation-circle{% elif category == 'success' %}check-circle{% elif category == 'warning' %}exclamation-triangle{% else %}info-circle{% endif %}"></i>
+                    {{ message }}
+                </div>
             {% endfor %}
         {% endif %}
     {% endwith %}
+    
     <form method="post">
         <div class="form-group">
-            <input type="text" name="username" class="form-control" placeholder="Username" required>
+            <div style="position: relative;">
+                <i class="fas fa-user" style="position: absolute; left: 18px; top: 50%; transform: translateY(-50%); color: var(--text-muted);"></i>
+                <input type="text" name="username" class="form-control" placeholder="Username" style="padding-left: 45px;" required>
+            </div>
         </div>
         <div class="form-group">
-            <input type="password" name="password" class="form-control" placeholder="Password" required>
+            <div style="position: relative;">
+                <i class="fas fa-lock" style="position: absolute; left: 18px; top: 50%; transform: translateY(-50%); color: var(--text-muted);"></i>
+                <input type="password" name="password" class="form-control" placeholder="Password" style="padding-left: 45px;" required>
+            </div>
         </div>
-        <button type="submit" class="btn" style="width: 100%;">Login</button>
+        <button type="submit" class="btn" style="width: 100%;">
+            <i class="fas fa-sign-in-alt"></i> Sign In
+        </button>
     </form>
-    <div style="text-align: center; margin-top: 20px;">
-        <p>Forgot password? <a href="{{ url_for('forgot') }}" style="color: #667eea; text-decoration: none;">Recover</a></p>
-        <p>Don't have an account? <a href="{{ url_for('register') }}" style="color: #667eea; text-decoration: none;">Register</a></p>
+    
+    <div style="text-align: center; margin-top: 25px; padding-top: 20px; border-top: 1px solid rgba(255,255,255,0.1);">
+        <p style="color: var(--text-secondary); margin-bottom: 15px;">
+            <a href="{{ url_for('forgot') }}" style="color: var(--accent-primary); text-decoration: none;">
+                <i class="fas fa-key"></i> Forgot password?
+            </a>
+        </p>
+        <p style="color: var(--text-secondary);">
+            Don't have an account? 
+            <a href="{{ url_for('register') }}" style="color: var(--accent-primary); text-decoration: none; font-weight: 600;">
+                Create one here
+            </a>
+        </p>
     </div>
 </div>
+{% endblock %}
 """
 
-TPL_REGISTER = """
-<div class="glass-card" style="max-width: 400px; margin: 50px auto;">
-    <h2 style="text-align: center; margin-bottom: 30px; color: #2d3748;">Create Account</h2>
+TPL_REGISTER = """{% extends "base.html" %}{% block content %}
+<div class="glass-card" style="max-width: 420px; margin: 80px auto;">
+    <div style="text-align: center; margin-bottom: 30px;">
+        <h2 style="font-size: 2rem; margin-bottom: 8px;">Create Account</h2>
+        <p style="color: var(--text-secondary);">Join us and start organizing your roadmaps</p>
+    </div>
+    
     {% with messages = get_flashed_messages(with_categories=true) %}
         {% if messages %}
             {% for category, message in messages %}
-                <div class="alert alert-{{ 'error' if category == 'error' else 'success' if category == 'success' else 'warning' if category == 'warning' else 'info' }}">{{ message }}</div>
+                <div class="alert alert-{{ 'error' if category == 'error' else 'success' if category == 'success' else 'warning' if category == 'warning' else 'info' }}">
+                    <i class="fas fa-{% if category == 'error' %}exclamation-circle{% elif category == 'success' %}check-circle{% elif category == 'warning' %}exclamation-triangle{% else %}info-circle{% endif %}"></i>
+                    {{ message }}
+                </div>
             {% endfor %}
         {% endif %}
     {% endwith %}
+    
     <form method="post">
         <div class="form-group">
-            <input type="text" name="username" class="form-control" placeholder="Username" required>
+            <div style="position: relative;">
+                <i class="fas fa-user" style="position: absolute; left: 18px; top: 50%; transform: translateY(-50%); color: var(--text-muted);"></i>
+                <input type="text" name="username" class="form-control" placeholder="Username" style="padding-left: 45px;" required>
+            </div>
         </div>
         <div class="form-group">
-            <input type="password" name="password" class="form-control" placeholder="Password" required>
+            <div style="position: relative;">
+                <i class="fas fa-lock" style="position: absolute; left: 18px; top: 50%; transform: translateY(-50%); color: var(--text-muted);"></i>
+                <input type="password" name="password" class="form-control" placeholder="Password" style="padding-left: 45px;" required>
+            </div>
         </div>
         <div class="form-group">
-            <input type="text" name="secret_q" class="form-control" placeholder="Secret question (e.g. Your middle name?)" required>
+            <div style="position: relative;">
+                <i class="fas fa-question-circle" style="position: absolute; left: 18px; top: 50%; transform: translateY(-50%); color: var(--text-muted);"></i>
+                <input type="text" name="secret_q" class="form-control" placeholder="Secret question (e.g. Your middle name?)" style="padding-left: 45px;" required>
+            </div>
         </div>
         <div class="form-group">
-            <input type="text" name="secret_a" class="form-control" placeholder="Answer to secret question" required>
+            <div style="position: relative;">
+                <i class="fas fa-key" style="position: absolute; left: 18px; top: 50%; transform: translateY(-50%); color: var(--text-muted);"></i>
+                <input type="text" name="secret_a" class="form-control" placeholder="Answer to secret question" style="padding-left: 45px;" required>
+            </div>
         </div>
-        <button type="submit" class="btn" style="width: 100%;">Register</button>
+        <button type="submit" class="btn" style="width: 100%;">
+            <i class="fas fa-user-plus"></i> Create Account
+        </button>
     </form>
-    <div style="text-align: center; margin-top: 20px;">
-        <p>Already have an account? <a href="{{ url_for('login') }}" style="color: #667eea; text-decoration: none;">Login</a></p>
+    
+    <div style="text-align: center; margin-top: 25px; padding-top: 20px; border-top: 1px solid rgba(255,255,255,0.1);">
+        <p style="color: var(--text-secondary);">
+            Already have an account? 
+            <a href="{{ url_for('login') }}" style="color: var(--accent-primary); text-decoration: none; font-weight: 600;">
+                Sign in here
+            </a>
+        </p>
     </div>
 </div>
+{% endblock %}
 """
 
-TPL_FORGOT = """
-<div class="glass-card" style="max-width: 400px; margin: 50px auto;">
-    <h2 style="text-align: center; margin-bottom: 30px; color: #2d3748;">Forgot Password</h2>
+TPL_FORGOT = """{% extends "base.html" %}{% block content %}
+<div class="glass-card" style="max-width: 420px; margin: 80px auto;">
+    <div style="text-align: center; margin-bottom: 30px;">
+        <h2 style="font-size: 2rem; margin-bottom: 8px;">Forgot Password</h2>
+        <p style="color: var(--text-secondary);">Enter your username to recover your account</p>
+    </div>
+    
     {% with messages = get_flashed_messages(with_categories=true) %}
         {% if messages %}
             {% for category, message in messages %}
-                <div class="alert alert-{{ 'error' if category == 'error' else 'success' if category == 'success' else 'warning' if category == 'warning' else 'info' }}">{{ message }}</div>
+                <div class="alert alert-{{ 'error' if category == 'error' else 'success' if category == 'success' else 'warning' if category == 'warning' else 'info' }}">
+                    <i class="fas fa-{% if category == 'error' %}exclamation-circle{% elif category == 'success' %}check-circle{% elif category == 'warning' %}exclamation-triangle{% else %}info-circle{% endif %}"></i>
+                    {{ message }}
+                </div>
             {% endfor %}
         {% endif %}
     {% endwith %}
+    
     <form method="post">
         <div class="form-group">
-            <input type="text" name="username" class="form-control" placeholder="Enter username" required>
+            <div style="position: relative;">
+                <i class="fas fa-user" style="position: absolute; left: 18px; top: 50%; transform: translateY(-50%); color: var(--text-muted);"></i>
+                <input type="text" name="username" class="form-control" placeholder="Enter username" style="padding-left: 45px;" required>
+            </div>
         </div>
-        <button type="submit" class="btn" style="width: 100%;">Next</button>
+        <button type="submit" class="btn" style="width: 100%;">
+            <i class="fas fa-arrow-right"></i> Continue
+        </button>
     </form>
+    
+    <div style="text-align: center; margin-top: 25px; padding-top: 20px; border-top: 1px solid rgba(255,255,255,0.1);">
+        <p style="color: var(--text-secondary);">
+            Remember your password? 
+            <a href="{{ url_for('login') }}" style="color: var(--accent-primary); text-decoration: none; font-weight: 600;">
+                Back to login
+            </a>
+        </p>
+    </div>
 </div>
+{% endblock %}
 """
 
-TPL_FORGOT_Q = """
-<div class="glass-card" style="max-width: 400px; margin: 50px auto;">
-    <h2 style="text-align: center; margin-bottom: 30px; color: #2d3748;">Answer Secret Question</h2>
-    <p style="text-align: center; margin-bottom: 20px; font-weight: 500;">{{ question }}</p>
+TPL_FORGOT_Q = """{% extends "base.html" %}{% block content %}
+<div class="glass-card" style="max-width: 420px; margin: 80px auto;">
+    <div style="text-align: center; margin-bottom: 30px;">
+        <h2 style="font-size: 2rem; margin-bottom: 8px;">Answer Secret Question</h2>
+        <p style="color: var(--text-secondary);">Please answer your security question to reset your password</p>
+    </div>
+    
+    <div style="background: rgba(255,255,255,0.05); padding: 20px; border-radius: 12px; margin-bottom: 25px; text-align: center;">
+        <h4 style="color: var(--accent-primary); margin-bottom: 10px;">Your Question:</h4>
+        <p style="color: var(--text-primary); font-weight: 500;">{{ question }}</p>
+    </div>
+    
     {% with messages = get_flashed_messages(with_categories=true) %}
         {% if messages %}
             {% for category, message in messages %}
-                <div class="alert alert-{{ 'error' if category == 'error' else 'success' if category == 'success' else 'warning' if category == 'warning' else 'info' }}">{{ message }}</div>
+                <div class="alert alert-{{ 'error' if category == 'error' else 'success' if category == 'success' else 'warning' if category == 'warning' else 'info' }}">
+                    <i class="fas fa-{% if category == 'error' %}exclamation-circle{% elif category == 'success' %}check-circle{% elif category == 'warning' %}exclamation-triangle{% else %}info-circle{% endif %}"></i>
+                    {{ message }}
+                </div>
             {% endfor %}
         {% endif %}
     {% endwith %}
+    
     <form method="post" action="{{ url_for('reset') }}">
         <div class="form-group">
-            <input type="text" name="answer" class="form-control" placeholder="Your answer" required>
+            <div style="position: relative;">
+                <i class="fas fa-key" style="position: absolute; left: 18px; top: 50%; transform: translateY(-50%); color: var(--text-muted);"></i>
+                <input type="text" name="answer" class="form-control" placeholder="Your answer" style="padding-left: 45px;" required>
+            </div>
         </div>
         <div class="form-group">
-            <input type="password" name="newpass" class="form-control" placeholder="New password" required>
+            <div style="position: relative;">
+                <i class="fas fa-lock" style="position: absolute; left: 18px; top: 50%; transform: translateY(-50%); color: var(--text-muted);"></i>
+                <input type="password" name="newpass" class="form-control" placeholder="New password" style="padding-left: 45px;" required>
+            </div>
         </div>
-        <button type="submit" class="btn" style="width: 100%;">Reset Password</button>
+        <button type="submit" class="btn" style="width: 100%;">
+            <i class="fas fa-redo"></i> Reset Password
+        </button>
     </form>
 </div>
+{% endblock %}
 """
 
-TPL_404 = """
-<div class="glass-card" style="text-align: center; max-width: 500px; margin: 100px auto;">
-    <h1 style="font-size: 4rem; color: #667eea; margin-bottom: 20px;">404</h1>
-    <h2 style="margin-bottom: 20px;">Page Not Found</h2>
-    <p style="margin-bottom: 30px;">The page you're looking for doesn't exist.</p>
-    <a href="{{ url_for('dashboard') }}" class="btn">Go to Dashboard</a>
-</div>
-"""
-
-TPL_500 = """
-<div class="glass-card" style="text-align: center; max-width: 500px; margin: 100px auto;">
-    <h1 style="font-size: 4rem; color: #f5576c; margin-bottom: 20px;">500</h1>
-    <h2 style="margin-bottom: 20px;">Internal Server Error</h2>
-    <p style="margin-bottom: 30px;">Something went wrong on our end. Please try again later.</p>
-    <a href="{{ url_for('dashboard') }}" class="btn">Go to Dashboard</a>
-</div>
-"""
-
-TPL_DASHBOARD = """
+TPL_DASHBOARD = """{% extends "base.html" %}{% block content %}
 <div class="header">
     <div>
-        <h1 class="welcome-text">{{username}}'s Roadmap</h1>
-        <p class="subtitle">Organize your life with categories and tasks</p>
+        <h1 class="welcome-text">{{ username }}'s Roadmap</h1>
+        <p class="subtitle">Organize your goals and track your progress</p>
     </div>
-    <a href="{{ url_for('logout') }}" class="btn btn-secondary">Logout</a>
+    <a href="{{ url_for('logout') }}" class="btn btn-secondary">
+        <i class="fas fa-sign-out-alt"></i> Logout
+    </a>
 </div>
-{% with messages = get_flashed_messages(with_categories=true) %}
-    {% if messages %}
-        {% for category, message in messages %}
-            <div class="alert alert-{{ 'error' if category == 'error' else 'success' if category == 'success' else 'warning' if category == 'warning' else 'info' }}">{{ message }}</div>
-        {% endfor %}
-    {% endif %}
-{% endwith %}
+
+{% if messages %}
+    {% for category, message in messages %}
+        <div class="alert alert-{{ 'error' if category == 'error' else 'success' if category == 'success' else 'warning' if category == 'warning' else 'info' }}">
+            <i class="fas fa-{% if category == 'error' %}exclamation-circle{% elif category == 'success' %}check-circle{% elif category == 'warning' %}exclamation-triangle{% else %}info-circle{% endif %}"></i>
+            {{ message }}
+        </div>
+    {% endfor %}
+{% endif %}
+
+{% if live_since %}
+    <div id="live-updates" data-url="{{ url_for('events') }}" data-since="{{ live_since }}" hidden></div>
+{% endif %}
 
 <div class="stats-grid">
     <div class="stat-card">
         <h3>Total Tasks</h3>
-        <p style="font-size: 2rem; font-weight: bold;">{{total_tasks}}</p>
+        <p id="stat-total" style="font-size: 2.5rem; font-weight: bold; margin: 10px 0;">{{ total_tasks }}</p>
+        <small>All your active tasks</small>
     </div>
     <div class="stat-card success">
         <h3>Completed</h3>
-        <p style="font-size: 2rem; font-weight: bold;">{{completed_tasks}}</p>
+        <p id="stat-completed" style="font-size: 2.5rem; font-weight: bold; margin: 10px 0;">{{ completed_tasks }}</p>
+        <small>Tasks marked as done</small>
     </div>
-    <div class="stat-card" style="background: linear-gradient(135deg, #ffd89b, #19547b);">
+    <div class="stat-card" style="background: linear-gradient(135deg, #f59e0b, #d97706);">
         <h3>Progress</h3>
-        <p style="font-size: 2rem; font-weight: bold;">
+        <p id="stat-progress" style="font-size: 2.5rem; font-weight: bold; margin: 10px 0;">
             {{ (completed_tasks / total_tasks * 100)|round|int if total_tasks > 0 else 0 }}%
         </p>
+        <small>Overall completion</small>
+    </div>
+    <div class="stat-card" style="background: linear-gradient(135deg, #ef4444, #f97316);">
+        <h3>Streak</h3>
+        <p id="stat-streak" style="font-size: 2.5rem; font-weight: bold; margin: 10px 0;">{{ streak }}</p>
+        <small>Days in a row with a completed task</small>
     </div>
 </div>
 
 <div class="dashboard-grid">
+    <!-- Categories Sidebar -->
     <div class="categories-sidebar">
-        <h3 style="margin-bottom: 20px;">Your Roadmaps</h3>
+        <h3 style="margin-bottom: 20px; color: var(--text-primary);">
+            <i class="fas fa-map"></i> Your Roadmaps
+        </h3>
         
         <div class="glass-card" style="margin-bottom: 20px;">
-            <h4 style="margin-bottom: 15px;">Add New Roadmap</h4>
+            <h4 style="margin-bottom: 15px; color: var(--text-primary);">
+                <i class="fas fa-plus"></i> Add New Roadmap
+            </h4>
             <form method="post" action="{{ url_for('add_category') }}">
+                <input type="hidden" name="idempotency_key" value="{{ new_idempotency_key() }}">
                 <div class="form-group">
                     <input type="text" name="name" class="form-control" placeholder="Roadmap name (e.g., Study Plan)" required>
                 </div>
@@ -522,53 +1221,110 @@ TPL_DASHBOARD = """
                     <textarea name="description" class="form-control" placeholder="Description (optional)" rows="2"></textarea>
                 </div>
                 <div class="form-group">
-                    <label style="display: block; margin-bottom: 8px; font-weight: 500;">Color:</label>
-                    <input type="color" name="color" value="#667eea" style="width: 100%; height: 40px; border-radius: 8px; border: 2px solid #e1e5e9;">
+                    <label style="display: block; margin-bottom: 8px; font-weight: 500; color: var(--text-secondary);">
+                        <i class="fas fa-palette"></i> Color:
+                    </label>
+                    <input type="color" name="color" value="#6366f1" style="width: 100%; height: 45px; border-radius: 10px; border: 2px solid rgba(255, 255, 255, 0.1); background: rgba(255, 255, 255, 0.05);">
                 </div>
-                <button type="submit" class="btn" style="width: 100%;">Create Roadmap</button>
+                <button type="submit" class="btn" style="width: 100%;">
+                    <i class="fas fa-plus-circle"></i> Create Roadmap
+                </button>
             </form>
         </div>
 
+        <a href="{{ url_for('template_library') }}" class="btn btn-secondary" style="width: 100%; margin-bottom: 20px;">
+            <i class="fas fa-book-open"></i> Browse Roadmap Templates
+        </a>
+
         {% if categories %}
-            <h4 style="margin-bottom: 15px;">Your Roadmaps</h4>
+            <h4 style="margin-bottom: 15px; color: var(--text-primary);">
+                <i class="fas fa-list"></i> Your Roadmaps
+            </h4>
             {% for category in categories %}
                 <div class="category-item" style="border-left-color: {{ category.color }};">
-                    <div style="display: flex; justify-content: between; align-items: center;">
-                        <div>
-                            <strong>{{ category.name }}</strong>
+                    <div style="display: flex; justify-content: space-between; align-items: flex-start;">
+                        <div style="flex: 1;">
+                            <strong style="color: var(--text-primary);">{{ category.name }}</strong>
                             {% if category.description %}
-                                <p style="margin: 5px 0 0 0; font-size: 12px; color: #6c757d;">{{ category.description }}</p>
+                                <p style="margin: 5px 0 0 0; font-size: 12px; color: var(--text-muted);">{{ category.description }}</p>
+                            {% endif %}
+                            {% if category.share_token %}
+                                <input type="text" class="form-control" readonly onclick="this.select()" style="margin-top: 8px; font-size: 12px; padding: 6px 10px;"
+                                       value="{{ url_for('shared_roadmap', token=category.share_token, _external=True) }}">
                             {% endif %}
                         </div>
-                        <form method="post" action="{{ url_for('delete_category', cid=category.id) }}" style="display: inline;">
-                            <button type="submit" class="btn btn-danger btn-small" onclick="return confirm('Delete this roadmap and all its tasks?')">×</button>
+                        {% if category.is_template %}
+                            <form method="post" action="{{ url_for('unpublish_category', cid=category.id) }}" style="display: inline; margin-left: 10px;">
+                                <button type="submit" class="btn btn-info btn-small" title="Remove from the template library">
+                                    <i class="fas fa-book"></i>
+                                </button>
+                            </form>
+                        {% else %}
+                            <form method="post" action="{{ url_for('publish_category', cid=category.id) }}" style="display: inline; margin-left: 10px;">
+                                <button type="submit" class="btn btn-secondary btn-small" title="Publish as a template">
+                                    <i class="fas fa-book-open"></i>
+                                </button>
+                            </form>
+                        {% endif %}
+                        {% if category.share_token %}
+                            <form method="post" action="{{ url_for('unshare_category', cid=category.id) }}" style="display: inline; margin-left: 10px;">
+                                <button type="submit" class="btn btn-secondary btn-small" title="Stop sharing">
+                                    <i class="fas fa-link-slash"></i>
+                                </button>
+                            </form>
+                        {% else %}
+                            <form method="post" action="{{ url_for('share_category', cid=category.id) }}" style="display: inline; margin-left: 10px;">
+                                <button type="submit" class="btn btn-secondary btn-small" title="Share a read-only link">
+                                    <i class="fas fa-share-nodes"></i>
+                                </button>
+                            </form>
+                        {% endif %}
+                        <form method="post" action="{{ url_for('delete_category', cid=category.id) }}" style="display: inline; margin-left: 10px;">
+                            <button type="submit" class="btn btn-danger btn-small" onclick="return confirm('Delete this roadmap and all its tasks?')">
+                                <i class="fas fa-times"></i>
+                            </button>
                         </form>
                     </div>
                 </div>
             {% endfor %}
         {% else %}
-            <div style="text-align: center; padding: 20px; color: #6c757d;">
+            <div style="text-align: center; padding: 30px; color: var(--text-muted);">
+                <i class="fas fa-map-marked-alt" style="font-size: 3rem; margin-bottom: 15px; opacity: 0.5;"></i>
                 <p>No roadmaps yet. Create your first one!</p>
             </div>
         {% endif %}
     </div>
 
+    <!-- Main Content -->
     <div>
         <div class="tab-buttons">
-            <button class="tab-button active" onclick="switchTab('single')">Add Single Task</button>
-            <button class="tab-button" onclick="switchTab('bulk')">Bulk Import</button>
+            <button class="tab-button active" onclick="switchTab('single')">
+                <i class="fas fa-plus-circle"></i> Add Single Task
+            </button>
+            <button class="tab-button" onclick="switchTab('bulk')">
+                <i class="fas fa-bolt"></i> Bulk Import
+            </button>
         </div>
 
         <div id="single-tab" class="tab-content active">
             <div class="glass-card">
-                <h3 style="margin-bottom: 15px;">Add New Task</h3>
+                <h3 style="margin-bottom: 15px; color: var(--text-primary);">
+                    <i class="fas fa-tasks"></i> Add New Task
+                </h3>
                 <form method="post" action="{{ url_for('add_task') }}">
+                    <input type="hidden" name="idempotency_key" value="{{ new_idempotency_key() }}">
                     <div class="form-group">
                         <input type="text" name="title" class="form-control" placeholder="Task title" required>
                     </div>
                     <div class="form-group">
                         <textarea name="notes" class="form-control" placeholder="Notes (optional)" rows="3"></textarea>
                     </div>
+                    <div class="form-group">
+                        <label style="display: block; margin-bottom: 8px; font-weight: 500; color: var(--text-secondary);">
+                            <i class="fas fa-calendar-day"></i> Due (UTC, optional):
+                        </label>
+                        <input type="datetime-local" name="due_at" class="form-control">
+                    </div>
                     <div class="form-group">
                         <select name="category_id" class="form-control">
                             <option value="">No Roadmap (General)</option>
@@ -577,107 +1333,365 @@ TPL_DASHBOARD = """
                             {% endfor %}
                         </select>
                     </div>
-                    <button type="submit" class="btn">Add Task</button>
+                    <button type="submit" class="btn">
+                        <i class="fas fa-plus"></i> Add Task
+                    </button>
                 </form>
             </div>
         </div>
 
         <div id="bulk-tab" class="tab-content">
             <div class="glass-card">
-                <h3 style="margin-bottom: 15px;">Bulk Import Tasks</h3>
-                <form method="post" action="{{ url_for('bulk_import') }}">
+                <h3 style="margin-bottom: 15px; color: var(--text-primary);">
+                    <i class="fas fa-bolt"></i> Bulk Import Tasks
+                </h3>
+                <form method="post" action="{{ url_for('bulk_import') }}" enctype="multipart/form-data">
+                    <input type="hidden" name="idempotency_key" value="{{ new_idempotency_key() }}">
                     <div class="form-group">
-                        <textarea name="bulk_text" class="form-control" placeholder="Paste your roadmap here..." rows="8" required></textarea>
+                        <textarea name="bulk_text" class="form-control" placeholder="Paste your roadmap here...&#10;&#10;Examples:&#10;Web Development = HTML Basics, CSS Styling, JavaScript&#10;Data Science: Python | Pandas | Machine Learning&#10;- Math Homework&#10;- Physics Lab" rows="8"></textarea>
                     </div>
-                    <div style="display: flex; gap: 10px; align-items: center;">
-                        <button type="submit" class="btn btn-info">Import Roadmap</button>
-                        <button type="button" class="btn btn-secondary" onclick="showImportExamples()">Show Format Examples</button>
+                    <div class="form-group" style="display: flex; gap: 10px; flex-wrap: wrap;">
+                        <select name="format" class="form-control" style="flex: 1; min-width: 160px;">
+                            <option value="auto">Detect format automatically</option>
+                            <option value="text">Roadmap text</option>
+                            <option value="csv">CSV</option>
+                            <option value="json">JSON / JSON Lines</option>
+                            <option value="markdown">Markdown checklist</option>
+                            <option value="opml">OPML outline</option>
+                        </select>
+                        <input type="file" name="bulk_file" class="form-control" accept=".txt,.csv,.json,.jsonl,.md,.markdown,.opml,.xml" style="flex: 1; min-width: 160px;">
+                    </div>
+                    <div class="form-group">
+                        <label style="display: flex; align-items: center; gap: 8px; color: var(--text-secondary); cursor: pointer;">
+                            <input type="checkbox" name="merge" value="1" checked>
+                            Merge into existing roadmaps and skip tasks I already have
+                        </label>
+                    </div>
+                    <div style="display: flex; gap: 10px; align-items: center; flex-wrap: wrap;">
+                        <button type="submit" class="btn btn-info">
+                            <i class="fas fa-upload"></i> Import Roadmap
+                        </button>
+                        <button type="button" class="btn btn-secondary" onclick="showImportExamples()">
+                            <i class="fas fa-question-circle"></i> Format Examples
+                        </button>
                     </div>
                 </form>
                 <div class="import-example">
-                    <strong>Supported formats:</strong><br>
+                    <strong><i class="fas fa-lightbulb"></i> Supported formats:</strong><br>
                     • <code>Category = Task1, Task2, Task3</code><br>
                     • <code>Category: Task1 | Task2 | Task3</code><br>
-                    • Bullet points with <code>- Task</code> or <code>* Task</code>
+                    • Bullet points with <code>- Task</code> or <code>* Task</code><br>
+                    • CSV with a <code>title</code> column, JSON, Markdown <code># Roadmap</code> / <code>- [x] Task</code> checklists, or OPML outlines
+                </div>
+                <div style="display: flex; gap: 10px; align-items: center; flex-wrap: wrap; margin-top: 16px;">
+                    <strong style="color: var(--text-secondary);"><i class="fas fa-download"></i> Backup:</strong>
+                    <a href="{{ url_for('export', format='csv') }}" class="btn btn-secondary btn-small">CSV</a>
+                    <a href="{{ url_for('export', format='jsonl') }}" class="btn btn-secondary btn-small">JSON Lines</a>
+                    <a href="{{ url_for('export', format='text') }}" class="btn btn-secondary btn-small">Import Text</a>
                 </div>
             </div>
         </div>
 
-        <h2 style="margin-bottom: 20px; color: white;">Your Tasks</h2>
-        {% if tasks %}
+        <div id="next-up"{% if not next_up %} style="display: none;"{% endif %}>
+            <h2 style="margin-bottom: 20px; color: var(--text-primary); margin-top: 30px;">
+                <i class="fas fa-forward"></i> Next Up
+            </h2>
+            <div class="glass-card next-up-list" style="margin-bottom: 20px;">
+                {% for step in next_up %}
+                    <div style="display: flex; justify-content: space-between; align-items: center; gap: 10px; padding: 6px 0;">
+                        <span class="next-up-title" style="color: var(--text-primary);">{{ step.title }}</span>
+                        {% if step.category_name %}
+                            <span class="category-badge" style="margin-bottom: 0;"><i class="fas fa-tag"></i> <span>{{ step.category_name }}</span></span>
+                        {% endif %}
+                    </div>
+                {% endfor %}
+            </div>
+            <!-- Row for steps added by applyTaskUpdate() -->
+            <template id="next-up-step-template">
+                <div style="display: flex; justify-content: space-between; align-items: center; gap: 10px; padding: 6px 0;">
+                    <span class="next-up-title" style="color: var(--text-primary);"></span>
+                    <span class="category-badge" style="margin-bottom: 0;"><i class="fas fa-tag"></i> <span></span></span>
+                </div>
+            </template>
+        </div>
+
+        {% if deadlines %}
+            <div id="deadlines">
+                <h2 style="margin-bottom: 20px; color: var(--text-primary); margin-top: 30px;">
+                    <i class="fas fa-calendar-day"></i> Upcoming &amp; Overdue
+                </h2>
+                <div class="glass-card" style="margin-bottom: 20px;">
+                    {% for task in deadlines %}
+                        {% set overdue = (task.due_at|string)[:16] < now %}
+                        <div class="deadline" data-task-id="{{ task.id }}" style="display: flex; justify-content: space-between; align-items: center; gap: 10px; padding: 6px 0;">
+                            <span style="color: var(--text-primary);">{{ task.title }}</span>
+                            <span style="display: flex; align-items: center; gap: 10px;">
+                                {% if task.category_name %}
+                                    <span class="category-badge" style="margin-bottom: 0;"><i class="fas fa-tag"></i> {{ task.category_name }}</span>
+                                {% endif %}
+                                <span style="color: var(--{{ 'accent-danger' if overdue else 'text-secondary' }}); white-space: nowrap;">
+                                    {{ 'Overdue' if overdue else 'Due' }} {{ (task.due_at|string)[:16] }}
+                                </span>
+                            </span>
+                        </div>
+                    {% endfor %}
+                </div>
+            </div>
+        {% endif %}
+
+        <h2 style="margin-bottom: 20px; color: var(--text-primary); margin-top: 30px; display: flex; justify-content: space-between; align-items: center; gap: 10px; flex-wrap: wrap;">
+            <span><i class="fas fa-list-check"></i> Your Tasks</span>
+            {% if include_archived %}
+                <a href="{{ url_for('dashboard') }}" class="btn btn-secondary btn-small"><i class="fas fa-box"></i> Hide archived</a>
+            {% elif archived_tasks %}
+                <a href="{{ url_for('dashboard', archived=1) }}" class="btn btn-secondary btn-small"><i class="fas fa-box-archive"></i> Show archived ({{ archived_tasks }})</a>
+            {% endif %}
+        </h2>
+        {{ flush }}
+        {% if total_tasks %}
             <div class="task-grid">
                 {% for t in tasks %}
-                    <div class="task-card {% if t['done'] %}done{% endif %}" id="task-{{ t['id'] }}">
+                    {% if flush and loop.index is divisibleby(flush_every) %}{{ flush }}{% endif %}
+                    <div class="task-card {% if t['done'] %}done{% endif %}" id="task-{{ t['id'] }}" data-task-id="{{ t['id'] }}" data-category-id="{{ t['category_id'] or '' }}" data-depends-on="{{ depends_on.get(t['id'], [])|join(',') }}" data-due-at="{{ (t['due_at']|string)[:16]|replace(' ', 'T') if t['due_at'] }}"{% if not t['done'] %} draggable="true"{% endif %}>
                         {% if t['category_name'] %}
-                            <div class="category-badge" style="background-color: {{ t['category_color'] }};">
-                                {{ t['category_name'] }}
+                            <div class="category-badge">
+                                <i class="fas fa-tag"></i> {{ t['category_name'] }}
                             </div>
                         {% endif %}
-                        <div class="task-title" style="font-weight: 600; margin-bottom: 10px;">{{ t['title'] }}</div>
+                        <div class="task-title" style="font-weight: 600; margin-bottom: 10px; font-size: 1.1rem; color: var(--text-primary);">{{ t['title'] }}</div>
                         {% if t['notes'] %}
-                            <div style="color: #718096; margin-bottom: 10px;">{{ t['notes'] }}</div>
+                            <div class="task-notes" style="color: var(--text-secondary); margin-bottom: 12px; line-height: 1.5;">{{ t['notes'] }}</div>
+                        {% endif %}
+                        {% if not t['archived'] %}
+                            <div class="task-waiting" style="color: var(--accent-warning); font-size: 0.9rem; margin-bottom: 8px; display: {{ 'flex' if waiting.get(t['id']) and not t['done'] else 'none' }}; align-items: center; gap: 6px;">
+                                <i class="fas fa-lock"></i> <span>Waiting on {{ waiting.get(t['id'], 0) }} task{{ 's' if waiting.get(t['id']) != 1 }}</span>
+                            </div>
+                        {% endif %}
+                        {% if t['due_at'] %}
+                            {% set overdue = (t['due_at']|string)[:16] < now %}
+                            <div class="task-due" style="color: var(--{{ 'accent-danger' if overdue else 'text-secondary' }}); font-size: 0.9rem; margin-bottom: 8px; display: {{ 'none' if t['done'] else 'flex' }}; align-items: center; gap: 6px;">
+                                <i class="fas fa-calendar-day"></i> <span>{{ 'Overdue since' if overdue else 'Due' }} {{ (t['due_at']|string)[:16] }}</span>
+                            </div>
                         {% endif %}
                         {% if t['done'] %}
-                            <div style="color: #28a745; font-size: 0.9rem; margin-bottom: 10px;">
+                            <div class="task-status" style="color: var(--accent-success); font-size: 0.9rem; margin-bottom: 12px; display: flex; align-items: center; gap: 6px;">
+                                <i class="fas fa-{{ 'box-archive' if t['archived'] else 'check-circle' }}"></i>
+                                <span>{% if t['archived'] %}Archived &middot;{% endif %}
                                 {% if t.done_at %}
-                                    ✓ Completed at {{ t.done_at[:16] }}
+                                    Completed at {{ t.done_at[:16] }}
                                 {% else %}
-                                    ✓ Completed
-                                {% endif %}
+                                    Completed
+                                {% endif %}</span>
                             </div>
                         {% else %}
-                            <div style="color: #6c757d; font-size: 0.9rem; margin-bottom: 10px;">
-                                {% if t.created_at %}
+                            <div class="task-status" style="color: var(--text-muted); font-size: 0.9rem; margin-bottom: 12px; display: flex; align-items: center; gap: 6px;">
+                                <i class="fas fa-clock"></i>
+                                <span>{% if t.created_at %}
                                     Created: {{ t.created_at[:16] }}
                                 {% else %}
                                     Created: Recently
-                                {% endif %}
+                                {% endif %}</span>
                             </div>
                         {% endif %}
                         <div class="task-actions">
-                            {% if t['done'] %}
-                                <button onclick="undoTask({{ t['id'] }})" class="btn btn-secondary">Undo</button>
+                            {% if t['archived'] %}
+                                <form method="post" action="{{ url_for('restore_task', tid=t['id']) }}" style="display: inline;">
+                                    <button type="submit" class="btn btn-secondary btn-small">
+                                        <i class="fas fa-box-open"></i> Restore
+                                    </button>
+                                </form>
                             {% else %}
-                                <button onclick="markTaskDone({{ t['id'] }})" class="btn btn-success">Mark Done</button>
-                                <button onclick="toggleEdit({{ t['id'] }})" class="btn">Edit</button>
+                                <span class="task-toggle">
+                                    {% if t['done'] %}
+                                        <button onclick="undoTask({{ t['id'] }})" class="btn btn-secondary btn-small">
+                                            <i class="fas fa-undo"></i> Undo
+                                        </button>
+                                    {% else %}
+                                        <button onclick="markTaskDone({{ t['id'] }})" class="btn btn-success btn-small">
+                                            <i class="fas fa-check"></i> Mark Done
+                                        </button>
+                                        <button onclick="toggleEdit({{ t['id'] }})" class="btn btn-small">
+                                            <i class="fas fa-edit"></i> Edit
+                                        </button>
+                                    {% endif %}
+                                </span>
                             {% endif %}
                             <form method="post" action="{{ url_for('delete_task', tid=t['id']) }}" style="display: inline;">
-                                <button type="submit" class="btn btn-danger" onclick="return confirm('Are you sure you want to delete this task?')">Delete</button>
-                            </form>
-                        </div>
-                        <div id="edit-form-{{ t['id'] }}" class="edit-form">
-                            <form method="post" action="{{ url_for('edit_task', tid=t['id']) }}">
-                                <div class="form-group">
-                                    <input type="text" name="title" class="form-control" value="{{ t['title'] }}" required>
-                                </div>
-                                <div class="form-group">
-                                    <textarea name="notes" class="form-control" rows="3">{{ t['notes'] or '' }}</textarea>
-                                </div>
-                                <div class="form-group">
-                                    <select name="category_id" class="form-control">
-                                        <option value="">No Roadmap (General)</option>
-                                        {% for category in categories %}
-                                            <option value="{{ category.id }}" {% if t.category_id == category.id %}selected{% endif %}>
-                                                {{ category.name }}
-                                            </option>
-                                        {% endfor %}
-                                    </select>
-                                </div>
-                                <div style="display: flex; gap: 10px;">
-                                    <button type="submit" class="btn">Save Changes</button>
-                                    <button type="button" class="btn btn-secondary" onclick="toggleEdit({{ t['id'] }})">Cancel</button>
-                                </div>
+                                <button type="submit" class="btn btn-danger btn-small" onclick="return confirm('Are you sure you want to delete this task?')">
+                                    <i class="fas fa-trash"></i> Delete
+                                </button>
                             </form>
                         </div>
                     </div>
                 {% endfor %}
             </div>
+            <!-- Edit form shared by every task card, filled in by toggleEdit() -->
+            <template id="edit-form-template">
+                <div class="edit-form">
+                    <form method="post">
+                        <div class="form-group">
+                            <input type="text" name="title" class="form-control" required>
+                        </div>
+                        <div class="form-group">
+                            <textarea name="notes" class="form-control" rows="3"></textarea>
+                        </div>
+                        <div class="form-group">
+                            <label style="display: block; margin-bottom: 8px; font-weight: 500; color: var(--text-secondary);">
+                                <i class="fas fa-calendar-day"></i> Due (UTC):
+                            </label>
+                            <input type="datetime-local" name="due_at" class="form-control">
+                        </div>
+                        <div class="form-group">
+                            <select name="category_id" class="form-control">
+                                <option value="">No Roadmap (General)</option>
+                                {% for category in categories %}
+                                    <option value="{{ category.id }}">{{ category.name }}</option>
+                                {% endfor %}
+                            </select>
+                        </div>
+                        <div class="form-group">
+                            <label style="display: block; margin-bottom: 8px; font-weight: 500; color: var(--text-secondary);">
+                                <i class="fas fa-diagram-project"></i> Depends on:
+                            </label>
+                            <select name="depends_on" class="form-control" multiple size="4"></select>
+                        </div>
+                        <div style="display: flex; gap: 10px;">
+                            <button type="submit" class="btn">
+                                <i class="fas fa-save"></i> Save Changes
+                            </button>
+                            <button type="button" class="btn btn-secondary edit-cancel">
+                                <i class="fas fa-times"></i> Cancel
+                            </button>
+                        </div>
+                    </form>
+                </div>
+            </template>
         {% else %}
-            <div class="glass-card" style="text-align: center;">
-                <h3 style="color: #6c757d; margin-bottom: 15px;">No tasks yet</h3>
-                <p style="color: #868e96;">Start by adding your first task above!</p>
+            <div class="glass-card" style="text-align: center; padding: 50px 30px;">
+                <i class="fas fa-tasks" style="font-size: 4rem; color: var(--text-muted); margin-bottom: 20px; opacity: 0.5;"></i>
+                <h3 style="color: var(--text-muted); margin-bottom: 15px;">No tasks yet</h3>
+                <p style="color: var(--text-secondary);">Start by adding your first task above!</p>
             </div>
         {% endif %}
     </div>
 </div>
-"""
\ No newline at end of file
+{% endblock %}
+"""
+
+TPL_SHARE = """{% extends "base.html" %}{% block content %}
+<div class="glass-card" style="max-width: 800px; margin: 40px auto; border-left: 4px solid {{ category.color }};">
+    <h1 style="font-size: 2rem; margin-bottom: 8px; color: var(--text-primary);">
+        <i class="fas fa-map" style="color: {{ category.color }};"></i> {{ category.name }}
+    </h1>
+    {% if category.description %}
+        <p style="color: var(--text-secondary); margin-bottom: 16px;">{{ category.description }}</p>
+    {% endif %}
+    <p style="color: var(--text-muted); margin-bottom: 24px;">
+        {{ completed }} of {{ tasks|length }} steps completed
+        {% if tasks %}({{ (completed / tasks|length * 100)|round|int }}%){% endif %}
+    </p>
+    {% for t in tasks %}
+        <div class="task-card {% if t['done'] %}done{% endif %}">
+            <div class="task-title" style="font-weight: 600; font-size: 1.1rem; color: var(--text-primary);">
+                <i class="fas fa-{{ 'check-circle' if t['done'] else 'circle' }}" style="color: var(--{{ 'accent-success' if t['done'] else 'text-muted' }});"></i>
+                {{ t['title'] }}
+            </div>
+            {% if t['notes'] %}
+                <div style="color: var(--text-secondary); margin-top: 8px; line-height: 1.5;">{{ t['notes'] }}</div>
+            {% endif %}
+        </div>
+    {% else %}
+        <p style="color: var(--text-muted);">This roadmap has no steps yet.</p>
+    {% endfor %}
+    <a href="{{ url_for('register') }}" class="btn" style="margin-top: 10px;">
+        <i class="fas fa-user-plus"></i> Build your own roadmap
+    </a>
+</div>
+{% endblock %}
+"""
+
+TPL_TEMPLATE_LIBRARY = """{% extends "base.html" %}{% block content %}
+<div style="max-width: 900px; margin: 40px auto;">
+    <div style="display: flex; justify-content: space-between; align-items: center; gap: 10px; flex-wrap: wrap; margin-bottom: 24px;">
+        <h1 style="font-size: 2rem; color: var(--text-primary);"><i class="fas fa-book-open"></i> Roadmap Templates</h1>
+        <a href="{{ url_for('dashboard') }}" class="btn btn-secondary"><i class="fas fa-arrow-left"></i> Dashboard</a>
+    </div>
+    {% for template in templates %}
+        <div class="category-item" style="border-left-color: {{ template.color }}; display: flex; justify-content: space-between; align-items: center; gap: 16px;">
+            <div style="flex: 1;">
+                <strong style="color: var(--text-primary); font-size: 1.1rem;">{{ template.name }}</strong>
+                {% if template.description %}
+                    <p style="margin: 5px 0 0 0; color: var(--text-secondary);">{{ template.description }}</p>
+                {% endif %}
+                <small style="color: var(--text-muted);">
+                    {{ template.steps }} steps &middot; by {{ template.username }} &middot; cloned {{ template.clones }} times
+                </small>
+            </div>
+            <form method="post" action="{{ url_for('clone_template', owner_id=template.owner_id, cid=template.id) }}">
+                <button type="submit" class="btn btn-small">
+                    <i class="fas fa-clone"></i> Clone
+                </button>
+            </form>
+        </div>
+    {% else %}
+        <div class="glass-card" style="text-align: center; color: var(--text-muted);">
+            <p>No templates yet. Publish one of your roadmaps from the dashboard.</p>
+        </div>
+    {% endfor %}
+</div>
+{% endblock %}
+"""
+
+TPL_404 = """{% extends "base.html" %}{% block content %}
+<div class="glass-card" style="text-align: center; max-width: 500px; margin: 100px auto; padding: 50px 30px;">
+    <i class="fas fa-compass" style="font-size: 4rem; color: var(--accent-primary); margin-bottom: 20px;"></i>
+    <h1 style="font-size: 4rem; color: var(--accent-primary); margin-bottom: 20px;">404</h1>
+    <h2 style="margin-bottom: 20px; color: var(--text-primary);">Page Not Found</h2>
+    <p style="margin-bottom: 30px; color: var(--text-secondary);">The page you're looking for doesn't exist or has been moved.</p>
+    <a href="{{ url_for('dashboard') }}" class="btn">
+        <i class="fas fa-home"></i> Go to Dashboard
+    </a>
+</div>
+{% endblock %}
+"""
+
+TPL_500 = """{% extends "base.html" %}{% block content %}
+<div class="glass-card" style="text-align: center; max-width: 500px; margin: 100px auto; padding: 50px 30px;">
+    <i class="fas fa-exclamation-triangle" style="font-size: 4rem; color: var(--accent-danger); margin-bottom: 20px;"></i>
+    <h1 style="font-size: 4rem; color: var(--accent-danger); margin-bottom: 20px;">500</h1>
+    <h2 style="margin-bottom: 20px; color: var(--text-primary);">Internal Server Error</h2>
+    <p style="margin-bottom: 30px; color: var(--text-secondary);">Something went wrong on our end. Please try again later.</p>
+    <a href="{{ url_for('dashboard') }}" class="btn">
+        <i class="fas fa-home"></i> Go to Dashboard
+    </a>
+</div>
+{% endblock %}
+"""
+
+TPL_503 = """{% extends "base.html" %}{% block content %}
+<div class="glass-card" style="text-align: center; max-width: 500px; margin: 100px auto; padding: 50px 30px;">
+    <i class="fas fa-database" style="font-size: 4rem; color: var(--accent-warning); margin-bottom: 20px;"></i>
+    <h1 style="font-size: 4rem; color: var(--accent-warning); margin-bottom: 20px;">503</h1>
+    <h2 style="margin-bottom: 20px; color: var(--text-primary);">Temporarily Unavailable</h2>
+    <p style="margin-bottom: 30px; color: var(--text-secondary);">We can't reach our database right now. Please try again in a moment.</p>
+    <a href="{{ request.path }}" class="btn">
+        <i class="fas fa-redo"></i> Try Again
+    </a>
+</div>
+{% endblock %}
+"""
+
+TEMPLATES = {
+    'base.html': TPL_BASE,
+    'footer.html': TPL_FOOTER,
+    'login.html': TPL_LOGIN,
+    'register.html': TPL_REGISTER,
+    'forgot.html': TPL_FORGOT,
+    'forgot_q.html': TPL_FORGOT_Q,
+    'dashboard.html': TPL_DASHBOARD,
+    'share.html': TPL_SHARE,
+    'template_library.html': TPL_TEMPLATE_LIBRARY,
+    '404.html': TPL_404,
+    '500.html': TPL_500,
+    '503.html': TPL_503,
+}